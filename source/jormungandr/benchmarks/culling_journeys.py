@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+micro benchmark of the selection of the journeys in the culling (scenarios/new_default.py)
+
+compares the exhaustive search (_get_sorted_solutions_indexes, all the combinations are enumerated)
+with the branch and bound search (_find_best_selection) on synthetic candidate pools of growing size
+
+usage (from source/jormungandr, with jormungandr in the PYTHONPATH):
+    python benchmarks/culling_journeys.py --sizes 10 15 20 30 --nb-journeys 6
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import random
+import time
+import numpy as np
+from jormungandr.scenarios import new_default
+
+
+def make_candidate_pool(nb_candidates, nb_sections, density):
+    """
+    random sections masks, each journey uses at least one section
+    """
+    masks = []
+    for _ in range(nb_candidates):
+        mask = 0
+        for s in range(nb_sections):
+            if random.random() < density:
+                mask |= 1 << s
+        masks.append(mask or 1 << random.randrange(nb_sections))
+    pseudo_durations = [random.randint(1800, 7200) for _ in range(nb_candidates)]
+    return masks, pseudo_durations
+
+
+def masks_to_matrix(masks, nb_sections):
+    return np.array([[(m >> s) & 1 for s in range(nb_sections)] for m in masks])
+
+
+def exhaustive_selection(masks, pseudo_durations, nb_sections, nb_journeys, must_keep):
+    matrix = masks_to_matrix(masks, nb_sections)
+    best_indexes, selection_matrix = new_default._get_sorted_solutions_indexes(matrix, nb_journeys, must_keep)
+    best = min(best_indexes, key=lambda v: sum(pseudo_durations[i] for i in np.where(selection_matrix[v, :])[0]))
+    return np.where(selection_matrix[best, :])[0].tolist()
+
+
+def timed(func, *args):
+    start = time.time()
+    res = func(*args)
+    return res, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 15, 20, 25, 30],
+                        help='number of candidate journeys')
+    parser.add_argument('--nb-journeys', type=int, default=6, help='max_nb_journeys of the request')
+    parser.add_argument('--nb-must-keep', type=int, default=2, help='number of journeys that must be kept')
+    parser.add_argument('--nb-sections', type=int, default=20, help='number of different sections')
+    parser.add_argument('--density', type=float, default=0.15, help='probability of a journey to use a section')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-exhaustive-size', type=int, default=22,
+                        help='the exhaustive search is not run for bigger pools (it would take too long)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print('{:>6} {:>18} {:>18} {:>10}'.format('size', 'exhaustive (ms)', 'branch&bound (ms)', 'same'))
+    for size in args.sizes:
+        exhaustive_times, bb_times, same = [], [], True
+        for _ in range(args.repeat):
+            masks, pseudo_durations = make_candidate_pool(size, args.nb_sections, args.density)
+            must_keep = list(range(args.nb_must_keep))
+            selection, duration = timed(new_default._find_best_selection,
+                                        masks, pseudo_durations, args.nb_journeys, must_keep)
+            bb_times.append(duration)
+            if size <= args.max_exhaustive_size:
+                expected, duration = timed(exhaustive_selection, masks, pseudo_durations,
+                                           args.nb_sections, args.nb_journeys, must_keep)
+                exhaustive_times.append(duration)
+                same &= expected == selection
+
+        exhaustive = '{:.1f}'.format(1000 * max(exhaustive_times)) if exhaustive_times else '-'
+        print('{:>6} {:>18} {:>18.1f} {:>10}'.format(size, exhaustive, 1000 * max(bb_times),
+                                                   str(same) if exhaustive_times else '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+"""
+micro benchmark of the discovery of the object types used by the id links (interfaces/v1/make_links.py)
+
+compares the serialization of a /lines?depth=3 like response followed by a walk of the
+whole serialized response (the previous implementation) with the serialization registering the
+types of the objects on the fly
+
+usage (from source/jormungandr, with jormungandr in the PYTHONPATH):
+    python benchmarks/id_links.py --sizes 100 500 2000
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import time
+from flask import g
+from navitiacommon import response_pb2
+from jormungandr import app
+from jormungandr.interfaces.v1.make_links import add_id_links, start_object_types_collection
+from jormungandr.interfaces.v1.serializer.api import LinesSerializer
+
+
+def make_response(nb_lines, nb_routes, nb_stop_points):
+    response = response_pb2.Response()
+    for l in range(nb_lines):
+        line = response.lines.add()
+        line.uri = 'line:{}'.format(l)
+        line.name = 'line {}'.format(l)
+        line.code = str(l)
+        line.impact_uris.append('impact:{}'.format(l))
+        line.network.uri = 'network:1'
+        line.network.name = 'network'
+        line.commercial_mode.uri = 'commercial_mode:bus'
+        line.commercial_mode.name = 'bus'
+        physical_mode = line.physical_modes.add()
+        physical_mode.uri = 'physical_mode:Bus'
+        physical_mode.name = 'Bus'
+        code = line.codes.add()
+        code.type = 'external_code'
+        code.value = 'L{}'.format(l)
+        for r in range(nb_routes):
+            route = line.routes.add()
+            route.uri = 'route:{}:{}'.format(l, r)
+            route.name = 'route {}'.format(r)
+            route.direction.uri = 'stop_area:{}'.format(r)
+            route.direction.stop_area.uri = 'stop_area:{}'.format(r)
+            for s in range(nb_stop_points):
+                stop_point = route.stop_points.add()
+                stop_point.uri = 'stop_point:{}:{}'.format(r, s)
+                stop_point.name = 'stop {}'.format(s)
+                stop_point.coord.lon = 2.3
+                stop_point.coord.lat = 48.8
+                stop_point.stop_area.uri = 'stop_area:{}'.format(s)
+                stop_point.stop_area.name = 'stop {}'.format(s)
+    response.pagination.totalResult = nb_lines
+    response.pagination.itemsOnPage = nb_lines
+    response.pagination.itemsPerPage = nb_lines
+    return response
+
+
+def walked(response):
+    start = time.time()
+    g.collected_object_types = None
+    data = LinesSerializer(response).data
+    links = add_id_links()
+    links.get_objets(data)
+    return time.time() - start, links.data
+
+
+def collected(response):
+    start = time.time()
+    start_object_types_collection()
+    LinesSerializer(response).data
+    types = g.collected_object_types
+    return time.time() - start, types
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 2000], help='number of lines')
+    parser.add_argument('--nb-routes', type=int, default=2)
+    parser.add_argument('--nb-stop-points', type=int, default=10)
+    args = parser.parse_args()
+
+    print('{:>6} {:>15} {:>15} {:>8} {:>6}'.format('size', 'walked (ms)', 'collected (ms)', 'speedup', 'same'))
+    with app.test_request_context():
+        for size in args.sizes:
+            response = make_response(size, args.nb_routes, args.nb_stop_points)
+            walked_time, walked_types = walked(response)
+            collected_time, collected_types = collected(response)
+            print('{:>6} {:>15.1f} {:>15.1f} {:>8.2f} {:>6}'.format(
+                size, 1000 * walked_time, 1000 * collected_time,
+                walked_time / collected_time if collected_time else float('inf'),
+                str(walked_types == collected_types)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+"""
+replay of recorded jormungandr.access log lines against a jormungandr wired to fake krakens
+
+each fake kraken serves the protobuf responses recorded in a directory (one sub directory by requested api,
+ex: responses/planner/0.pb, responses/places/0.pb...), in turn, after a configurable latency.
+Without recorded response an empty response is served (the metadatas are made up).
+With --record the fake krakens forward the requests to a real kraken and record its responses.
+
+the report gives, by endpoint, the throughput, the percentiles of the response times
+and the timings of the steps of the requests (see jormungandr/timing.py)
+
+usage (from source/jormungandr, with jormungandr in the PYTHONPATH):
+    python benchmarks/replay.py access.log --responses responses --latency 20 --concurrency 10
+    python benchmarks/replay.py access.log --responses responses --record fr-idf=tcp://localhost:30000
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import collections
+import io
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+import gevent
+import gevent.pool
+from zmq import green as zmq
+from navitiacommon import request_pb2, response_pb2, type_pb2
+
+
+# format of the jormungandr.access logger (see jormungandr/api.py)
+ACCESS_LOG_RE = re.compile(r'"(?P<method>GET|POST) (?P<path>\S+?)\?(?P<query>\S*)" (?P<status>\d{3})')
+COVERAGE_RE = re.compile(r'/coverage/(?P<region>[^/;]+)/')
+
+
+def parse_access_log(file_name):
+    """
+    :return: the urls of the GET requests of the log
+    """
+    urls = []
+    with io.open(file_name, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = ACCESS_LOG_RE.search(line)
+            if not match or match.group('method') != 'GET':
+                continue
+            query = match.group('query')
+            urls.append(match.group('path') + ('?' + query if query else ''))
+    return urls
+
+
+def regions_of(urls):
+    return sorted({m.group('region') for m in (COVERAGE_RE.search(u) for u in urls) if m})
+
+
+class FakeKraken(object):
+    """
+    ROUTER socket answering like a kraken with recorded responses
+    """
+
+    def __init__(self, context, socket_path, responses_dir, latency, jitter, record_socket=None):
+        self.socket = context.socket(zmq.ROUTER)
+        self.socket.bind(socket_path)
+        self.responses_dir = responses_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.responses = self._load_responses()
+        self.next_response = collections.defaultdict(int)
+        self.context = context
+        self.record_socket = record_socket
+        self.nb_requests = collections.Counter()
+
+    def _load_responses(self):
+        responses = collections.defaultdict(list)
+        if not self.responses_dir or not os.path.isdir(self.responses_dir):
+            return responses
+        for api in os.listdir(self.responses_dir):
+            api_dir = os.path.join(self.responses_dir, api)
+            for file_name in sorted(os.listdir(api_dir)):
+                with open(os.path.join(api_dir, file_name), 'rb') as f:
+                    responses[api].append(f.read())
+        return responses
+
+    def _record(self, api, request):
+        # the requests are answered concurrently, a REQ socket can only handle one request at a time
+        socket = self.context.socket(zmq.REQ)
+        try:
+            socket.connect(self.record_socket)
+            socket.send(request)
+            response = socket.recv()
+        finally:
+            socket.close(linger=0)
+        # no greenlet switch from here, the index of the file is the index of the response
+        api_dir = os.path.join(self.responses_dir, api)
+        if not os.path.isdir(api_dir):
+            os.makedirs(api_dir)
+        with open(os.path.join(api_dir, '{}.pb'.format(len(self.responses[api]))), 'wb') as f:
+            f.write(response)
+        self.responses[api].append(response)
+        return response
+
+    def _made_up_response(self, request):
+        response = response_pb2.Response()
+        if request.requested_api == type_pb2.METADATAS:
+            response.publication_date = 1
+            response.metadatas.start_production_date = '20170101'
+            response.metadatas.end_production_date = '20271231'
+            response.metadatas.status = 'running'
+            response.metadatas.timezone = 'Europe/Paris'
+            response.metadatas.shape = 'POLYGON((-180 -90, 180 -90, 180 90, -180 90, -180 -90))'
+        return response.SerializeToString()
+
+    def response(self, payload):
+        request = request_pb2.Request()
+        request.ParseFromString(payload)
+        api = type_pb2.API.Name(request.requested_api).lower()
+        self.nb_requests[api] += 1
+        if self.record_socket and api not in ('metadatas', 'status'):
+            return self._record(api, payload)
+        recorded = self.responses.get(api)
+        if not recorded:
+            return self._made_up_response(request)
+        i = self.next_response[api]
+        self.next_response[api] = (i + 1) % len(recorded)
+        return recorded[i]
+
+    def _answer(self, identity, payload):
+        gevent.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0) / 1000)
+        self.socket.send_multipart([identity, b'', self.response(payload)])
+
+    def run(self):
+        while True:
+            frames = self.socket.recv_multipart()
+            gevent.spawn(self._answer, frames[0], frames[-1])
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(p / 100 * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def configure_jormungandr(regions, sockets_dir):
+    """
+    the configuration has to be done before the import of jormungandr
+    """
+    instances_dir = os.path.join(sockets_dir, 'instances')
+    os.makedirs(instances_dir)
+    sockets = {}
+    for region in regions:
+        sockets[region] = 'ipc://{}/{}'.format(sockets_dir, region)
+        with open(os.path.join(instances_dir, '{}.json'.format(region)), 'w') as f:
+            json.dump({'key': region, 'zmq_socket': sockets[region]}, f)
+    os.environ['JORMUNGANDR_INSTANCES_DIR'] = instances_dir
+    os.environ['JORMUNGANDR_START_MONITORING_THREAD'] = 'False'
+    os.environ['JORMUNGANDR_DISABLE_DATABASE'] = 'True'
+    os.environ['JORMUNGANDR_IS_PUBLIC'] = 'True'
+    os.environ['JORMUNGANDR_TIMING_SPANS'] = 'True'
+    os.environ.setdefault('JORMUNGANDR_LOG_LEVEL', 'WARNING')
+    return sockets
+
+
+def replay(app, urls, concurrency, nb_repeats):
+    """
+    :return: the response times and status codes of the requests by endpoint, and the total duration
+    """
+    from flask import request
+
+    @app.after_request
+    def add_endpoint(response):
+        response.headers[str('X-Benchmark-Endpoint')] = request.endpoint or 'unknown'
+        return response
+
+    results = collections.defaultdict(list)
+
+    def call(url):
+        client = app.test_client()
+        start = time.time()
+        response = client.get(url)
+        duration = time.time() - start
+        results[response.headers.get('X-Benchmark-Endpoint', 'unknown')].append((duration, response.status_code))
+
+    pool = gevent.pool.Pool(concurrency)
+    start = time.time()
+    for _ in range(nb_repeats):
+        for url in urls:
+            pool.spawn(call, url)
+    pool.join()
+    return results, time.time() - start
+
+
+def report(results, total_duration, stage_timings, krakens):
+    nb_requests = sum(len(r) for r in results.values())
+    print('{} requests in {:.1f}s: {:.1f} req/s'.format(nb_requests, total_duration, nb_requests / total_duration))
+    print()
+    print('{:<40} {:>7} {:>9} {:>9} {:>9} {:>9}  {}'.format('endpoint', 'count', 'req/s', 'p50 (ms)',
+                                                           'p95 (ms)', 'p99 (ms)', 'status codes'))
+    for endpoint, endpoint_results in sorted(results.items()):
+        durations = sorted(d * 1000 for d, _ in endpoint_results)
+        status_codes = collections.Counter(code for _, code in endpoint_results)
+        print('{:<40} {:>7} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}  {}'.format(
+            endpoint, len(durations), len(durations) / total_duration, percentile(durations, 50),
+            percentile(durations, 95), percentile(durations, 99), dict(status_codes)))
+
+    print()
+    print('timings of the steps (the percentiles are the upper bounds of the histogram buckets)')
+    for endpoint, spans in sorted(stage_timings.items()):
+        print(endpoint)
+        for name, stats in sorted(spans.items(), key=lambda s: -s[1]['count'] * (s[1]['mean'] or 0)):
+            print('    {:<36} {:>7} {:>9.1f} {:>9} {:>9} {:>9}'.format(
+                name, stats['count'], stats['mean'], stats['p50'], stats['p90'], stats['p99']))
+
+    print()
+    for region, kraken in sorted(krakens.items()):
+        print('calls to the fake kraken of {}: {}'.format(region, dict(kraken.nb_requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('access_log', help='file with the lines of the jormungandr.access logger')
+    parser.add_argument('--responses', help='directory of the recorded kraken responses, by region')
+    parser.add_argument('--regions', nargs='+', help='regions of the fake krakens (default: the regions of the log)')
+    parser.add_argument('--latency', type=float, default=10, help='latency of the fake krakens (ms)')
+    parser.add_argument('--jitter', type=float, default=0, help='random variation of the latency (ms)')
+    parser.add_argument('--concurrency', type=int, default=10, help='number of requests at the same time')
+    parser.add_argument('--repeat', type=int, default=1, help='number of replays of the log')
+    parser.add_argument('--record', nargs='+', default=[], metavar='REGION=SOCKET',
+                        help='record the responses of real krakens instead of serving the recorded ones')
+    args = parser.parse_args()
+
+    urls = parse_access_log(args.access_log)
+    if not urls:
+        parser.error('no request found in {}'.format(args.access_log))
+    regions = args.regions or regions_of(urls) or ['default']
+    record_sockets = dict(r.split('=', 1) for r in args.record)
+    if record_sockets and not args.responses:
+        parser.error('--record needs a --responses directory')
+
+    sockets_dir = tempfile.mkdtemp(prefix='jormungandr_replay_')
+    try:
+        sockets = configure_jormungandr(regions, sockets_dir)
+        context = zmq.Context()
+        krakens = {}
+        for region in regions:
+            responses_dir = os.path.join(args.responses, region) if args.responses else None
+            kraken = FakeKraken(context, sockets[region], responses_dir, args.latency, args.jitter,
+                                record_sockets.get(region))
+            gevent.spawn(kraken.run)
+            krakens[region] = kraken
+
+        from jormungandr import app, timing
+        results, total_duration = replay(app, urls, args.concurrency, args.repeat)
+        report(results, total_duration, timing.timings.stats(), krakens)
+    finally:
+        shutil.rmtree(sockets_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+micro benchmark of the similar journeys filter (scenarios/journey_filter.py)
+
+compares the pairwise comparison of all the journeys (the previous implementation)
+with the grouping of the journeys by signature, on merged responses of growing size
+
+usage (from source/jormungandr, with jormungandr in the PYTHONPATH):
+    python benchmarks/similar_journeys.py --sizes 50 100 200 400
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import itertools
+import random
+import time
+from navitiacommon import response_pb2
+from jormungandr.scenarios import journey_filter
+from jormungandr.scenarios.utils import compare
+
+
+def pairwise_filter(journeys, request, similar_journey_generator):
+    """
+    previous implementation of journey_filter._filter_similar_journeys
+    """
+    for j1, j2 in itertools.combinations(journeys, 2):
+        if journey_filter.to_be_deleted(j1) or journey_filter.to_be_deleted(j2):
+            continue
+        if compare(j1, j2, similar_journey_generator):
+            worst = journey_filter._get_worst_similar(j1, j2, request)
+            journey_filter.mark_as_dead(worst, 'duplicate_journey', 'similar_to_{other}'
+                                        .format(other=j1.internal_id if worst == j2 else j2.internal_id))
+
+
+def make_response(nb_journeys, nb_lines, nb_vjs_by_line):
+    response = response_pb2.Response()
+    for idx in range(nb_journeys):
+        journey = response.journeys.add()
+        journey.internal_id = str(idx)
+        journey.arrival_date_time = 1000 + random.randint(0, 3600)
+        journey.duration = random.randint(600, 3600)
+        walk = journey.sections.add()
+        walk.type = response_pb2.STREET_NETWORK
+        walk.street_network.mode = response_pb2.Walking
+        for _ in range(random.randint(1, 3)):
+            pt = journey.sections.add()
+            pt.type = response_pb2.PUBLIC_TRANSPORT
+            line = random.randrange(nb_lines)
+            pt.pt_display_informations.uris.line = 'line:{}'.format(line)
+            pt.pt_display_informations.uris.vehicle_journey = 'vj:{}:{}'.format(line,
+                                                                                random.randrange(nb_vjs_by_line))
+        walk = journey.sections.add()
+        walk.type = response_pb2.STREET_NETWORK
+        walk.street_network.mode = response_pb2.Walking
+    return response
+
+
+def timed(filter_func, response, generator):
+    journeys = list(response.journeys)
+    start = time.time()
+    filter_func(journeys, {}, generator)
+    duration = time.time() - start
+    return duration, [journey_filter.to_be_deleted(j) for j in journeys]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200, 400],
+                        help='number of journeys in the merged responses')
+    parser.add_argument('--nb-lines', type=int, default=5)
+    parser.add_argument('--nb-vjs-by-line', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    generators = [('vj', journey_filter.similar_journeys_vj_generator),
+                  ('line', journey_filter.similar_journeys_line_generator)]
+    print('{:>6} {:>6} {:>15} {:>15} {:>8} {:>6}'.format('size', 'filter', 'pairwise (ms)', 'grouped (ms)',
+                                                         'speedup', 'same'))
+    for size in args.sizes:
+        for name, generator in generators:
+            response = make_response(size, args.nb_lines, args.nb_vjs_by_line)
+            pairwise_response = response_pb2.Response()
+            pairwise_response.CopyFrom(response)
+
+            pairwise_time, pairwise_deleted = timed(pairwise_filter, pairwise_response, generator)
+            grouped_time, grouped_deleted = timed(journey_filter._filter_similar_journeys, response, generator)
+
+            print('{:>6} {:>6} {:>15.1f} {:>15.1f} {:>8.1f} {:>6}'.format(
+                size, name, 1000 * pairwise_time, 1000 * grouped_time,
+                pairwise_time / grouped_time if grouped_time else float('inf'),
+                str(pairwise_deleted == grouped_deleted)))
+
+
+if __name__ == '__main__':
+    main()
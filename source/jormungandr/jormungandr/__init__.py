@@ -69,7 +69,10 @@ rest_api = Api(app, catch_all_404s=True, serve_challenge_on_401=True)
 
 from navitiacommon.models import db
 db.init_app(app)
-cache = Cache(app, config=app.config['CACHE_CONFIGURATION'])
+from jormungandr.two_level_cache import TwoLevelCache
+cache = TwoLevelCache(Cache(app, config=app.config['CACHE_CONFIGURATION']),
+                      local_max_size=app.config['CACHE_CONFIGURATION'].get('LOCAL_CACHE_MAX_SIZE', 0),
+                      local_timeout=app.config['CACHE_CONFIGURATION'].get('LOCAL_CACHE_TIMEOUT', 10))
 
 if app.config['AUTOCOMPLETE_SYSTEMS'] is not None:
     global_autocomplete = {k: utils.create_object(v) for k, v in app.config['AUTOCOMPLETE_SYSTEMS'].items()}
@@ -77,6 +80,10 @@ else:
     from jormungandr.autocomplete.kraken import Kraken
     global_autocomplete = {'kraken': Kraken()}
 
+from jormungandr.autocomplete.cache import AutocompleteCache
+autocomplete_cache = AutocompleteCache(**app.config['AUTOCOMPLETE_CACHE']) \
+    if app.config['AUTOCOMPLETE_CACHE'] else None
+
 from jormungandr.instance_manager import InstanceManager
 
 i_manager = InstanceManager(instances_dir=app.config.get('INSTANCES_DIR', None),
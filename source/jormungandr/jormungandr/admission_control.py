@@ -0,0 +1,195 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from contextlib import contextmanager
+from gevent.lock import BoundedSemaphore
+from jormungandr.exceptions import TooManyRequests, ServiceOverloaded
+
+
+class ConcurrencyBudget(object):
+    """
+    max number of requests computed at the same time, the other requests wait in a bounded queue
+    """
+
+    def __init__(self, max_in_flight, max_queue_size):
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self._slots = BoundedSemaphore(max_in_flight)
+        self.nb_in_flight = 0
+        self.nb_queued = 0
+        self.nb_admitted = 0
+        self.nb_rejected = 0  # the queue was full
+        self.nb_timeouts = 0  # the request has waited too long in the queue
+
+    @property
+    def is_idle(self):
+        return self.nb_in_flight == 0 and self.nb_queued == 0
+
+    def acquire(self, timeout):
+        """
+        :param timeout: max time (in seconds) waiting in the queue
+        :return: True if the request can be computed, False if it has to be shed
+        """
+        if not self._slots.acquire(blocking=False):
+            if self.nb_queued >= self.max_queue_size:
+                self.nb_rejected += 1
+                return False
+            self.nb_queued += 1
+            try:
+                admitted = self._slots.acquire(timeout=max(timeout, 0))
+            finally:
+                self.nb_queued -= 1
+            if not admitted:
+                self.nb_timeouts += 1
+                return False
+        self.nb_in_flight += 1
+        self.nb_admitted += 1
+        return True
+
+    def release(self):
+        self.nb_in_flight -= 1
+        self._slots.release()
+
+    def stats(self):
+        return {
+            'max_in_flight': self.max_in_flight,
+            'max_queue_size': self.max_queue_size,
+            'nb_in_flight': self.nb_in_flight,
+            'nb_queued': self.nb_queued,
+            'nb_admitted': self.nb_admitted,
+            'nb_rejected': self.nb_rejected,
+            'nb_timeouts': self.nb_timeouts,
+        }
+
+
+class AdmissionController(object):
+    """
+    limit the work given to the krakens, to protect them from the load peaks and from the greedy clients
+
+    - each instance has a budget of requests dispatched at the same time,
+      the requests beyond are shed with a 503
+    - each token has a budget of requests computed at the same time (depending on its billing plan),
+      the requests beyond are shed with a 429
+
+    the requests over budget wait in a queue up to queue_timeout and are shed right away when the queue is full
+    """
+
+    def __init__(self, max_in_flight_per_instance=None, max_queue_size_per_instance=0,
+                 max_in_flight_per_token=None, max_queue_size_per_token=0, billing_plans=None, queue_timeout=1000):
+        """
+        :param billing_plans: max number of requests at the same time of the tokens of a billing plan,
+            by name of billing plan, they override max_in_flight_per_token
+        :param queue_timeout: max time (in milliseconds) spent in the queues
+        """
+        self.max_in_flight_per_instance = max_in_flight_per_instance
+        self.max_queue_size_per_instance = max_queue_size_per_instance
+        self.max_in_flight_per_token = max_in_flight_per_token
+        self.max_queue_size_per_token = max_queue_size_per_token
+        self.billing_plans = billing_plans or {}
+        self.queue_timeout = queue_timeout / 1000
+        self.instance_budgets = {}
+        self.token_budgets = {}  # only the tokens with requests in flight or queued are kept
+        self.nb_shed_instance = 0
+        self.nb_shed_token = 0
+
+    def _instance_budget(self, instance_name):
+        if not self.max_in_flight_per_instance:
+            return None
+        budget = self.instance_budgets.get(instance_name)
+        if budget is None:
+            budget = ConcurrencyBudget(self.max_in_flight_per_instance, self.max_queue_size_per_instance)
+            self.instance_budgets[instance_name] = budget
+        return budget
+
+    def _token_budget(self, token, billing_plan):
+        max_in_flight = self.billing_plans.get(billing_plan, self.max_in_flight_per_token)
+        if not token or not max_in_flight:
+            return None
+        budget = self.token_budgets.get(token)
+        if budget is None:
+            budget = ConcurrencyBudget(max_in_flight, self.max_queue_size_per_token)
+            self.token_budgets[token] = budget
+        return budget
+
+    @contextmanager
+    def admit_client(self, token, billing_plan=None):
+        """
+        take a slot in the budget of the token for the whole request
+
+        :raise TooManyRequests: if the token has too many requests in flight
+        """
+        budget = self._token_budget(token, billing_plan)
+        if budget is None:
+            yield
+            return
+        try:
+            if not budget.acquire(self.queue_timeout):
+                self.nb_shed_token += 1
+                raise TooManyRequests('Too many requests at the same time for this token, please retry later')
+            try:
+                yield
+            finally:
+                budget.release()
+        finally:
+            if budget.is_idle and self.token_budgets.get(token) is budget:
+                del self.token_budgets[token]
+
+    @contextmanager
+    def admit_dispatch(self, instance_name):
+        """
+        take a slot in the budget of the instance for a dispatch
+
+        :raise ServiceOverloaded: if the instance has too many requests in flight
+        """
+        budget = self._instance_budget(instance_name)
+        if budget is None:
+            yield
+            return
+        if not budget.acquire(self.queue_timeout):
+            self.nb_shed_instance += 1
+            raise ServiceOverloaded(instance_name)
+        try:
+            yield
+        finally:
+            budget.release()
+
+    def stats(self, instance_name=None):
+        stats = {
+            'nb_shed_instance': self.nb_shed_instance,
+            'nb_shed_token': self.nb_shed_token,
+            'nb_tokens_in_flight': len(self.token_budgets),
+        }
+        if instance_name in self.instance_budgets:
+            stats['instance'] = self.instance_budgets[instance_name].stats()
+        return stats
@@ -34,7 +34,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 import importlib
 from flask_restful.representations import json
 from flask import request, make_response
-from jormungandr import rest_api, app
+from jormungandr import rest_api, app, timing
 from jormungandr.index import index
 from jormungandr.modules_loader import ModulesLoader
 import ujson
@@ -69,11 +69,26 @@ def output_jsonp(data, code, headers=None):
 @rest_api.representation("text/json")
 @rest_api.representation("application/json")
 def output_json(data, code, headers=None):
-    resp = make_response(ujson.dumps(data), code)
+    with timing.span('serialization'):
+        resp = make_response(ujson.dumps(data), code)
     resp.headers.extend(headers or {})
     return resp
 
 
+if app.config.get('TIMING_SPANS'):
+    @app.before_request
+    def start_timing(*args, **kwargs):
+        timing.start_request()
+
+    @app.after_request
+    def end_timing(response, *args, **kwargs):
+        if request.endpoint:
+            server_timing = timing.end_request(request.endpoint, app.config.get('SERVER_TIMING_HEADER'))
+            if server_timing:
+                response.headers['Server-Timing'] = server_timing
+        return response
+
+
 @app.after_request
 def access_log(response, *args, **kwargs):
     logger = logging.getLogger('jormungandr.access')
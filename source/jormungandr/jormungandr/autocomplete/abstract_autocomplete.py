@@ -51,6 +51,12 @@ class AbstractAutocomplete(object):
     def geo_status(self, instance):
         pass
 
+    def stats(self, instance):
+        """
+        statistics of the autocomplete on the instance, for the status
+        """
+        return None
+
 
 class GeoStatusResponse(object):
     def __init__(self):
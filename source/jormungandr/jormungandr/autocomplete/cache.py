@@ -0,0 +1,193 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import copy
+import re
+import unicodedata
+from jormungandr.lru_cache import LruCache
+
+
+_MISSING = object()
+
+
+def normalize(text):
+    """
+    lower case, without accents and with only one space between the words
+
+    >>> normalize(' Gare  de l\\'Étoile ')
+    u"gare de l'etoile"
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def words(text):
+    return [w for w in re.split(r'\W+', normalize(text), flags=re.UNICODE) if w]
+
+
+def _place_words(place):
+    """
+    all the words a place can be found with: its name, the label and name of the embedded object
+    and the names of its administrative regions
+    """
+    texts = [place.get('name')]
+    embedded = place.get(place.get('embedded_type') or '') or {}
+    texts.append(embedded.get('label'))
+    texts.append(embedded.get('name'))
+    for admin in embedded.get('administrative_regions') or []:
+        texts.append(admin.get('name'))
+    return set(w for t in texts if t for w in words(t))
+
+
+def _match(place, query_words):
+    place_words = _place_words(place)
+    return all(any(w.startswith(q) for w in place_words) for q in query_words)
+
+
+class AutocompleteCache(object):
+    """
+    in-process cache of the autocomplete responses
+
+    Typing users send a /places request for each keystroke ('gar', 'gare', 'gare d'...).
+    The responses are cached for a short time, the key is made of the normalized query,
+    the types, the count, the 'from' coordinate rounded to coord_precision decimals, the user shape...
+
+    With prefix_reuse, a query can also be answered from the cached response of a shorter query
+    ('gare d' from 'gare') if this response was not truncated (less places than count):
+    the longer query can only find a subset of these places, they are filtered on the words of the query.
+    The places found only by a fuzzy search or through a synonym can be missed, thus when the filtering
+    finds nothing the autocomplete is called.
+    """
+
+    def __init__(self, max_size=10000, ttl=60, coord_precision=2, prefix_reuse=True, min_prefix_length=3):
+        """
+        :param ttl: time to live of the responses in seconds
+        :param coord_precision: number of decimals of the 'from' coordinate kept in the key
+        :param prefix_reuse: answer the queries by filtering the response of a shorter query
+        :param min_prefix_length: length of the shortest query whose response can be reused
+        """
+        self.coord_precision = coord_precision
+        self.prefix_reuse = prefix_reuse
+        self.min_prefix_length = min_prefix_length
+        self.responses = LruCache(max_size=max_size, ttl=ttl)
+        self.nb_hits = 0
+        self.nb_prefix_hits = 0
+        self.nb_misses = 0
+
+    def _coarse_coord(self, coord):
+        if not coord:
+            return None
+        try:
+            lon, lat = coord.split(';')
+            return round(float(lon), self.coord_precision), round(float(lat), self.coord_precision)
+        except ValueError:
+            return coord
+
+    def _context(self, autocomplete, request, instance):
+        """
+        everything but the query
+        """
+        return (id(autocomplete),
+                instance.name if instance else None,
+                getattr(instance, 'publication_date', None),
+                tuple(sorted(request.get('type[]') or [])),
+                request.get('count'),
+                request.get('search_type'),
+                tuple(sorted(request.get('admin_uri[]') or [])),
+                request.get('depth'),
+                request.get('disable_geojson'),
+                self._coarse_coord(request.get('from')),
+                request['shape'].hash if request.get('shape') else None)
+
+    def _from_prefix(self, context, q, count):
+        for length in range(len(q) - 1, self.min_prefix_length - 1, -1):
+            prefix = q[:length].rstrip()
+            if len(prefix) != length:
+                # 'gare ' is the same query as 'gare'
+                continue
+            response = self.responses.get((context, prefix), _MISSING)
+            if response is _MISSING:
+                continue
+            cached_places = response.get('places') or []
+            if len(cached_places) >= count:
+                # the response is truncated, the longer query can find places not in it
+                return None
+            query_words = words(q)
+            places = [p for p in cached_places if _match(p, query_words)]
+            if not places:
+                return None
+            filtered = copy.deepcopy(response)
+            filtered['places'] = copy.deepcopy(places)
+            return filtered
+        return None
+
+    def get(self, autocomplete, request, instance):
+        """
+        call autocomplete.get(request, instance) unless the response can be found in the cache
+        """
+        context = self._context(autocomplete, request, instance)
+        q = normalize(request['q'])
+        response = self.responses.get((context, q), _MISSING)
+        if response is not _MISSING:
+            self.nb_hits += 1
+            return copy.deepcopy(response)
+
+        if self.prefix_reuse and request.get('count'):
+            response = self._from_prefix(context, q, request['count'])
+            if response is not None:
+                self.nb_prefix_hits += 1
+                self.responses.set((context, q), response)
+                return copy.deepcopy(response)
+
+        self.nb_misses += 1
+        response = autocomplete.get(request, instance)
+        if isinstance(response, tuple) or response.get('error'):
+            # the errors are not cached
+            return response
+        # the response is copied since the caller can modify it
+        self.responses.set((context, q), copy.deepcopy(response))
+        return response
+
+    def stats(self):
+        nb_calls = self.nb_hits + self.nb_prefix_hits + self.nb_misses
+        return {
+            'size': len(self.responses),
+            'max_size': self.responses.max_size,
+            'ttl': self.responses.ttl,
+            'nb_hits': self.nb_hits,
+            'nb_prefix_hits': self.nb_prefix_hits,
+            'nb_misses': self.nb_misses,
+            'nb_evictions': self.responses.nb_evictions,
+            'hit_rate': float(self.nb_hits + self.nb_prefix_hits) / nb_calls if nb_calls else None,
+        }
@@ -33,6 +33,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 import logging
 from jormungandr.autocomplete.abstract_autocomplete import AbstractAutocomplete
 import requests
+from jormungandr.http_client import HttpClient
 from jormungandr.exceptions import TechnicalError, UnknownObject
 
 
@@ -52,6 +53,7 @@ class GeocodeJson(AbstractAutocomplete):
     def __init__(self, **kwargs):
         self.host = kwargs.get('host')
         self.timeout = kwargs.get('timeout', 10)
+        self.http_client = HttpClient('bragi', **kwargs.get('http_client', {}))
 
     @staticmethod
     def call_bragi(url, method, **kwargs):
@@ -136,10 +138,10 @@ class GeocodeJson(AbstractAutocomplete):
 
         url = self.make_url('autocomplete')
         kwargs = {"params": params, "timeout": self.timeout}
-        method = requests.get
+        method = self.http_client.get
         if shape:
-            kwargs["json"] = {"shape": shape}
-            method = requests.post
+            kwargs["json"] = {"shape": shape.geojson}
+            method = self.http_client.post
 
         raw_response = self.call_bragi(url, method, **kwargs)
 
@@ -161,6 +163,6 @@ class GeocodeJson(AbstractAutocomplete):
         params = self.basic_params(instance)
 
         url = self.make_url('features', uri)
-        raw_response = self.call_bragi(url, requests.get, timeout=self.timeout, params=params)
+        raw_response = self.call_bragi(url, self.http_client.get, timeout=self.timeout, params=params)
 
         return self.response_marshaler(raw_response, uri)
@@ -34,6 +34,8 @@ from jormungandr.scenarios.utils import build_pagination, pb_type
 from jormungandr.interfaces.v1.fields import NonNullList, place, NonNullNested, PbField, error, feed_publisher,\
     disruption_marshaller
 from flask.ext.restful import marshal_with, fields, abort
+from flask import g, copy_current_request_context
+import gevent
 import navitiacommon.request_pb2 as request_pb2
 import navitiacommon.type_pb2 as type_pb2
 from jormungandr.utils import date_to_timestamp
@@ -48,6 +50,79 @@ places = {
 
 
 class Kraken(AbstractAutocomplete):
+    """
+    autocomplete of the kraken
+
+    when the prefix search (search_type 0) finds nothing, the kraken is asked again with a fuzzier search
+    (search_type 1).
+    With speculative_fallback, both searches are sent at the same time for the queries likely to need the second
+    one: the queries with many words and all the queries of an instance whose fallback rate is high.
+    """
+
+    def __init__(self, speculative_fallback=False, min_nb_words=3, fallback_rate_threshold=0.3,
+                 min_nb_queries=50):
+        """
+        :param min_nb_words: queries with at least this number of words are speculated
+        :param fallback_rate_threshold: all the queries are speculated when the fallback rate of the instance
+            is above this threshold
+        :param min_nb_queries: number of queries of an instance before its fallback rate is used
+        """
+        self.speculative_fallback = speculative_fallback
+        self.min_nb_words = min_nb_words
+        self.fallback_rate_threshold = fallback_rate_threshold
+        self.min_nb_queries = min_nb_queries
+        self.fallback_stats = {}  # instance name -> FallbackStats
+
+    def _fallback_stats(self, instance):
+        stats = self.fallback_stats.get(instance.name)
+        if stats is None:
+            stats = self.fallback_stats[instance.name] = FallbackStats()
+        return stats
+
+    def _is_speculated(self, query, stats):
+        if not self.speculative_fallback:
+            return False
+        if len(query.split()) >= self.min_nb_words:
+            return True
+        return stats.nb_queries >= self.min_nb_queries and stats.fallback_rate >= self.fallback_rate_threshold
+
+    @staticmethod
+    def _send_and_receive_in_greenlet(instance, req, request_g):
+        g.__dict__.update(request_g)
+        return instance.send_and_receive(req)
+
+    def _search(self, req, request, instance):
+        """
+        :return: the response of the prefix search if it has places, the response of the fuzzy search otherwise
+        """
+        stats = self._fallback_stats(instance)
+        fuzzy_req = request_pb2.Request()
+        fuzzy_req.CopyFrom(req)
+        fuzzy_req.places.search_type = 1
+
+        if not self._is_speculated(request['q'], stats):
+            resp = instance.send_and_receive(req)
+            is_fallback = len(resp.places) == 0
+            if is_fallback:
+                resp = instance.send_and_receive(fuzzy_req)
+            stats.add(is_fallback)
+            return resp
+
+        # both searches are sent, the fuzzy search is used only if the prefix search finds nothing
+        send_and_receive = copy_current_request_context(self._send_and_receive_in_greenlet)
+        request_g = dict(g.__dict__)
+        fuzzy_future = gevent.spawn(send_and_receive, instance, fuzzy_req, request_g)
+        try:
+            resp = instance.send_and_receive(req)
+        except Exception:
+            fuzzy_future.kill(block=False)
+            raise
+        is_fallback = len(resp.places) == 0
+        stats.add(is_fallback, speculated=True)
+        if not is_fallback:
+            # the response of the fuzzy search is not needed, it is dropped when it arrives
+            return resp
+        return fuzzy_future.get()
 
     @marshal_with(places)
     def get(self, request, instance):
@@ -70,10 +145,9 @@ class Kraken(AbstractAutocomplete):
             for admin_uri in request["admin_uri[]"]:
                 req.places.admin_uris.append(admin_uri)
 
-        resp = instance.send_and_receive(req)
-
-        if len(resp.places) == 0 and request['search_type'] == 0:
-            req.places.search_type = 1
+        if request['search_type'] == 0:
+            resp = self._search(req, request, instance)
+        else:
             resp = instance.send_and_receive(req)
         build_pagination(request, resp)
         return resp
@@ -101,3 +175,42 @@ class Kraken(AbstractAutocomplete):
         req.place_uri.uri = uri
         req._current_datetime = date_to_timestamp(current_datetime)
         return instance.send_and_receive(req)
+
+    def stats(self, instance):
+        stats = self.fallback_stats.get(instance.name)
+        if stats is None:
+            return None
+        return stats.stats()
+
+
+class FallbackStats(object):
+    """
+    how often the fuzzy search is needed on an instance
+    """
+
+    def __init__(self, ewma_alpha=0.05):
+        self.ewma_alpha = ewma_alpha
+        self.fallback_rate = 0.  # exponentially weighted moving average, to follow the changes of the queries
+        self.nb_queries = 0
+        self.nb_fallbacks = 0
+        self.nb_speculated = 0
+        self.nb_useful_speculations = 0
+
+    def add(self, is_fallback, speculated=False):
+        self.nb_queries += 1
+        self.fallback_rate = self.ewma_alpha * is_fallback + (1 - self.ewma_alpha) * self.fallback_rate
+        if is_fallback:
+            self.nb_fallbacks += 1
+        if speculated:
+            self.nb_speculated += 1
+            if is_fallback:
+                self.nb_useful_speculations += 1
+
+    def stats(self):
+        return {
+            'nb_queries': self.nb_queries,
+            'nb_fallbacks': self.nb_fallbacks,
+            'fallback_rate': self.fallback_rate,
+            'nb_speculated': self.nb_speculated,
+            'nb_useful_speculations': self.nb_useful_speculations,
+        }
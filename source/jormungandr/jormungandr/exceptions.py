@@ -133,6 +133,23 @@ class TechnicalError(HTTPException):
         self.code = 500
 
 
+class TooManyRequests(HTTPException):
+
+    def __init__(self, msg):
+        super(TooManyRequests, self).__init__()
+        self.data = format_error("too_many_requests", msg)
+        self.code = 429
+
+
+class ServiceOverloaded(HTTPException):
+
+    def __init__(self, region):
+        super(ServiceOverloaded, self).__init__()
+        error = 'The region {} is overloaded, please retry later'.format(region)
+        self.data = format_error("service_overloaded", error)
+        self.code = 503
+
+
 class ConfigException(Exception):
     def __init__(self, arg):
         super(ConfigException, self).__init__(arg)
@@ -0,0 +1,74 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from bisect import bisect_right
+from shapely import geometry
+from shapely.prepared import prep
+
+
+class GeometriesIndex(object):
+    """
+    index of the shapes of the instances, to find the instances containing a point
+
+    the shapes are prepared (a prepared geometry is much faster for repeated 'contains' calls)
+    and sorted by the west side of their bounding box.
+    For a point we only test the shapes whose bounding box contains the point.
+
+    The index is rebuilt from scratch when a shape changes, this happens only when a kraken loads new data.
+    """
+
+    def __init__(self):
+        # the entries (min_x, min_y, max_x, max_y, prepared shape, name) sorted by min_x and the list of the min_x
+        # they are replaced together to be consistent for the greenlets reading the index
+        self._index = ([], [])
+
+    def __len__(self):
+        return len(self._index[0])
+
+    def update(self, shapes):
+        """
+        :param shapes: iterable of (name, shape), the empty shapes are ignored
+        """
+        entries = sorted((shape.bounds + (prep(shape), name) for name, shape in shapes if shape and not shape.is_empty),
+                         key=lambda e: e[0])
+        self._index = (entries, [e[0] for e in entries])
+
+    def find(self, lon, lat):
+        """
+        :return: the names of the shapes containing the point
+        """
+        entries, min_xs = self._index
+        point = geometry.Point(lon, lat)
+        return [name for _, min_y, max_x, max_y, prepared, name in entries[:bisect_right(min_xs, lon)]
+                if lon <= max_x and min_y <= lat <= max_y and prepared.contains(point)]
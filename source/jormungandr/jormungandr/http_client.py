@@ -0,0 +1,118 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from jormungandr import app
+
+
+class HttpClient(object):
+    """
+    http client used by a connector to call its external service
+
+    With keep_alive the connections are kept in a pool (a requests.Session with its own urllib3 pool),
+    so we don't pay a TCP (and TLS) handshake at each call.
+    The pool keeps at most max_connections_per_host connections to each host. With block_when_full
+    the greenlets wait for a free connection instead of opening a connection that will not be kept.
+    Without keep_alive each call opens a new connection, through requests.get/post.
+
+    Without compression, the service is asked not to compress its responses
+    (some services are faster to answer than to compress).
+
+    The number of calls, their duration and the size of the responses are kept for the status.
+    The default parameters are in the HTTP_CLIENT setting, they can be overridden for each connector.
+    """
+
+    def __init__(self, name, keep_alive=None, max_connections_per_host=None, block_when_full=None,
+                 compression=None):
+        config = app.config.get('HTTP_CLIENT') or {}
+        self.name = name
+        self.keep_alive = keep_alive if keep_alive is not None else config.get('keep_alive', False)
+        self.max_connections_per_host = max_connections_per_host or config.get('max_connections_per_host', 10)
+        self.block_when_full = block_when_full if block_when_full is not None \
+            else config.get('block_when_full', False)
+        self.compression = compression if compression is not None else config.get('compression', True)
+        self.session = None
+        if self.keep_alive:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.max_connections_per_host, pool_block=self.block_when_full)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        self.nb_calls = 0
+        self.nb_errors = 0
+        self.total_duration = 0.
+        self.max_duration = 0.
+        self.total_size = 0
+
+    def __repr__(self):
+        return '<HttpClient {}>'.format(self.name)
+
+    def get(self, url, **kwargs):
+        return self.request('get', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('post', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        if not self.compression:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **{'Accept-Encoding': 'identity'})
+        start = time.time()
+        try:
+            if self.session:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                response = getattr(requests, method)(url, **kwargs)
+            self.total_size += len(getattr(response, 'content', None) or b'')
+            return response
+        except Exception:
+            self.nb_errors += 1
+            raise
+        finally:
+            duration = time.time() - start
+            self.nb_calls += 1
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+
+    def stats(self):
+        return {
+            'keep_alive': self.keep_alive,
+            'max_connections_per_host': self.max_connections_per_host,
+            'compression': self.compression,
+            'nb_calls': self.nb_calls,
+            'nb_errors': self.nb_errors,
+            'mean_duration': self.total_duration / self.nb_calls if self.nb_calls else None,
+            'max_duration': self.max_duration,
+            'mean_size': self.total_size / (self.nb_calls - self.nb_errors) if self.nb_calls > self.nb_errors else None,
+        }
@@ -31,20 +31,23 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 from contextlib import contextmanager
-import queue
 from threading import Lock
 from flask.ext.restful import abort
 from zmq import green as zmq
 
 from jormungandr.exceptions import TechnicalError
 from navitiacommon import response_pb2, request_pb2, type_pb2
-from navitiacommon.default_values import get_value_or_default
 from jormungandr.timezone import set_request_instance_timezone
 import logging
 from .exceptions import DeadSocketException
+from jormungandr.zmq_socket_pool import ZmqSocketPool
+from jormungandr.kraken_endpoints import KrakenEndpoints
+from jormungandr.journey_cache import JourneyResponseCache
+from jormungandr.street_network_cache import StreetNetworkCache
+from jormungandr.instance_parameters import InstanceParameters
 from navitiacommon import models
 from importlib import import_module
-from jormungandr import cache, app, utils, global_autocomplete
+from jormungandr import cache, app, utils, global_autocomplete, timing
 from shapely import wkt
 from shapely.geos import ReadingError
 from shapely import geometry
@@ -52,7 +55,9 @@ from flask import g
 import flask
 import pybreaker
 from jormungandr import georef, planner, schedule, realtime_schedule, ptref, street_network
+from jormungandr.protobuf_to_dict import protobuf_to_dict
 import itertools
+import time
 
 type_to_pttype = {
       "stop_area": request_pb2.PlaceCodeRequest.StopArea,
@@ -67,11 +72,6 @@ type_to_pttype = {
 
 STREET_NETWORK_MODES = ('walking', 'car', 'bss', 'bike')
 
-@app.before_request
-def _init_g():
-    g.instances_model = {}
-
-
 # For street network modes that are not set in the given config file,
 # we set kraken as their default engine
 def _set_default_street_network_config(street_network_configs):
@@ -96,10 +96,29 @@ class Instance(object):
                  street_network_configurations,
                  realtime_proxies_configuration,
                  zmq_socket_type,
-                 autocomplete_type):
+                 autocomplete_type,
+                 zmq_socket_pool_size=None,
+                 journey_response_cache_configuration=None,
+                 street_network_cache_configuration=None,
+                 kraken_hedging_configuration=None):
+        """
+        :param zmq_socket: socket of the kraken, or list of the sockets of the replicas of the kraken
+        """
         self.geom = None
-        self._sockets = queue.Queue()
-        self.socket_path = zmq_socket
+        self.on_geom_update = None  # function called when the shape of the instance has changed
+        zmq_socket_pool_size = zmq_socket_pool_size or app.config['ZMQ_SOCKET_POOL_SIZE']
+        self.socket_pool = None
+        self.kraken_endpoints = None
+        if isinstance(zmq_socket, list) and len(zmq_socket) > 1:
+            self.socket_path = ','.join(zmq_socket)
+            kraken_hedging_configuration = kraken_hedging_configuration or app.config.get('KRAKEN_HEDGING') or {}
+            self.kraken_endpoints = KrakenEndpoints(context, zmq_socket, zmq_socket_pool_size,
+                                                    app.config['CIRCUIT_BREAKER_MAX_KRAKEN_ENDPOINT_FAIL'],
+                                                    app.config['CIRCUIT_BREAKER_KRAKEN_ENDPOINT_TIMEOUT_S'],
+                                                    **kraken_hedging_configuration)
+        else:
+            self.socket_path = zmq_socket[0] if isinstance(zmq_socket, list) else zmq_socket
+            self.socket_pool = ZmqSocketPool(context, self.socket_path, max_size=zmq_socket_pool_size)
         self._scenario = None
         self._scenario_name = None
         self.lock = Lock()
@@ -108,6 +127,9 @@ class Instance(object):
         self.timezone = None  # timezone will be fetched from the kraken
         self.publication_date = -1
         self.is_initialized = False #kraken hasn't been called yet we don't have geom nor timezone
+        # the last metadatas of the kraken (served by /coverage) and the date they have been fetched
+        self.metadatas = None
+        self.metadatas_updated_at = None
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_INSTANCE_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_INSTANCE_TIMEOUT_S'])
         self.georef = georef.Kraken(self)
@@ -128,11 +150,23 @@ class Instance(object):
 
         self.zmq_socket_type = zmq_socket_type
 
+        self._parameters = None
+        self.parameters_timeout = app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300)
+
+        journey_response_cache_configuration = journey_response_cache_configuration or \
+                                               app.config.get('JOURNEY_RESPONSE_CACHE')
+        self.journey_response_cache = None
+        if journey_response_cache_configuration:
+            self.journey_response_cache = JourneyResponseCache(self, **journey_response_cache_configuration)
+
+        street_network_cache_configuration = street_network_cache_configuration or \
+                                             app.config.get('STREET_NETWORK_CACHE')
+        self.street_network_cache = None
+        if street_network_cache_configuration:
+            self.street_network_cache = StreetNetworkCache(self, **street_network_cache_configuration)
 
     def get_models(self):
-        if self.name not in g.instances_model:
-            g.instances_model[self.name] = self._get_models()
-        return g.instances_model[self.name]
+        return self._get_models()
 
     @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
     def _get_models(self):
@@ -140,6 +174,26 @@ class Instance(object):
             return None
         return models.Instance.get_by_name(self.name)
 
+    @property
+    def parameters(self):
+        """
+        snapshot of the parameters of the instance, read without lock by the requests
+
+        the snapshot is refreshed by the instance manager in the background,
+        it is rebuilt here only if it has not been refreshed in time
+        """
+        parameters = self._parameters
+        if parameters is None or parameters.is_outdated(self.parameters_timeout):
+            parameters = self.refresh_parameters()
+        return parameters
+
+    def refresh_parameters(self):
+        """
+        build a new snapshot of the parameters from the database
+        """
+        self._parameters = InstanceParameters.from_model(self.name, self.get_models())
+        return self._parameters
+
     def scenario(self, override_scenario=None):
         if hasattr(g, 'scenario') and g.scenario:
             """
@@ -159,8 +213,7 @@ class Instance(object):
             g.scenario = scenario
             return scenario
 
-        instance_db = self.get_models()
-        scenario_name = instance_db.scenario if instance_db else 'new_default'
+        scenario_name = self.parameters.scenario
         if not self._scenario or scenario_name != self._scenario_name:
             logger = logging.getLogger(__name__)
             logger.info('loading of scenario %s for instance %s', scenario_name, self.name)
@@ -174,182 +227,152 @@ class Instance(object):
 
     @property
     def journey_order(self):
-        instance_db = self.get_models()
-        return get_value_or_default('journey_order', instance_db, self.name)
+        return self.parameters.journey_order
 
     @property
     def max_walking_duration_to_pt(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_walking_duration_to_pt', instance_db, self.name)
+        return self.parameters.max_walking_duration_to_pt
 
     @property
     def max_bss_duration_to_pt(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_bss_duration_to_pt', instance_db, self.name)
+        return self.parameters.max_bss_duration_to_pt
 
     @property
     def max_bike_duration_to_pt(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_bike_duration_to_pt', instance_db, self.name)
+        return self.parameters.max_bike_duration_to_pt
 
     @property
     def max_car_duration_to_pt(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_car_duration_to_pt', instance_db, self.name)
+        return self.parameters.max_car_duration_to_pt
 
     @property
     def walking_speed(self):
-        instance_db = self.get_models()
-        return get_value_or_default('walking_speed', instance_db, self.name)
+        return self.parameters.walking_speed
 
     @property
     def bss_speed(self):
-        instance_db = self.get_models()
-        return get_value_or_default('bss_speed', instance_db, self.name)
+        return self.parameters.bss_speed
 
     @property
     def bike_speed(self):
-        instance_db = self.get_models()
-        return get_value_or_default('bike_speed', instance_db, self.name)
+        return self.parameters.bike_speed
 
     @property
     def car_speed(self):
-        instance_db = self.get_models()
-        return get_value_or_default('car_speed', instance_db, self.name)
+        return self.parameters.car_speed
 
     @property
     def max_nb_transfers(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_nb_transfers', instance_db, self.name)
+        return self.parameters.max_nb_transfers
 
     @property
     def min_tc_with_car(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_tc_with_car', instance_db, self.name)
+        return self.parameters.min_tc_with_car
 
     @property
     def min_tc_with_bike(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_tc_with_bike', instance_db, self.name)
+        return self.parameters.min_tc_with_bike
 
     @property
     def min_tc_with_bss(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_tc_with_bss', instance_db, self.name)
+        return self.parameters.min_tc_with_bss
 
     @property
     def min_bike(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_bike', instance_db, self.name)
+        return self.parameters.min_bike
 
     @property
     def min_bss(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_bss', instance_db, self.name)
+        return self.parameters.min_bss
 
     @property
     def min_car(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_car', instance_db, self.name)
+        return self.parameters.min_car
 
     @property
     def factor_too_long_journey(self):
-        instance_db = self.get_models()
-        return get_value_or_default('factor_too_long_journey', instance_db, self.name)
+        return self.parameters.factor_too_long_journey
 
     @property
     def successive_physical_mode_to_limit_id(self):
-        instance_db = self.get_models()
-        return get_value_or_default('successive_physical_mode_to_limit_id', instance_db, self.name)
+        return self.parameters.successive_physical_mode_to_limit_id
 
     @property
     def min_duration_too_long_journey(self):
-        instance_db = self.get_models()
-        return get_value_or_default('min_duration_too_long_journey', instance_db, self.name)
+        return self.parameters.min_duration_too_long_journey
 
     @property
     def max_duration_criteria(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_duration_criteria', instance_db, self.name)
+        return self.parameters.max_duration_criteria
 
     @property
     def max_duration_fallback_mode(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_duration_fallback_mode', instance_db, self.name)
+        return self.parameters.max_duration_fallback_mode
 
     @property
     def priority(self):
-        instance_db = self.get_models()
-        return get_value_or_default('priority', instance_db, self.name)
+        return self.parameters.priority
 
     @property
     def bss_provider(self):
-        instance_db = self.get_models()
-        return get_value_or_default('bss_provider', instance_db, self.name)
+        return self.parameters.bss_provider
 
     @property
     def max_additional_connections(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_additional_connections', instance_db, self.name)
+        return self.parameters.max_additional_connections
 
     @property
     def is_free(self):
-        instance_db = self.get_models()
-        if not instance_db:
-            return False
-        else:
-            return instance_db.is_free
+        return self.parameters.is_free
 
     @property
     def is_open_data(self):
-        instance_db = self.get_models()
-        if not instance_db:
-            return False
-        else:
-            return instance_db.is_open_data
+        return self.parameters.is_open_data
 
     @property
     def max_duration(self):
-        instance_db = self.get_models()
-        return get_value_or_default('max_duration', instance_db, self.name)
+        return self.parameters.max_duration
 
     @property
     def walking_transfer_penalty(self):
-        instance_db = self.get_models()
-        return get_value_or_default('walking_transfer_penalty', instance_db, self.name)
+        return self.parameters.walking_transfer_penalty
 
     @property
     def night_bus_filter_max_factor(self):
-        instance_db = self.get_models()
-        return get_value_or_default('night_bus_filter_max_factor', instance_db, self.name)
+        return self.parameters.night_bus_filter_max_factor
 
     @property
     def night_bus_filter_base_factor(self):
-        instance_db = self.get_models()
-        return get_value_or_default('night_bus_filter_base_factor', instance_db, self.name)
+        return self.parameters.night_bus_filter_base_factor
 
     @contextmanager
     def socket(self, context):
-        socket = None
-        if self.zmq_socket_type == 'transient':
-            socket = context.socket(zmq.REQ)
-            socket.connect(self.socket_path)
-            try:
-                yield socket
-            finally:
-                if not socket.closed:
-                    socket.close()
-        else:
-            try:
-                socket = self._sockets.get(block=False)
-            except queue.Empty:
-                socket = context.socket(zmq.REQ)
-                socket.connect(self.socket_path)
-            try:
-                yield socket
-            finally:
-                if not socket.closed:
-                    self._sockets.put(socket)
+        """
+        transient REQ socket, used only when zmq_socket_type is 'transient'
+        """
+        socket = context.socket(zmq.REQ)
+        socket.connect(self.socket_path)
+        try:
+            yield socket
+        finally:
+            if not socket.closed:
+                socket.close()
+
+    def _zmq_send_and_receive(self, payload, timeout):
+        """
+        return the serialized response of the kraken, or None if the kraken did not respond in time
+        """
+        if self.kraken_endpoints:
+            return self.kraken_endpoints.send_and_receive(payload, timeout)
+        if self.zmq_socket_type != 'transient':
+            return self.socket_pool.send_and_receive(payload, timeout)
+        with self.socket(self.context) as socket:
+            socket.send(payload)
+            if socket.poll(timeout=timeout) > 0:
+                return socket.recv()
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.close()
+            return None
 
     def send_and_receive(self, *args, **kwargs):
         """
@@ -365,27 +388,31 @@ class Instance(object):
                          timeout=app.config.get('INSTANCE_TIMEOUT', 10000),
                          quiet=False,
                          **kwargs):
-        with self.socket(self.context) as socket:
-            try:
-                request.request_id = flask.request.id
-            except RuntimeError:
-                #we aren't in a flask context, so there is no request
-                if 'request_id' in kwargs:
-                    request.request_id = kwargs['request_id']
-            socket.send(request.SerializeToString())
-            if socket.poll(timeout=timeout) > 0:
-                pb = socket.recv()
-                resp = response_pb2.Response()
-                resp.ParseFromString(pb)
-                self.update_property(resp)#we update the timezone and geom of the instances at each request
-                return resp
-            else:
-                socket.setsockopt(zmq.LINGER, 0)
-                socket.close()
-                if not quiet:
-                    logger = logging.getLogger(__name__)
-                    logger.error('request on %s failed: %s', self.socket_path, unicode(request))
-                raise DeadSocketException(self.name, self.socket_path)
+        try:
+            request.request_id = flask.request.id
+        except RuntimeError:
+            #we aren't in a flask context, so there is no request
+            if 'request_id' in kwargs:
+                request.request_id = kwargs['request_id']
+        with timing.span('kraken.' + type_pb2.API.Name(request.requested_api).lower()):
+            pb = self._zmq_send_and_receive(request.SerializeToString(), timeout)
+        if pb is None:
+            if not quiet:
+                logger = logging.getLogger(__name__)
+                logger.error('request on %s failed: %s', self.socket_path, unicode(request))
+            raise DeadSocketException(self.name, self.socket_path)
+        resp = response_pb2.Response()
+        resp.ParseFromString(pb)
+        self.update_property(resp)#we update the timezone and geom of the instances at each request
+        return resp
+
+    def send_and_receive_journeys(self, request, **kwargs):
+        """
+        send a journeys request to kraken, through the journey response cache if it is activated
+        """
+        if self.journey_response_cache:
+            return self.journey_response_cache.send_and_receive(request, **kwargs)
+        return self.send_and_receive(request, **kwargs)
 
     def get_id(self, id_):
         """
@@ -449,6 +476,7 @@ class Instance(object):
         self.is_initialized = True
         if response.HasField(str("metadatas")) and response.publication_date != self.publication_date:
             logging.getLogger(__name__).debug('updating metadata for %s', self.name)
+            previous_geom = self.geom
             with self.lock as lock:
                 self.publication_date = response.publication_date
                 if response.metadatas.shape and response.metadatas.shape != "":
@@ -459,38 +487,65 @@ class Instance(object):
                 else:
                     self.geom = None
                 self.timezone = response.metadatas.timezone
+            if self.on_geom_update and self.geom is not previous_geom:
+                self.on_geom_update()
         set_request_instance_timezone(self)
 
-    def init(self):
+    def update_metadatas(self, use_breaker=True):
         """
-        Get and store variables of the instance.
-        Returns True if we need to clear the cache, False otherwise.
+        fetch the metadatas of the kraken, they are kept to be served by /coverage
+        Returns the response of the kraken, None if the kraken is dead.
         """
-        pub_date = self.publication_date
         req = request_pb2.Request()
         req.requested_api = type_pb2.METADATAS
         try:
-            #we use _send_and_receive to avoid the circuit breaker, we don't want fast fail on init :)
-            resp = self._send_and_receive(req, timeout=1000, quiet=True)
-            #the instance is automatically updated on a call
-            if self.publication_date != pub_date:
-                return True
+            if use_breaker:
+                resp = self.send_and_receive(req, timeout=1000)
+            else:
+                #we use _send_and_receive to avoid the circuit breaker, we don't want fast fail on init :)
+                resp = self._send_and_receive(req, timeout=1000, quiet=True)
+            metadatas = protobuf_to_dict(resp.metadatas)
         except DeadSocketException:
+            resp = None
+            metadatas = {
+                "status": "dead",
+                "error": {
+                    "code": "dead_socket",
+                    "value": "The region {} is dead".format(self.name)
+                }
+            }
+            if self.timezone:
+                # needed to display the dates of the region
+                metadatas['timezone'] = self.timezone
+        self.metadatas = metadatas
+        self.metadatas_updated_at = int(time.time())
+        return resp
+
+    def init(self):
+        """
+        Get and store variables of the instance.
+        Returns True if we need to clear the cache, False otherwise.
+        """
+        pub_date = self.publication_date
+        #the instance is automatically updated on a call
+        if self.update_metadatas(use_breaker=False) is None:
             #we don't do anything on error, a new session will be established to an available kraken on
             # the next request. We don't want to purge all our cache for a small error.
             logging.getLogger(__name__).debug('timeout on init for %s', self.name)
-        return False
+            return False
+        return self.publication_date != pub_date
 
     def get_street_network_routing_matrix(self, origins, destinations, mode, max_duration_to_pt, request, **kwargs):
         service = self.street_network_services.get(mode)
         if not service:
             return None
-        return service.get_street_network_routing_matrix(origins,
-                                                         destinations,
-                                                         mode,
-                                                         max_duration_to_pt,
-                                                         request,
-                                                         **kwargs)
+        with timing.span('street_network.routing_matrix'):
+            return service.get_street_network_routing_matrix(origins,
+                                                             destinations,
+                                                             mode,
+                                                             max_duration_to_pt,
+                                                             request,
+                                                             **kwargs)
 
     def direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, **kwargs):
         '''
@@ -499,12 +554,13 @@ class Instance(object):
         service = self.street_network_services.get(mode)
         if not service:
             return None
-        return service.direct_path(mode,
-                                   pt_object_origin,
-                                   pt_object_destination,
-                                   fallback_extremity,
-                                   request,
-                                   **kwargs)
+        with timing.span('street_network.direct_path'):
+            return service.direct_path(mode,
+                                       pt_object_origin,
+                                       pt_object_destination,
+                                       fallback_extremity,
+                                       request,
+                                       **kwargs)
 
     def get_autocomplete(self, requested_autocomplete):
         if not requested_autocomplete:
@@ -31,18 +31,20 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from flask import json
 
-from shapely import geometry
 import configparser
 from zmq import green as zmq
-from navitiacommon import type_pb2, request_pb2, models
+from navitiacommon import models
 import glob
 import logging
-from jormungandr.protobuf_to_dict import protobuf_to_dict
 from jormungandr.exceptions import ApiNotFound, RegionNotFound,\
-    DeadSocketException, InvalidArguments
-from jormungandr import authentication, cache, app
+    InvalidArguments
+from jormungandr import authentication, cache, app, timing
 from jormungandr.instance import Instance
+from jormungandr.geometries_index import GeometriesIndex
+from jormungandr.request_coalescer import RequestCoalescer
+from jormungandr.admission_control import AdmissionController
 import gevent
+import gevent.pool
 import os
 
 def instances_comparator(instance1, instance2):
@@ -73,6 +75,22 @@ def choose_best_instance(instances):
             best = i
     return best
 
+
+def id_prefix(object_id):
+    """
+    the navitia ids are like 'stop_area:OIF:SA:8768600', the object type is followed by the prefix of the dataset
+
+    >>> id_prefix('stop_area:OIF:SA:8768600')
+    u'stop_area:OIF'
+    >>> id_prefix('stopA') is None
+    True
+    """
+    parts = object_id.split(':', 2)
+    if len(parts) < 3:
+        return None
+    return ':'.join(parts[:2])
+
+
 class InstanceManager(object):
 
     """
@@ -92,6 +110,13 @@ class InstanceManager(object):
         self.start_ping = start_ping
         self.instances = {}
         self.context = zmq.Context()
+        self.geometries_index = GeometriesIndex()
+        # prefix of id -> names of the instances where ids with this prefix have been found
+        self.id_prefix_regions = {}
+        request_coalescing = app.config.get('REQUEST_COALESCING')
+        self.request_coalescer = RequestCoalescer(**request_coalescing) if request_coalescing else None
+        admission_control = app.config.get('ADMISSION_CONTROL')
+        self.admission_controller = AdmissionController(**admission_control) if admission_control else None
 
     def __repr__(self):
         return '<InstanceManager>'
@@ -103,7 +128,12 @@ class InstanceManager(object):
                             config.get('street_network'),
                             config.get('realtime_proxies', []),
                             config.get('zmq_socket_type', 'persistent'),
-                            config.get('default_autocomplete', 'kraken'))
+                            config.get('default_autocomplete', 'kraken'),
+                            config.get('zmq_socket_pool_size'),
+                            config.get('journey_response_cache'),
+                            config.get('street_network_cache'),
+                            config.get('kraken_hedging'))
+        instance.on_geom_update = self._update_geometries_index
         self.instances[instance.name] = instance
 
     def initialisation(self):
@@ -132,15 +162,20 @@ class InstanceManager(object):
                                                  'file %s', file_name)
                 continue
 
+        self._update_geometries_index()
+
         #we fetch the krakens metadata first
         # not on the ping thread to always have the data available (for the tests for example)
         self.init_kraken_instances()
 
         if self.start_ping:
-            gevent.spawn(self.thread_ping)
+            gevent.spawn(self.thread_ping, app.config['KRAKEN_METADATAS_REFRESH_PERIOD'])
+            gevent.spawn(self.thread_refresh_parameters, app.config['INSTANCE_PARAMETERS_REFRESH_PERIOD'])
 
     def _clear_cache(self):
         logging.getLogger(__name__).info('clear cache')
+        # the data of a kraken have changed, the datasets might have moved
+        self.id_prefix_regions = {}
         try:
             cache.delete_memoized(self._all_keys_of_id)
         except RuntimeError:
@@ -161,20 +196,30 @@ class InstanceManager(object):
 
         publication_date = instance.publication_date
         api_func = getattr(scenario, api)
-        resp = api_func(arguments, instance)
+        if self.admission_controller:
+            with self.admission_controller.admit_dispatch(instance_name):
+                resp = self._call_api(api_func, api, instance, arguments)
+        else:
+            resp = self._call_api(api_func, api, instance, arguments)
         if instance.publication_date != publication_date:
             self._clear_cache()
         return resp
 
-    def init_kraken_instances(self):
+    def _call_api(self, api_func, api, instance, arguments):
+        if self.request_coalescer and self.request_coalescer.handles(api):
+            return self.request_coalescer.call(api_func, api, instance, arguments)
+        return api_func(arguments, instance)
+
+    def init_kraken_instances(self, instances=None):
         """
-        Call all kraken instances (as found in the instances dir) and store it's metadata
+        Call the kraken instances (by default the ones not yet initialized) and store their metadata
+
+        the krakens are called concurrently on a pool of greenlets
         """
-        futures = []
-        purge_cache_needed = False
-        for instance in self.instances.values():
-            if not instance.is_initialized:
-                futures.append(gevent.spawn(instance.init))
+        if instances is None:
+            instances = [i for i in self.instances.values() if not i.is_initialized]
+        pool = gevent.pool.Pool(app.config['KRAKEN_METADATAS_POOL_SIZE'])
+        futures = [pool.spawn(instance.init) for instance in instances]
 
         gevent.wait(futures)
         for future in futures:
@@ -186,11 +231,30 @@ class InstanceManager(object):
     def thread_ping(self, timer=10):
         """
         fetch krakens metadata
+
+        once all the instances are initialized, the metadatas are still refreshed so that /coverage
+        can be served from memory
         """
-        while [i for i in self.instances.values() if not i.is_initialized]:
-            self.init_kraken_instances()
+        while True:
+            try:
+                self.init_kraken_instances(self.instances.values())
+            except Exception:
+                logging.getLogger(__name__).exception('impossible to refresh the metadatas of the krakens')
             gevent.sleep(timer)
-        logging.getLogger(__name__).debug('end of ping thread')
+
+    def thread_refresh_parameters(self, timer):
+        """
+        refresh the parameters of the instances, so that the requests do not have to wait for the database
+        """
+        while True:
+            gevent.sleep(timer)
+            with app.app_context():
+                for instance in self.instances.values():
+                    try:
+                        instance.refresh_parameters()
+                    except Exception:
+                        logging.getLogger(__name__).exception('impossible to refresh the parameters of %s',
+                                                              instance.name)
 
     def stop(self):
         if not self.thread_event.is_set():
@@ -219,21 +283,31 @@ class InstanceManager(object):
             except:
                 raise InvalidArguments(object_id)
             return self._all_keys_of_coord(flon, flat)
-        instances = []
-        futures = {}
-        for name, instance in self.instances.items():
-            futures[name] = gevent.spawn(instance.has_id, object_id)
-        for name, future in futures.items():
-            if future.get():
-                instances.append(name)
+        prefix = id_prefix(object_id) if app.config.get('USE_ID_PREFIX_REGIONS') else None
+        # we first ask the instances where ids with the same prefix have been found,
+        # we ask all the other instances only if none of them has the id
+        known_regions = self.id_prefix_regions.get(prefix, set()) if prefix else set()
+        instances = self._instances_with_id(object_id, [n for n in self.instances if n in known_regions])
+        if not instances:
+            instances = self._instances_with_id(object_id, [n for n in self.instances if n not in known_regions])
+            if prefix and instances:
+                self.id_prefix_regions.setdefault(prefix, set()).update(instances)
 
         if not instances:
             raise RegionNotFound(object_id=object_id)
         return instances
 
+    def _instances_with_id(self, object_id, names):
+        futures = {}
+        for name in names:
+            futures[name] = gevent.spawn(self.instances[name].has_id, object_id)
+        return [name for name, future in futures.items() if future.get()]
+
+    def _update_geometries_index(self):
+        self.geometries_index.update((i.name, i.geom) for i in self.instances.values())
+
     def _all_keys_of_coord(self, lon, lat):
-        p = geometry.Point(lon, lat)
-        instances = [i.name for i in self.instances.values() if i.has_point(p)]
+        instances = self.geometries_index.find(lon, lat)
         logging.getLogger(__name__).debug("all_keys_of_coord(self, {}, {}) returns {}".format(lon, lat, instances))
         if not instances:
             raise RegionNotFound(lon=lon, lat=lat)
@@ -251,6 +325,7 @@ class InstanceManager(object):
         else:
             return [i.name for i in valid_instances]
 
+    @timing.timed('region')
     def get_instances(self, name=None, lon=None, lat=None, object_id=None, api='ALL'):
         available_instances = []
         if name:
@@ -277,22 +352,18 @@ class InstanceManager(object):
             regions.append(self.get_region(region_str=region, lon=lon, lat=lat))
         else:
             regions = self.get_regions()
-        for key_region in regions:
-            req = request_pb2.Request()
-            req.requested_api = type_pb2.METADATAS
-            try:
-                resp = self.instances[key_region].send_and_receive(req, timeout=1000)
-                resp_dict = protobuf_to_dict(resp.metadatas)
-            except DeadSocketException:
-                resp_dict = {
-                    "status": "dead",
-                    "error": {
-                        "code": "dead_socket",
-                        "value": "The region {} is dead".format(key_region)
-                    }
-                }
+        instances = [self.instances[key_region] for key_region in regions]
+        # the metadatas are refreshed by the ping thread, without it we need to fetch them
+        outdated_instances = [i for i in instances if not self.start_ping or i.metadatas is None]
+        if outdated_instances:
+            pool = gevent.pool.Pool(app.config['KRAKEN_METADATAS_POOL_SIZE'])
+            gevent.wait([pool.spawn(instance.update_metadatas) for instance in outdated_instances])
+        for instance in instances:
+            # the dict is copied, the caller can modify it
+            resp_dict = dict(instance.metadatas)
             if resp_dict.get('status') == 'no_data' and not region and not lon and not lat:
                 continue
-            resp_dict['region_id'] = key_region
+            resp_dict['region_id'] = instance.name
+            resp_dict['metadatas_updated_at'] = instance.metadatas_updated_at
             response['regions'].append(resp_dict)
         return response
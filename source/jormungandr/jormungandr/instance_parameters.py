@@ -0,0 +1,94 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import namedtuple
+import time
+from navitiacommon.default_values import get_value_or_default
+
+# the parameters of an instance that can be overridden in the jormungandr database
+PARAMETERS = (
+    'journey_order',
+    'max_walking_duration_to_pt',
+    'max_bss_duration_to_pt',
+    'max_bike_duration_to_pt',
+    'max_car_duration_to_pt',
+    'walking_speed',
+    'bss_speed',
+    'bike_speed',
+    'car_speed',
+    'max_nb_transfers',
+    'min_tc_with_car',
+    'min_tc_with_bike',
+    'min_tc_with_bss',
+    'min_bike',
+    'min_bss',
+    'min_car',
+    'factor_too_long_journey',
+    'successive_physical_mode_to_limit_id',
+    'min_duration_too_long_journey',
+    'max_duration_criteria',
+    'max_duration_fallback_mode',
+    'priority',
+    'bss_provider',
+    'max_additional_connections',
+    'max_duration',
+    'walking_transfer_penalty',
+    'night_bus_filter_max_factor',
+    'night_bus_filter_base_factor',
+)
+
+
+class InstanceParameters(namedtuple('InstanceParameters',
+                                    PARAMETERS + ('scenario', 'is_free', 'is_open_data', 'creation_date'))):
+    """
+    immutable snapshot of the parameters of an instance
+
+    the snapshot is built once from the database model of the instance and shared by all the requests,
+    it is replaced by a new one when it is outdated
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_model(cls, instance_name, instance_db):
+        """
+        :param instance_db: the models.Instance of the instance, None if there is no database
+        """
+        values = {p: get_value_or_default(p, instance_db, instance_name) for p in PARAMETERS}
+        values['scenario'] = instance_db.scenario if instance_db else 'new_default'
+        values['is_free'] = instance_db.is_free if instance_db else False
+        values['is_open_data'] = instance_db.is_open_data if instance_db else False
+        values['creation_date'] = time.time()
+        return cls(**values)
+
+    def is_outdated(self, timeout):
+        return time.time() - self.creation_date > timeout
@@ -53,6 +53,7 @@ region_fields = {
         "value": fields.String
     }),
     "dataset_created_at": fields.String(),
+    "metadatas_updated_at": FieldDateTime(),
 
 }
 regions_fields = OrderedDict([
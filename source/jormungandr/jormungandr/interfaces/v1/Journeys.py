@@ -31,10 +31,11 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from functools import cmp_to_key
 import logging
-from flask import request, g
+import gevent
+from flask import request, g, current_app, copy_current_request_context
 from flask.ext.restful import fields, reqparse, marshal_with, abort
 from flask.ext.restful.inputs import boolean
-from jormungandr import i_manager, app
+from jormungandr import i_manager, app, timing
 from jormungandr.interfaces.v1.fields import disruption_marshaller, Links
 from jormungandr.interfaces.v1.fields import display_informations_vj, error, place,\
     PbField, stop_date_time, enum_type, NonNullList, NonNullNested,\
@@ -45,13 +46,13 @@ from jormungandr.interfaces.v1.ResourceUri import ResourceUri, complete_links
 from functools import wraps
 from jormungandr.interfaces.v1.fields import DateTime, Integer
 from jormungandr.timezone import set_request_timezone
-from jormungandr.interfaces.v1.make_links import create_external_link, create_internal_link
+from jormungandr.interfaces.v1.make_links import create_external_link, create_internal_link, collect_object_types
 from jormungandr.interfaces.v1.errors import ManageError
 from jormungandr.interfaces.argument import ArgumentDoc
 from jormungandr.interfaces.parsers import depth_argument, float_gt_0
 from operator import itemgetter
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 from navitiacommon import type_pb2, response_pb2
 from jormungandr.utils import date_to_timestamp
 from jormungandr.resources_utc import ResourceUtc
@@ -63,6 +64,7 @@ from navitiacommon.default_traveler_profile_params import acceptable_traveler_ty
 from navitiacommon import default_values
 from jormungandr.interfaces.v1.journey_common import JourneyCommon, dt_represents, compute_possible_region
 from jormungandr.parking_space_availability.bss.stands_manager import ManageStands
+from jormungandr.interfaces.v1.serializer import api, serialize_with
 
 
 f_datetime = "%Y%m%dT%H%M%S"
@@ -264,6 +266,25 @@ journeys = {
 }
 
 
+class marshal_journeys(object):
+    """
+    transform the protobuf response to a dict
+
+    with USE_SERPY the dedicated serpy serializer is used, it gives the same output
+    as the flask-restful fields but is much cheaper on large responses
+    """
+    def __call__(self, f):
+        marshalled = marshal_with(journeys)(f)
+        serialized = serialize_with(api.JourneysSerializer)(f)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if current_app.config.get('USE_SERPY', False):
+                return serialized(*args, **kwargs)
+            return marshalled(*args, **kwargs)
+        return wrapper
+
+
 class add_debug_info(object):
     """
     display info stored in g for the debug
@@ -346,6 +367,8 @@ class add_fare_links(object):
                         s['links'].append(create_internal_link(_type="ticket",
                                                                rel="tickets",
                                                                id=ticket_needed))
+                    if ticket_by_section[s["id"]]:
+                        collect_object_types(s)
 
             return objects
         return wrapper
@@ -388,12 +411,14 @@ class Journeys(JourneyCommon):
     @add_debug_info()
     @add_fare_links()
     @add_journey_href()
-    @marshal_with(journeys)
+    @marshal_journeys()
     @ManageError()
     def get(self, region=None, lon=None, lat=None, uri=None):
-        args = self.parsers['get'].parse_args()
+        with timing.span('parse_args'):
+            args = self.parsers['get'].parse_args()
         possible_regions = compute_possible_region(region, args)
-        args.update(self.parse_args(region, uri))
+        with timing.span('parse_args'):
+            args.update(self.parse_args(region, uri))
 
 
         #count override min_nb_journey or max_nb_journey
@@ -440,28 +465,13 @@ class Journeys(JourneyCommon):
 
         #we want to store the different errors
         responses = {}
-        for r in possible_regions:
-            self.region = r
-
-            set_request_timezone(self.region)
-
-            #we store the region in the 'g' object, which is local to a request
-            if args['debug']:
-                # In debug we store all queried region
-                if not hasattr(g, 'regions_called'):
-                    g.regions_called = []
-                g.regions_called.append(r)
-
-            # we save the original datetime for debuging purpose
-            original_datetime = args['original_datetime']
-            if original_datetime:
-                new_datetime = self.convert_to_utc(original_datetime)
-            else:
-                new_datetime = args['_current_datetime']
-            args['datetime'] = date_to_timestamp(new_datetime)
-
-            response = i_manager.dispatch(args, api, instance_name=self.region)
+        nb_concurrent_regions = app.config.get('JOURNEYS_NB_CONCURRENT_REGIONS', 1)
+        if nb_concurrent_regions > 1 and len(possible_regions) > 1:
+            region_responses = self._dispatch_concurrently(args, api, possible_regions, nb_concurrent_regions)
+        else:
+            region_responses = self._dispatch_sequentially(args, api, possible_regions)
 
+        for r, response in region_responses:
             if response.HasField(str('error')) \
                     and len(possible_regions) != 1:
                 logging.getLogger(__name__).debug("impossible to find journeys for the region {},"
@@ -501,3 +511,79 @@ class Journeys(JourneyCommon):
         er.message = "No journey found"
 
         return resp
+
+    def _register_called_region(self, args, region):
+        #we store the region in the 'g' object, which is local to a request
+        if args['debug']:
+            # In debug we store all queried region
+            if not hasattr(g, 'regions_called'):
+                g.regions_called = []
+            g.regions_called.append(region)
+
+    def _request_datetime(self, args):
+        # we save the original datetime for debuging purpose
+        original_datetime = args['original_datetime']
+        if original_datetime:
+            new_datetime = self.convert_to_utc(original_datetime)
+        else:
+            new_datetime = args['_current_datetime']
+        return date_to_timestamp(new_datetime)
+
+    def _dispatch_sequentially(self, args, api, regions):
+        """
+        dispatch the request to the regions one after the other,
+        the next region is called only if the caller asks for the next response
+        """
+        for r in regions:
+            self.region = r
+
+            set_request_timezone(self.region)
+            self._register_called_region(args, r)
+            args['datetime'] = self._request_datetime(args)
+
+            yield r, i_manager.dispatch(args, api, instance_name=self.region)
+
+    def _dispatch_concurrently(self, args, api, regions, nb_concurrent):
+        """
+        dispatch the request to the first nb_concurrent regions at the same time
+
+        the responses are given in the order of the regions, each time a response is consumed
+        the request is dispatched to the next region, so that nb_concurrent regions are computing.
+        When the caller stops consuming the responses, the pending computations are killed.
+        """
+        # as in the sequential mode, the timezone of the first region is used for the datetime
+        self.region = regions[0]
+        args['datetime'] = self._request_datetime(args)
+        request_g = dict(g.__dict__)
+        remaining_regions = iter(regions)
+        futures = deque()
+
+        def dispatch_next_region():
+            r = next(remaining_regions, None)
+            if r is None:
+                return
+            self._register_called_region(args, r)
+            dispatch = copy_current_request_context(self._dispatch_in_greenlet)
+            futures.append((r, gevent.spawn(dispatch, deepcopy(args), api, r, request_g)))
+
+        for _ in range(nb_concurrent):
+            dispatch_next_region()
+        try:
+            while futures:
+                r, future = futures.popleft()
+                response, region_g = future.get()
+                dispatch_next_region()
+                # the request state (timezone, scenario, ...) is now the one of the region
+                g.__dict__.update(region_g)
+                self.region = r
+                yield r, response
+        finally:
+            gevent.killall([future for _, future in futures], block=False)
+
+    @staticmethod
+    def _dispatch_in_greenlet(args, api, region, request_g):
+        # the greenlet has its own flask g, initialized with the state of the request
+        g.__dict__.update(request_g)
+        set_request_timezone(region)
+        response = i_manager.dispatch(args, api, instance_name=region)
+        return response, dict(g.__dict__)
@@ -33,7 +33,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from flask.ext.restful import fields, reqparse, abort
 from flask.ext.restful.inputs import boolean
 from flask.globals import g
-from jormungandr import i_manager, timezone, global_autocomplete, authentication
+from jormungandr import i_manager, timezone, global_autocomplete, autocomplete_cache, authentication, timing
 from jormungandr.interfaces.v1.fields import disruption_marshaller
 from jormungandr.interfaces.v1.fields import place, NonNullList, NonNullNested, PbField, pagination,\
                                              error, feed_publisher, Lit, ListLit, beta_endpoint
@@ -46,7 +46,7 @@ from jormungandr.exceptions import TechnicalError
 from flask_restful import marshal, marshal_with
 import datetime, re
 from jormungandr.parking_space_availability.bss.stands_manager import ManageStands
-import ujson as json
+from jormungandr.user_shape import get_user_shape
 from jormungandr.interfaces.parsers import coord_format, option_value
 from jormungandr.scenarios.utils import pb_type
 
@@ -343,7 +343,8 @@ class Places(ResourceUri):
                                          " used under the hood")
 
     def get(self, region=None, lon=None, lat=None):
-        args = self.parsers["get"].parse_args()
+        with timing.span('parse_args'):
+            args = self.parsers["get"].parse_args()
         self._register_interpreted_parameters(args)
         if len(args['q']) == 0:
             abort(400, message="Search word absent")
@@ -353,7 +354,9 @@ class Places(ResourceUri):
 
         user = authentication.get_user(token=authentication.get_token(), abort_if_no_token=False)
 
-        args['shape'] = json.loads(user.shape) if user and user.shape else None
+        # the shape is not a parameter of the request, it is kept out of the args registered for the stats
+        args = deepcopy(args)
+        args['shape'] = get_user_shape(user)
 
         # If a region or coords are asked, we do the search according
         # to the region, else, we do a word wide search
@@ -365,10 +368,12 @@ class Places(ResourceUri):
         else:
             authentication.check_access_to_global_places(user)
             autocomplete = global_autocomplete.get('bragi')
-            if autocomplete:
-                response = autocomplete.get(args, instance=None)
-            else:
+            if not autocomplete:
                 raise TechnicalError('world wide autocompletion service not available')
+            if autocomplete_cache:
+                response = autocomplete_cache.get(autocomplete, args, instance=None)
+            else:
+                response = autocomplete.get(args, instance=None)
         return response, 200
 
 
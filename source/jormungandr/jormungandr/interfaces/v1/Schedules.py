@@ -32,7 +32,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from flask.ext.restful import fields, marshal_with, reqparse
 from flask import request, g
-from jormungandr import i_manager, utils
+from jormungandr import i_manager, utils, timing
 from jormungandr import timezone
 from jormungandr.interfaces.v1.fields import stop_point, route, pagination, PbField, stop_date_time, \
     additional_informations, stop_time_properties_links, display_informations_vj, \
@@ -115,8 +115,35 @@ class Schedules(ResourceUri, ResourceUtc):
 
         self.method_decorators.append(complete_links(self))
 
+    def _set_datetimes(self, args):
+        """
+        set the datetimes of the request in UTC timestamps, by default the request is made from the current time
+        """
+        if not args["from_datetime"] and not args["until_datetime"]:
+            # no datetime given, default is the current time, and we activate the realtime
+            args['from_datetime'] = args['_current_datetime']
+            if args["calendar"]:  # if we have a calendar, the dt is only used for sorting, so 00:00 is fine
+                args['from_datetime'] = args['from_datetime'].replace(hour=0, minute=0)
+
+            if not args['data_freshness']:
+                args['data_freshness'] = 'realtime'
+        elif not args.get('calendar'):
+            #if a calendar is given all times will be given in local (because the calendar might span over dst)
+            if args['from_datetime']:
+                args['from_datetime'] = self.convert_to_utc(args['from_datetime'])
+            if args['until_datetime']:
+                args['until_datetime'] = self.convert_to_utc(args['until_datetime'])
+
+        # we save the original datetime for debuging purpose
+        args['original_datetime'] = args['from_datetime']
+        if args['from_datetime']:
+            args['from_datetime'] = utils.date_to_timestamp(args['from_datetime'])
+        if args['until_datetime']:
+            args['until_datetime'] = utils.date_to_timestamp(args['until_datetime'])
+
     def get(self, uri=None, region=None, lon=None, lat=None):
-        args = self.parsers["get"].parse_args()
+        with timing.span('parse_args'):
+            args = self.parsers["get"].parse_args()
 
         # for retrocompatibility purpose
         for forbid_id in args['__temporary_forbidden_id[]']:
@@ -147,27 +174,7 @@ class Schedules(ResourceUri, ResourceUtc):
             self.region = i_manager.get_region(region, lon, lat)
         timezone.set_request_timezone(self.region)
 
-        if not args["from_datetime"] and not args["until_datetime"]:
-            # no datetime given, default is the current time, and we activate the realtime
-            args['from_datetime'] = args['_current_datetime']
-            if args["calendar"]:  # if we have a calendar, the dt is only used for sorting, so 00:00 is fine
-                args['from_datetime'] = args['from_datetime'].replace(hour=0, minute=0)
-
-            if not args['data_freshness']:
-                args['data_freshness'] = 'realtime'
-        elif not args.get('calendar'):
-            #if a calendar is given all times will be given in local (because the calendar might span over dst)
-            if args['from_datetime']:
-                args['from_datetime'] = self.convert_to_utc(args['from_datetime'])
-            if args['until_datetime']:
-                args['until_datetime'] = self.convert_to_utc(args['until_datetime'])
-
-        # we save the original datetime for debuging purpose
-        args['original_datetime'] = args['from_datetime']
-        if args['from_datetime']:
-            args['from_datetime'] = utils.date_to_timestamp(args['from_datetime'])
-        if args['until_datetime']:
-            args['until_datetime'] = utils.date_to_timestamp(args['until_datetime'])
+        self._set_datetimes(args)
 
         if not args['data_freshness']:
             # The data freshness depends on the API
@@ -30,8 +30,8 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 
 from flask.ext.restful import Resource
 from jormungandr.stat_manager import manage_stat_caller
-from jormungandr import stat_manager
-from jormungandr.quota import quota_control
+from jormungandr import stat_manager, i_manager
+from jormungandr.quota import quota_control, admission_control
 from functools import wraps
 from jormungandr.authentication import register_used_coverages
 
@@ -46,6 +46,9 @@ class StatedResource(Resource):
         if stat_manager.save_stat:
             self.method_decorators.append(manage_stat_caller(stat_manager))
 
+        if i_manager.admission_controller:
+            self.method_decorators.append(admission_control)
+
         if quota:
             self.method_decorators.append(quota_control)
 
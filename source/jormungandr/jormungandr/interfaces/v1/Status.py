@@ -32,7 +32,7 @@ from flask.ext.restful import Resource, fields, marshal_with
 from jormungandr import i_manager, travelers_profile
 from jormungandr.protobuf_to_dict import protobuf_to_dict
 from jormungandr.interfaces.v1.fields import instance_status_with_parameters
-from jormungandr import app
+from jormungandr import app, cache, stat_manager, autocomplete_cache
 from navitiacommon import models
 
 status = {
@@ -52,4 +52,22 @@ class Status(Resource):
         response['status']['realtime_proxies'] = []
         for realtime_proxy in instance.realtime_proxy_manager.realtime_proxies.values():
             response['status']['realtime_proxies'].append(realtime_proxy.status())
+        if instance.socket_pool:
+            response['status']['zmq_socket_pool'] = instance.socket_pool.stats()
+        if instance.kraken_endpoints:
+            response['status']['kraken_endpoints'] = instance.kraken_endpoints.stats()
+        if instance.journey_response_cache:
+            response['status']['journey_response_cache'] = instance.journey_response_cache.stats()
+        if instance.street_network_cache:
+            response['status']['street_network_cache'] = instance.street_network_cache.stats()
+        response['status']['local_cache'] = cache.stats()
+        response['status']['autocomplete'] = instance.autocomplete.stats(instance)
+        if autocomplete_cache:
+            response['status']['autocomplete_cache'] = autocomplete_cache.stats()
+        if i_manager.admission_controller:
+            response['status']['admission_control'] = i_manager.admission_controller.stats(region)
+        if i_manager.request_coalescer:
+            response['status']['request_coalescer'] = i_manager.request_coalescer.stats()
+        if stat_manager.save_stat:
+            response['status']['stat_manager'] = stat_manager.stats()
         return response, 200
@@ -33,7 +33,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 
 from flask.ext.restful import fields, marshal_with, reqparse, abort
 from jormungandr.parking_space_availability.bss.stands_manager import ManageStands
-from jormungandr import i_manager, authentication
+from jormungandr import i_manager, authentication, timing
 from jormungandr.interfaces.v1.converters_collection_type import collections_to_resource_type
 from jormungandr.interfaces.v1.fields import stop_point, stop_area, route, line, line_group, \
     physical_mode, commercial_mode, company, network, pagination,\
@@ -120,7 +120,8 @@ class Uri(ResourceUri, ResourceUtc):
     def get(self, region=None, lon=None, lat=None, uri=None, id=None):
         collection = self.collection
 
-        args = self.parsers["get"].parse_args()
+        with timing.span('parse_args'):
+            args = self.parsers["get"].parse_args()
 
         # handle headsign
         if args.get("headsign"):
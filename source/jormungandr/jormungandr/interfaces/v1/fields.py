@@ -859,6 +859,16 @@ instance_parameters = {
 instance_status_with_parameters = deepcopy(instance_status)
 instance_status_with_parameters['parameters'] = fields.Nested(instance_parameters, allow_null=True)
 instance_status_with_parameters['realtime_contributors'] = fields.List(fields.String(), attribute='rt_contributors')
+instance_status_with_parameters['zmq_socket_pool'] = fields.Raw()
+instance_status_with_parameters['kraken_endpoints'] = fields.Raw()
+instance_status_with_parameters['journey_response_cache'] = fields.Raw()
+instance_status_with_parameters['street_network_cache'] = fields.Raw()
+instance_status_with_parameters['local_cache'] = fields.Raw()
+instance_status_with_parameters['stat_manager'] = fields.Raw()
+instance_status_with_parameters['request_coalescer'] = fields.Raw()
+instance_status_with_parameters['admission_control'] = fields.Raw()
+instance_status_with_parameters['autocomplete'] = fields.Raw()
+instance_status_with_parameters['autocomplete_cache'] = fields.Raw()
 
 instance_traveler_types = {
     'traveler_type': fields.String,
@@ -28,13 +28,14 @@
 # www.navitia.io
 
 from __future__ import absolute_import, print_function, unicode_literals, division
-from flask import url_for, request
+from flask import url_for, request, g
 from collections import OrderedDict
 from functools import wraps
 from sqlalchemy.sql.elements import _type_from_args
 from jormungandr.interfaces.v1.converters_collection_type import resource_type_to_collection,\
     collections_to_resource_type
 from flask.ext.restful.utils import unpack
+from jormungandr import timing
 
 
 def create_external_link(url, rel, _type=None, templated=False, description=None, **kwargs):
@@ -114,6 +115,7 @@ class generate_links(object):
 
 class add_pagination_links(object):
 
+    @timing.timed_decorator('links')
     def __call__(self, f):
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -185,6 +187,7 @@ class add_coverage_link(generate_links):
     def __init__(self):
         self.links = ["places", "journeys", "coverage"]
 
+    @timing.timed_decorator('links')
     def __call__(self, f):
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -213,6 +216,7 @@ class add_collection_links(generate_links):
     def __init__(self, collections):
         self.collections = collections
 
+    @timing.timed_decorator('links')
     def __call__(self, f):
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -236,11 +240,46 @@ class add_collection_links(generate_links):
         return wrapper
 
 
+def start_object_types_collection():
+    """
+    the serializers will register the types of the objects they output,
+    add_id_links will then not have to walk the response to find them
+    """
+    g.collected_object_types = set()
+
+
+def collect_object_types(obj):
+    """
+    register the types of the objects directly contained in a serialized object
+
+    called on each object of the response, it gives the same types as add_id_links.get_objets
+    """
+    types = getattr(g, 'collected_object_types', None)
+    if types is None:
+        return
+    for key, value in obj.items():
+        if isinstance(value, dict):
+            _collect_object_type(value, key, types)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, dict):
+                    _collect_object_type(item, key, types)
+
+
+def _collect_object_type(obj, collection_name, types):
+    if "id" in obj:
+        if "type" in obj:
+            types.add(obj["type"])
+        if "href" not in obj:
+            types.add(collection_name)
+
+
 class add_id_links(generate_links):
 
     def __init__(self, *args, **kwargs):
         self.data = set()
 
+    @timing.timed_decorator('links')
     def __call__(self, f):
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -251,7 +290,13 @@ class add_id_links(generate_links):
                 data, code, header = unpack(objects)
             else:
                 data = objects
-            self.get_objets(data)
+            collected_types = getattr(g, 'collected_object_types', None)
+            if collected_types is not None:
+                # the types have been registered during the serialization
+                self.data = collected_types
+                g.collected_object_types = None
+            else:
+                self.get_objets(data)
             data = self.prepare_objetcs(objects, True)
             kwargs = self.prepare_kwargs(kwargs, data)
 
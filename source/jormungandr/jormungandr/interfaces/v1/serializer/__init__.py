@@ -28,6 +28,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from functools import wraps
 from flask_restful.utils import unpack
+from jormungandr.interfaces.v1.make_links import start_object_types_collection
 
 from .api import LinesSerializer
 from .api import DisruptionsSerializer
@@ -41,6 +42,7 @@ class serialize_with(object):
         @wraps(f)
         def wrapper(*args, **kwargs):
             resp = f(*args, **kwargs)
+            start_object_types_collection()
             if isinstance(resp, tuple):
                 data, code, headers = unpack(resp)
                 return self.serializer(data, many=self.many).data, code, headers
@@ -27,11 +27,13 @@
 # www.navitia.io
 
 from __future__ import absolute_import, print_function, unicode_literals, division
-from jormungandr.interfaces.v1.serializer import pt
-from jormungandr.interfaces.v1.serializer.fields import ErrorSerializer, FeedPublisherSerializer, PaginationSerializer
+from jormungandr.interfaces.v1.serializer import pt, journey
+from jormungandr.interfaces.v1.serializer.fields import ErrorSerializer, FeedPublisherSerializer, PaginationSerializer, \
+    ExternalLinkField
+from jormungandr.interfaces.v1.serializer.base import LinkableSerializer
 import serpy
 
-class PTReferentialSerializer(serpy.Serializer):
+class PTReferentialSerializer(LinkableSerializer):
     pagination = PaginationSerializer(attr='pagination', display_none=True, required=True)
     error = ErrorSerializer(display_none=False)
     feed_publishers = FeedPublisherSerializer(many=True, display_none=False)
@@ -64,3 +66,15 @@ class LineGroupsSerializer(PTReferentialSerializer):
 
 class NetworksSerializer(PTReferentialSerializer):
     networks = pt.NetworkSerializer(many=True)
+
+class JourneysSerializer(LinkableSerializer):
+    journeys = journey.JourneySerializer(many=True, display_none=False)
+    error = ErrorSerializer(display_none=False)
+    tickets = journey.TicketSerializer(many=True)
+    disruptions = journey.JourneyDisruptionSerializer(attr='impacts', many=True)
+    feed_publishers = FeedPublisherSerializer(many=True)
+    links = ExternalLinkField()
+    context = serpy.MethodField()
+
+    def get_context(self, obj):
+        return journey.ContextSerializer(obj).data
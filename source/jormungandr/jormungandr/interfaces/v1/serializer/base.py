@@ -34,7 +34,7 @@ import operator
 import datetime
 import logging
 from flask import g
-from jormungandr.interfaces.v1.make_links import create_internal_link, create_external_link
+from jormungandr.interfaces.v1.make_links import create_internal_link, create_external_link, collect_object_types
 
 
 class PbField(serpy.Field):
@@ -56,7 +56,17 @@ class PbField(serpy.Field):
                 return op(obj)
         return getter
 
-class PbNestedSerializer(serpy.Serializer, PbField):
+class LinkableSerializer(serpy.Serializer):
+    """
+    Register the types of the objects it outputs, they are used to add the links to these objects
+    (cf make_links.add_id_links) without walking the whole response once it is serialized
+    """
+    def _serialize(self, instance, fields):
+        v = super(LinkableSerializer, self)._serialize(instance, fields)
+        collect_object_types(v)
+        return v
+
+class PbNestedSerializer(LinkableSerializer, PbField):
     pass
 
 class EnumField(serpy.Field):
@@ -103,3 +103,37 @@ class PaginationSerializer(serpy.Serializer):
     start_page = serpy.Field(attr='startPage')
     items_per_page = serpy.Field(attr='itemsPerPage')
     items_on_page = serpy.Field(attr='itemsOnPage')
+
+class RoundedIntField(serpy.Field):
+    """
+    Integer with round value
+    2.3 -> 2
+    2.6 -> 3
+    """
+    def to_value(self, value):
+        return int(round(value))
+
+class ExternalLinkField(serpy.Field):
+    """
+    Links to other apis, as given in the protobuf
+    """
+    def to_value(self, value):
+        return [self._format(link) for link in value]
+
+    @staticmethod
+    def _format(link):
+        # note: some request args can be there several times,
+        # but when there is only one elt, flask does not want lists
+        args = {}
+        for e in link.kwargs:
+            if len(e.values) > 1:
+                args[e.key] = [v for v in e.values]
+            else:
+                args[e.key] = e.values[0]
+
+        return create_external_link('v1.{}'.format(link.ressource_name),
+                                    rel=link.rel,
+                                    _type=link.type,
+                                    templated=link.is_templated,
+                                    description=link.description,
+                                    **args)
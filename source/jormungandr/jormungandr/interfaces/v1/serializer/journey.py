@@ -0,0 +1,367 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import logging
+import serpy
+from flask import g
+from navitiacommon import response_pb2
+from jormungandr.interfaces.v1.make_links import create_internal_link
+from jormungandr.interfaces.v1.serializer.base import PbField, PbNestedSerializer, EnumField, LinkableSerializer
+from jormungandr.interfaces.v1.serializer.fields import LinkSerializer, RoundedIntField, CodeSerializer
+from jormungandr.interfaces.v1.serializer.time import DateTimeField, PeriodSerializer
+from jormungandr.interfaces.v1.serializer.pt import Equipments, PlaceSerializer, StopPointSerializer, \
+    StopAreaSerializer, DisruptionSerializer, MessageSerializer, AddressSerializer, PoiSerializer
+
+
+# the pt objects of /journeys are given as in the flask-restful fields of Journeys.py,
+# which differ a bit from the ptref ones (empty codes are hidden, addresses and pois are given...)
+
+class JourneyStopAreaSerializer(StopAreaSerializer):
+    codes = CodeSerializer(many=True, display_none=False)
+    stop_points = serpy.MethodField()
+
+    def get_stop_points(self, obj):
+        return JourneyStopPointSerializer(obj.stop_points, many=True).data
+
+
+class JourneyStopPointSerializer(StopPointSerializer):
+    codes = CodeSerializer(many=True, display_none=False)
+
+    def get_stop_area(self, obj):
+        if obj.HasField(str('stop_area')):
+            return JourneyStopAreaSerializer(obj.stop_area, display_none=False).data
+        else:
+            return None
+
+
+class JourneyPlaceSerializer(PlaceSerializer):
+    stop_area = JourneyStopAreaSerializer(display_none=False)
+    stop_point = JourneyStopPointSerializer(display_none=False)
+    address = AddressSerializer(display_none=False)
+    poi = PoiSerializer(display_none=False)
+    embedded_type = EnumField(attr='embedded_type', display_none=False)
+
+
+class JourneyDisruptionSerializer(DisruptionSerializer):
+    title = serpy.Field()
+    application_periods = PeriodSerializer(many=True, display_none=False)
+    tags = serpy.MethodField(display_none=False)
+    category = PbField(display_none=False)
+    messages = MessageSerializer(many=True, display_none=False)
+
+    def get_tags(self, obj):
+        return [t for t in obj.tags] or None
+
+
+class Co2EmissionSerializer(serpy.Serializer):
+    value = serpy.Field()
+    unit = serpy.Field()
+
+
+class DurationsSerializer(PbNestedSerializer):
+    total = serpy.Field()
+    walking = serpy.Field()
+
+
+class CostSerializer(serpy.Serializer):
+    value = serpy.StrField()
+    currency = serpy.Field()
+
+
+class FareSerializer(LinkableSerializer):
+    total = CostSerializer()
+    found = serpy.BoolField()
+    links = serpy.MethodField()
+
+    def get_links(self, obj):
+        return [create_internal_link(_type="ticket", rel="tickets", id=value) for value in obj.ticket_id]
+
+
+class TicketSerializer(PbNestedSerializer):
+    id = serpy.Field()
+    name = serpy.Field()
+    comment = serpy.Field()
+    found = serpy.BoolField()
+    cost = CostSerializer()
+    links = serpy.MethodField()
+
+    def get_links(self, obj):
+        return [{"type": "section", "rel": "sections", "internal": True, "templated": False, "id": value}
+                for value in obj.section_id]
+
+
+class WeekPatternSerializer(serpy.Serializer):
+    monday = serpy.BoolField()
+    tuesday = serpy.BoolField()
+    wednesday = serpy.BoolField()
+    thursday = serpy.BoolField()
+    friday = serpy.BoolField()
+    saturday = serpy.BoolField()
+    sunday = serpy.BoolField()
+
+
+class CalendarPeriodSerializer(serpy.Serializer):
+    begin = serpy.Field()
+    end = serpy.Field()
+
+
+class CalendarExceptionSerializer(serpy.Serializer):
+    datetime = serpy.Field(attr='date')
+    type = EnumField(attr='type', display_none=False)
+
+
+class ValidityPatternSerializer(PbNestedSerializer):
+    beginning_date = serpy.Field()
+    days = serpy.Field()
+
+
+class CalendarSerializer(PbNestedSerializer):
+    id = PbField(attr='uri', display_none=False)
+    name = PbField(display_none=False)
+    week_pattern = WeekPatternSerializer()
+    active_periods = CalendarPeriodSerializer(many=True, display_none=False)
+    exceptions = CalendarExceptionSerializer(many=True, display_none=False)
+    validity_pattern = ValidityPatternSerializer(display_none=False)
+
+
+class VJDisplayInformationSerializer(PbNestedSerializer):
+    description = serpy.Field()
+    physical_mode = serpy.Field()
+    commercial_mode = serpy.Field()
+    network = serpy.Field()
+    direction = serpy.Field()
+    label = serpy.MethodField(display_none=False)
+    color = serpy.Field()
+    code = serpy.Field()
+    equipments = Equipments(attr='has_equipments')
+    headsign = serpy.Field()
+    headsigns = serpy.MethodField(display_none=False)
+    links = LinkSerializer(attr='impact_uris')
+    text_color = serpy.Field()
+
+    def get_label(self, obj):
+        return obj.code or obj.name or None
+
+    def get_headsigns(self, obj):
+        return [h for h in obj.headsigns] or None
+
+
+class StopDateTimeSerializer(PbNestedSerializer):
+    departure_date_time = DateTimeField(display_none=False)
+    base_departure_date_time = DateTimeField(display_none=False)
+    arrival_date_time = DateTimeField(display_none=False)
+    base_arrival_date_time = DateTimeField(display_none=False)
+    stop_point = JourneyStopPointSerializer(display_none=False)
+    additional_informations = serpy.MethodField()
+    links = serpy.MethodField()
+    data_freshness = EnumField(attr='data_freshness', display_none=False)
+
+    def get_additional_informations(self, obj):
+        properties = obj.properties
+        enum = properties.DESCRIPTOR.enum_types_by_name["AdditionalInformation"]
+        return [enum.values_by_number[v].name.lower() for v in properties.additional_informations]
+
+    def get_links(self, obj):
+        properties = obj.properties
+        r = []
+        #Note: all those links should be created with crete_{internal|external}_links,
+        # but for retrocompatibility purpose we cannot do that :( Change it for the v2!
+        for note_ in properties.notes:
+            r.append({"id": note_.uri,
+                      "type": "notes",
+                      "rel": "notes",
+                      "value": note_.note,
+                      "internal": True})
+        for exception in properties.exceptions:
+            r.append({"type": "exceptions",
+                      "rel": "exceptions",
+                      "id": exception.uri,
+                      "date": exception.date,
+                      "except_type": exception.type,
+                      "internal": True})
+        if properties.destination and properties.destination.uri:
+            r.append({"type": "notes",
+                      "rel": "notes",
+                      "id": properties.destination.uri,
+                      "value": properties.destination.destination,
+                      "internal": True})
+        if properties.vehicle_journey_id:
+            r.append({"type": "vehicle_journey",
+                      "rel": "vehicle_journeys",
+                      "value": properties.vehicle_journey_id,
+                      "id": properties.vehicle_journey_id})
+        return r
+
+
+class PathItemSerializer(serpy.Serializer):
+    length = RoundedIntField()
+    name = serpy.Field()
+    duration = RoundedIntField()
+    direction = serpy.IntField()
+
+
+class SectionSerializer(PbNestedSerializer):
+    id = serpy.Field()
+    type = serpy.MethodField(display_none=False)
+    mode = serpy.MethodField(display_none=False)
+    duration = RoundedIntField()
+    f = serpy.MethodField(label='from', method='get_from', display_none=False)
+    to = serpy.MethodField(display_none=False)
+    links = serpy.MethodField(display_none=False)
+    display_informations = VJDisplayInformationSerializer(attr='pt_display_informations', display_none=False)
+    additional_informations = serpy.MethodField(display_none=False)
+    geojson = serpy.MethodField(display_none=False)
+    path = PathItemSerializer(attr='street_network.path_items', many=True, display_none=False)
+    transfer_type = EnumField(attr='transfer_type', display_none=False)
+    stop_date_times = StopDateTimeSerializer(many=True, display_none=False)
+    departure_date_time = DateTimeField(attr='begin_date_time', display_none=False)
+    base_departure_date_time = DateTimeField(attr='base_begin_date_time', display_none=False)
+    arrival_date_time = DateTimeField(attr='end_date_time', display_none=False)
+    base_arrival_date_time = DateTimeField(attr='base_end_date_time', display_none=False)
+    co2_emission = Co2EmissionSerializer()
+
+    @staticmethod
+    def _is_on_demand_stop_time(stop):
+        enum = stop.properties.DESCRIPTOR.enum_types_by_name["AdditionalInformation"]
+        return any(enum.values_by_number[v].name == 'on_demand_transport'
+                   for v in stop.properties.additional_informations)
+
+    def get_type(self, obj):
+        if obj.stop_date_times:
+            if self._is_on_demand_stop_time(obj.stop_date_times[0]) or \
+                    self._is_on_demand_stop_time(obj.stop_date_times[-1]):
+                return 'on_demand_transport'
+            return 'public_transport'
+        if not obj.HasField(str('type')):
+            return None
+        return obj.DESCRIPTOR.fields_by_name['type'].enum_type.values_by_number[obj.type].name.lower()
+
+    def get_mode(self, obj):
+        if not obj.HasField(str('street_network')) or not obj.street_network.HasField(str('mode')):
+            return None
+        return obj.street_network.DESCRIPTOR.fields_by_name['mode'].enum_type\
+            .values_by_number[obj.street_network.mode].name.lower()
+
+    def get_from(self, obj):
+        if obj.type == response_pb2.WAITING:
+            return None
+        return JourneyPlaceSerializer(obj.origin).data
+
+    def get_to(self, obj):
+        if obj.type == response_pb2.WAITING:
+            return None
+        return JourneyPlaceSerializer(obj.destination).data
+
+    def get_links(self, obj):
+        response = []
+        if obj.HasField(str('uris')):
+            for type_, value in obj.uris.ListFields():
+                response.append({"type": type_.name, "id": value})
+        if obj.HasField(str('pt_display_informations')):
+            for value in obj.pt_display_informations.notes:
+                response.append({"type": 'notes', "id": value.uri, 'value': value.note})
+        return response
+
+    def get_additional_informations(self, obj):
+        return [response_pb2.SectionAdditionalInformationType.Name(v).lower()
+                for v in obj.additional_informations] or None
+
+    def get_geojson(self, obj):
+        coords = []
+        if not obj.HasField(str("type")):
+            logging.getLogger(__name__).warn("trying to output wrongly formated object as geojson, we skip")
+            return None
+
+        if obj.type == response_pb2.STREET_NETWORK:
+            coords = obj.street_network.coordinates
+        elif obj.type == response_pb2.CROW_FLY and len(obj.shape) != 0:
+            coords = obj.shape
+        elif obj.type == response_pb2.PUBLIC_TRANSPORT:
+            coords = obj.shape
+        elif obj.type == response_pb2.TRANSFER:
+            coords = [obj.origin.stop_point.coord, obj.destination.stop_point.coord]
+        else:
+            return None
+
+        return {
+            "type": "LineString",
+            "coordinates": [[c.lon, c.lat] for c in coords],
+            "properties": [{
+                "length": obj.length if obj.HasField(str("length")) else 0
+            }]
+        }
+
+
+class JourneySerializer(PbNestedSerializer):
+    duration = serpy.IntField()
+    nb_transfers = serpy.IntField()
+    departure_date_time = DateTimeField(display_none=False)
+    arrival_date_time = DateTimeField(display_none=False)
+    requested_date_time = DateTimeField(display_none=False)
+    sections = SectionSerializer(many=True, display_none=False)
+    f = JourneyPlaceSerializer(label='from', attr='origin', display_none=False)
+    to = JourneyPlaceSerializer(attr='destination', display_none=False)
+    type = serpy.Field()
+    fare = FareSerializer()
+    tags = serpy.MethodField()
+    status = serpy.Field(attr='most_serious_disruption_effect')
+    calendars = CalendarSerializer(many=True, display_none=False)
+    co2_emission = Co2EmissionSerializer()
+    durations = DurationsSerializer(display_none=False)
+    debug = serpy.MethodField(display_none=False)
+
+    def get_tags(self, obj):
+        return [t for t in obj.tags]
+
+    def get_debug(self, obj):
+        if not getattr(g, 'debug', False):
+            return None
+
+        debug = {
+            'streetnetwork_duration': obj.sn_dur,
+            'transfer_duration': obj.transfer_dur,
+            'min_waiting_duration': obj.min_waiting_dur,
+            'nb_vj_extentions': obj.nb_vj_extentions,
+            'nb_sections': obj.nb_sections,
+        }
+        if hasattr(obj, 'internal_id'):
+            debug['internal_id'] = obj.internal_id
+
+        return debug
+
+
+class ContextSerializer(serpy.Serializer):
+    car_direct_path = serpy.MethodField()
+
+    def get_car_direct_path(self, obj):
+        return {'co2_emission': Co2EmissionSerializer(obj.car_co2_emission).data}
@@ -211,6 +211,22 @@ class StopAreaSerializer(GenericSerializer):
     stop_points = StopPointSerializer(many=True, display_none=False)
 
 
+class PoiTypeSerializer(GenericSerializer):
+    pass
+
+
+class PoiSerializer(GenericSerializer):
+    coord = CoordSerializer(required=False)
+    label = serpy.Field()
+    administrative_regions = AdminSerializer(many=True, display_none=False)
+    poi_type = PoiTypeSerializer(display_none=False)
+    properties = serpy.MethodField()
+    address = AddressSerializer(display_none=False)
+
+    def get_properties(self, obj):
+        return {code.type: code.value for code in obj.properties}
+
+
 class PlaceSerializer(GenericSerializer):
     id = serpy.Field(attr='uri')
     name = serpy.Field()
@@ -0,0 +1,228 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import json
+from flask import g
+from flask.ext.restful import marshal
+from jormungandr import app
+from jormungandr.interfaces.v1.Journeys import journeys
+from jormungandr.interfaces.v1.serializer.api import JourneysSerializer
+from navitiacommon import response_pb2, type_pb2
+
+
+def _fill_place(place, uri, embedded_type):
+    place.uri = uri
+    place.name = 'name of {}'.format(uri)
+    place.embedded_type = embedded_type
+    if embedded_type == type_pb2.ADDRESS:
+        place.address.uri = uri
+        place.address.name = place.name
+        place.address.label = place.name
+        place.address.house_number = 42
+        place.address.coord.lon = 2.36
+        place.address.coord.lat = 48.84
+        admin = place.address.administrative_regions.add()
+        admin.uri = 'admin:paris'
+        admin.name = 'Paris'
+        admin.level = 8
+        admin.zip_code = '75000'
+    else:
+        place.stop_point.uri = uri
+        place.stop_point.name = place.name
+        place.stop_point.label = place.name
+        place.stop_point.coord.lon = 2.37
+        place.stop_point.coord.lat = 48.85
+        place.stop_point.stop_area.uri = 'stop_area:{}'.format(uri)
+        place.stop_point.stop_area.name = place.name
+        place.stop_point.stop_area.coord.lon = 2.37
+        place.stop_point.stop_area.coord.lat = 48.85
+        place.stop_point.impact_uris.append('impact:1')
+
+
+def _build_response():
+    resp = response_pb2.Response()
+    resp.car_co2_emission.value = 52.5
+    resp.car_co2_emission.unit = 'gEC'
+
+    journey = resp.journeys.add()
+    journey.duration = 1500
+    journey.nb_transfers = 0
+    journey.requested_date_time = 1465380000
+    journey.departure_date_time = 1465380060
+    journey.arrival_date_time = 1465381560
+    journey.type = 'best'
+    journey.tags.append('walking')
+    journey.most_serious_disruption_effect = 'SIGNIFICANT_DELAYS'
+    journey.co2_emission.value = 12.3
+    journey.co2_emission.unit = 'gEC'
+    journey.durations.total = 1500
+    journey.durations.walking = 300
+    journey.fare.found = True
+    journey.fare.total.value = 1.7
+    journey.fare.total.currency = 'euro'
+    journey.fare.ticket_id.append('ticket_1')
+    _fill_place(journey.origin, 'address:1', type_pb2.ADDRESS)
+    _fill_place(journey.destination, 'stop_point:2', type_pb2.STOP_POINT)
+
+    walking = journey.sections.add()
+    walking.id = 'section_0'
+    walking.type = response_pb2.STREET_NETWORK
+    walking.duration = 300
+    walking.length = 320
+    walking.begin_date_time = 1465380060
+    walking.end_date_time = 1465380360
+    walking.street_network.mode = response_pb2.Walking
+    walking.street_network.duration = 300
+    walking.street_network.length = 320
+    for name, length, duration in (('rue de la Roquette', 120.2, 110.7), ('rue Keller', 199.8, 189.3)):
+        item = walking.street_network.path_items.add()
+        item.name = name
+        item.length = length
+        item.duration = duration
+        item.direction = -90
+    for lon, lat in ((2.36, 48.84), (2.37, 48.85)):
+        c = walking.street_network.coordinates.add()
+        c.lon = lon
+        c.lat = lat
+    _fill_place(walking.origin, 'address:1', type_pb2.ADDRESS)
+    _fill_place(walking.destination, 'stop_point:1', type_pb2.STOP_POINT)
+
+    waiting = journey.sections.add()
+    waiting.id = 'section_1'
+    waiting.type = response_pb2.WAITING
+    waiting.duration = 60
+    waiting.begin_date_time = 1465380360
+    waiting.end_date_time = 1465380420
+
+    pt = journey.sections.add()
+    pt.id = 'section_2'
+    pt.type = response_pb2.PUBLIC_TRANSPORT
+    pt.duration = 1140
+    pt.begin_date_time = 1465380420
+    pt.end_date_time = 1465381560
+    pt.base_begin_date_time = 1465380300
+    pt.base_end_date_time = 1465381440
+    pt.co2_emission.value = 12.3
+    pt.co2_emission.unit = 'gEC'
+    pt.uris.line = 'line:A'
+    pt.uris.vehicle_journey = 'vj:A:1'
+    pt.uris.network = 'network:1'
+    pt.additional_informations.append(response_pb2.HAS_DATETIME_ESTIMATED)
+    pt.pt_display_informations.network = 'RATP'
+    pt.pt_display_informations.code = 'A'
+    pt.pt_display_informations.name = 'RER A'
+    pt.pt_display_informations.color = 'FF0000'
+    pt.pt_display_informations.commercial_mode = 'RER'
+    pt.pt_display_informations.physical_mode = 'Train'
+    pt.pt_display_informations.direction = 'Marne la Vallee'
+    pt.pt_display_informations.headsign = 'ZEBU'
+    pt.pt_display_informations.headsigns.append('ZEBU')
+    pt.pt_display_informations.impact_uris.append('impact:1')
+    note = pt.pt_display_informations.notes.add()
+    note.uri = 'note:1'
+    note.note = 'no bikes'
+    for lon, lat in ((2.37, 48.85), (2.45, 48.86)):
+        c = pt.shape.add()
+        c.lon = lon
+        c.lat = lat
+    _fill_place(pt.origin, 'stop_point:1', type_pb2.STOP_POINT)
+    _fill_place(pt.destination, 'stop_point:2', type_pb2.STOP_POINT)
+    for sp, dt in (('stop_point:1', 1465380420), ('stop_point:2', 1465381560)):
+        stop_date_time = pt.stop_date_times.add()
+        stop_date_time.departure_date_time = dt
+        stop_date_time.arrival_date_time = dt
+        stop_date_time.base_departure_date_time = dt - 120
+        stop_date_time.base_arrival_date_time = dt - 120
+        stop_date_time.stop_point.uri = sp
+        stop_date_time.stop_point.name = 'name of {}'.format(sp)
+        stop_date_time.stop_point.coord.lon = 2.4
+        stop_date_time.stop_point.coord.lat = 48.8
+        stop_date_time.data_freshness = type_pb2.REALTIME
+
+    ticket = resp.tickets.add()
+    ticket.id = 'ticket_1'
+    ticket.name = 'Ticket t+'
+    ticket.found = True
+    ticket.cost.value = 1.7
+    ticket.cost.currency = 'euro'
+    ticket.section_id.append('section_2')
+
+    impact = resp.impacts.add()
+    impact.uri = 'impact:1'
+    impact.disruption_uri = 'disruption:1'
+    impact.title = 'strike'
+    impact.tags.append('rail')
+    impact.cause = 'strike'
+    impact.updated_at = 1465370000
+    impact.severity.name = 'delays'
+    impact.severity.effect = 'SIGNIFICANT_DELAYS'
+    period = impact.application_periods.add()
+    period.begin = 1465360000
+    period.end = 1465460000
+    message = impact.messages.add()
+    message.text = 'there is a strike'
+
+    feed_publisher = resp.feed_publishers.add()
+    feed_publisher.id = 'builder'
+    feed_publisher.name = 'builder'
+    feed_publisher.url = 'www.canaltp.fr'
+    feed_publisher.license = 'ODBL'
+    return resp
+
+
+def _to_json(response):
+    return json.dumps(response, sort_keys=True)
+
+
+def journeys_serializer_golden_test():
+    """
+    the serpy serializer of the journeys must give exactly the same json as the flask-restful fields
+    """
+    resp = _build_response()
+    with app.test_request_context():
+        expected = _to_json(marshal(resp, journeys))
+        assert _to_json(JourneysSerializer(resp).data) == expected
+
+
+def journeys_serializer_golden_error_test():
+    resp = response_pb2.Response()
+    resp.error.id = response_pb2.Error.no_solution
+    resp.error.message = 'no solution found for this journey'
+    with app.test_request_context():
+        assert _to_json(JourneysSerializer(resp).data) == _to_json(marshal(resp, journeys))
+
+
+def journeys_serializer_golden_debug_test():
+    resp = _build_response()
+    resp.journeys[0].sn_dur = 300
+    resp.journeys[0].nb_sections = 3
+    with app.test_request_context():
+        g.debug = True
+        assert _to_json(JourneysSerializer(resp).data) == _to_json(marshal(resp, journeys))
@@ -0,0 +1,93 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from flask import g
+from jormungandr import app
+from jormungandr.interfaces.v1.make_links import add_id_links, collect_object_types, \
+    start_object_types_collection, create_internal_link
+
+
+def _line(idx):
+    return {
+        'id': 'line:{}'.format(idx),
+        'name': 'line {}'.format(idx),
+        'links': [create_internal_link(_type='disruption', rel='disruptions', id='impact:1')],
+        'codes': [{'type': 'external_code', 'value': 'L{}'.format(idx)}],
+        'network': {'id': 'network:1', 'name': 'network', 'links': []},
+        'physical_modes': [{'id': 'physical_mode:Bus', 'name': 'Bus'}],
+        'routes': [{'id': 'route:{}'.format(idx), 'name': 'route',
+                    'direction': {'id': 'stop_area:1', 'embedded_type': 'stop_area',
+                                  'stop_area': {'id': 'stop_area:1', 'coord': {'lon': '2', 'lat': '48'}}}}],
+        'geojson': {'type': 'MultiLineString', 'coordinates': []},
+    }
+
+
+def _collect(obj):
+    """
+    call collect_object_types on all the objects, children first, like the serializers do
+    """
+    if isinstance(obj, dict):
+        for value in obj.values():
+            _collect(value)
+        collect_object_types(obj)
+    elif isinstance(obj, list):
+        for item in obj:
+            _collect(item)
+
+
+def collected_object_types_test():
+    """
+    the types registered during the serialization must be the same as the one found by walking the response
+    """
+    response = {
+        'lines': [_line(i) for i in range(3)],
+        'pagination': {'total_result': 3, 'start_page': 0},
+        'disruptions': [{'id': 'impact:1', 'uri': 'impact:1', 'messages': [{'text': 'strike'}]}],
+        'feed_publishers': [{'id': 'builder', 'name': 'builder'}],
+        'links': [{'href': 'http://localhost/v1/coverage', 'type': 'coverage', 'templated': False}],
+    }
+    walker = add_id_links()
+    walker.get_objets(response)
+
+    with app.test_request_context():
+        start_object_types_collection()
+        _collect(response)
+        assert g.collected_object_types == walker.data
+    assert {'lines', 'disruption', 'disruptions', 'network', 'physical_modes', 'routes', 'direction',
+            'stop_area', 'feed_publishers'} <= walker.data
+
+
+def no_collection_test():
+    with app.test_request_context():
+        collect_object_types({'stop_point': {'id': 'stop_point:1'}})
+        assert getattr(g, 'collected_object_types', None) is None
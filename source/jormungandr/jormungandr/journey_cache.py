@@ -0,0 +1,109 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import hashlib
+from navitiacommon import request_pb2, response_pb2, type_pb2
+from jormungandr.lru_cache import LruCache
+
+
+class JourneyResponseCache(object):
+    """
+    cache of the kraken responses to the journeys requests of an instance
+
+    The key is a hash of the serialized request without its request_id.
+    The _current_datetime (used by kraken to know which disruptions are active) is rounded to the
+    time to live of the entry, otherwise no request would ever be identical.
+
+    The responses are stored serialized, a hit gives a new protobuf that can be modified by the caller.
+    An entry is invalidated as soon as a response (or the instance's metadata) shows a new publication_date.
+    Kraken does not tell us when new realtime data are loaded, so the requests using the realtime
+    have their own (shorter) time to live.
+    """
+
+    def __init__(self, instance, max_size=1000, ttl=60, realtime_ttl=10):
+        self.instance = instance
+        self.ttl = ttl
+        self.realtime_ttl = realtime_ttl
+        self._cache = LruCache(max_size=max_size, ttl=ttl)
+        self._publication_date = None
+
+    def _get_ttl(self, request):
+        if request.journeys.realtime_level == type_pb2.BASE_SCHEDULE:
+            return self.ttl
+        return self.realtime_ttl
+
+    def _make_key(self, request, ttl):
+        req = request_pb2.Request()
+        req.CopyFrom(request)
+        req.ClearField(str('request_id'))
+        if ttl > 0:
+            req._current_datetime -= req._current_datetime % ttl
+        return hashlib.sha1(req.SerializeToString()).hexdigest()
+
+    def _is_up_to_date(self, publication_date):
+        if publication_date != self._publication_date:
+            return False
+        # the metadata of the instance may have been refreshed before we got a response with the new data
+        return publication_date >= self.instance.publication_date
+
+    def _update_publication_date(self, publication_date):
+        if publication_date != self._publication_date:
+            self._cache.clear()
+            self._publication_date = publication_date
+
+    def send_and_receive(self, request, **kwargs):
+        ttl = self._get_ttl(request)
+        if ttl <= 0:
+            return self.instance.send_and_receive(request, **kwargs)
+
+        key = self._make_key(request, ttl)
+        cached = self._cache.get(key)
+        if cached is not None:
+            publication_date, serialized_response = cached
+            if self._is_up_to_date(publication_date):
+                resp = response_pb2.Response()
+                resp.ParseFromString(serialized_response)
+                return resp
+
+        resp = self.instance.send_and_receive(request, **kwargs)
+        self._update_publication_date(resp.publication_date)
+        if resp.HasField(str('error')) and resp.error.id == response_pb2.Error.internal_error:
+            return resp
+        self._cache.set(key, (resp.publication_date, resp.SerializeToString()), ttl)
+        return resp
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
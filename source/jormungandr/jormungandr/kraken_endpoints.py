@@ -0,0 +1,281 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import deque
+import logging
+import time
+import gevent
+import pybreaker
+from jormungandr.zmq_socket_pool import ZmqSocketPool
+
+
+class _KrakenTimeout(Exception):
+    pass
+
+
+class _OpeningTime(pybreaker.CircuitBreakerListener):
+    """
+    keep the time the circuit breaker has been opened
+    """
+
+    def __init__(self):
+        self.opened_at = None
+
+    def state_change(self, cb, old_state, new_state):
+        if new_state.name == 'open':
+            self.opened_at = time.time()
+
+
+class KrakenEndpoint(object):
+    """
+    one kraken replica of a coverage, with its pool of sockets, its circuit breaker and its latency
+    """
+
+    def __init__(self, context, socket_path, pool_size, breaker_max_fail, breaker_timeout,
+                 ewma_alpha=0.2, window_size=200):
+        """
+        :param ewma_alpha: weight of the last response time in the moving average of the latency
+        :param window_size: number of response times kept to compute the percentiles
+        """
+        self.socket_path = socket_path
+        self.socket_pool = ZmqSocketPool(context, socket_path, max_size=pool_size)
+        self.opening_time = _OpeningTime()
+        self.breaker = pybreaker.CircuitBreaker(fail_max=breaker_max_fail, reset_timeout=breaker_timeout,
+                                                listeners=[self.opening_time])
+        self.ewma_alpha = ewma_alpha
+        self.latency = None  # exponentially weighted moving average of the response times, in seconds
+        self.response_times = deque(maxlen=window_size)
+        self.nb_requests = 0
+        self.nb_timeouts = 0
+        self.nb_probes = 0
+
+    def __repr__(self):
+        return '<KrakenEndpoint {}>'.format(self.socket_path)
+
+    @property
+    def load(self):
+        return self.socket_pool.nb_in_use + self.socket_pool.nb_waiting
+
+    @property
+    def is_open(self):
+        return self.breaker.current_state == 'open'
+
+    @property
+    def is_available(self):
+        # a replica with a half-open breaker is being probed
+        return self.breaker.current_state == 'closed'
+
+    def needs_probe(self):
+        """
+        pybreaker only tries again a replica with an open breaker when it is called after the reset timeout,
+        but these replicas are avoided as long as another one is available: they have to be probed
+        """
+        return self.is_open and time.time() >= self.opening_time.opened_at + self.breaker.reset_timeout
+
+    def probe(self, payload, timeout):
+        """
+        send a trial request in a greenlet, the breaker is closed if it succeeds, opened again otherwise
+        """
+        self.nb_probes += 1
+        # the breaker is half-opened right away so that the replica is only probed once
+        self.breaker.half_open()
+        gevent.spawn(self._probe, payload, timeout)
+
+    def _probe(self, payload, timeout):
+        try:
+            self.send_and_receive(payload, timeout)
+        except Exception:
+            logging.getLogger(__name__).info('the probe of %s has failed', self)
+
+    def score(self):
+        """
+        expected time to get a response, the lower the better
+
+        the endpoints without measure have a score of 0 so that they are tried
+        """
+        return (self.latency or 0) * (self.load + 1)
+
+    def _update_latency(self, duration):
+        if self.latency is None:
+            self.latency = duration
+        else:
+            self.latency = self.ewma_alpha * duration + (1 - self.ewma_alpha) * self.latency
+
+    def latency_percentile(self, p):
+        """
+        :return: the p percentile of the last response times in seconds, None if there are too few measures
+        """
+        if len(self.response_times) < 10:
+            return None
+        response_times = sorted(self.response_times)
+        return response_times[min(int(p / 100 * len(response_times)), len(response_times) - 1)]
+
+    def _send_and_receive(self, payload, timeout):
+        start = time.time()
+        response = self.socket_pool.send_and_receive(payload, timeout)
+        if response is None:
+            self.nb_timeouts += 1
+            # a timeout counts as a very slow response
+            self._update_latency(timeout / 1000)
+            raise _KrakenTimeout()
+        duration = time.time() - start
+        self._update_latency(duration)
+        self.response_times.append(duration)
+        return response
+
+    def send_and_receive(self, payload, timeout):
+        self.nb_requests += 1
+        return self.breaker.call(self._send_and_receive, payload, timeout)
+
+    def stats(self):
+        return {
+            'socket_path': self.socket_path,
+            'latency': self.latency,
+            'load': self.load,
+            'nb_requests': self.nb_requests,
+            'nb_timeouts': self.nb_timeouts,
+            'nb_probes': self.nb_probes,
+            'circuit_breaker': {
+                'current_state': self.breaker.current_state,
+                'fail_counter': self.breaker.fail_counter,
+                'reset_timeout': self.breaker.reset_timeout,
+            },
+            'zmq_socket_pool': self.socket_pool.stats(),
+        }
+
+
+class KrakenEndpoints(object):
+    """
+    several kraken replicas serving the same coverage
+
+    a request is sent to the replica with the lowest expected response time (latency times load),
+    the replicas whose circuit breaker is open are avoided, they are probed once their reset timeout has elapsed.
+    A replica not responding in time leaves the rest of the timeout to the next one.
+    With hedging, when the response has not arrived after the hedging_percentile of the response times
+    of the replica, the request is also sent to the next replica and the first response is used.
+    """
+
+    def __init__(self, context, socket_paths, pool_size, breaker_max_fail, breaker_timeout,
+                 hedging_percentile=None, hedging_min_delay=10):
+        """
+        :param hedging_percentile: percentile of the response times after which a second request is sent,
+            None to deactivate the hedging
+        :param hedging_min_delay: min delay (in milliseconds) before a second request is sent
+        """
+        self.endpoints = [KrakenEndpoint(context, socket_path, pool_size, breaker_max_fail, breaker_timeout)
+                          for socket_path in socket_paths]
+        self.hedging_percentile = hedging_percentile
+        self.hedging_min_delay = hedging_min_delay
+        self.nb_hedged = 0
+
+    def _sorted_endpoints(self):
+        return sorted(self.endpoints, key=lambda e: (not e.is_available, e.score()))
+
+    @staticmethod
+    def _send_to_first_available(endpoints, payload, timeout):
+        """
+        send the request to the first endpoint whose circuit breaker accepts it,
+        on timeout the request is sent to the next one
+
+        :return: the response, None on timeout or if no endpoint is available
+        """
+        start = time.time()
+        for i, endpoint in enumerate(endpoints):
+            # the breaker is also raising when it opens after a failure, the time left might be spent
+            remaining = timeout - int((time.time() - start) * 1000)
+            if remaining <= 0:
+                return None
+            # a slow replica must leave some time to the next available one
+            if any(e.is_available for e in endpoints[i + 1:]):
+                remaining //= 2
+            try:
+                return endpoint.send_and_receive(payload, remaining)
+            except (pybreaker.CircuitBreakerError, _KrakenTimeout):
+                continue
+        return None
+
+    def _hedging_delay(self, endpoint):
+        if not self.hedging_percentile or len(self.endpoints) < 2:
+            return None
+        delay = endpoint.latency_percentile(self.hedging_percentile)
+        if delay is None:
+            return None
+        return max(delay, self.hedging_min_delay / 1000)
+
+    def _send_in_greenlet(self, endpoints, payload, timeout):
+        try:
+            return self._send_to_first_available(endpoints, payload, timeout)
+        except Exception:
+            logging.getLogger(__name__).exception('error on the request to %s', endpoints[0])
+            return None
+
+    def send_and_receive(self, payload, timeout):
+        """
+        :param timeout: timeout in milliseconds
+        :return: the serialized response or None on timeout
+        """
+        for endpoint in self.endpoints:
+            if endpoint.needs_probe():
+                endpoint.probe(payload, timeout)
+
+        endpoints = self._sorted_endpoints()
+        delay = self._hedging_delay(endpoints[0])
+        if delay is None:
+            return self._send_to_first_available(endpoints, payload, timeout)
+
+        start = time.time()
+        first = gevent.spawn(self._send_in_greenlet, endpoints, payload, timeout)
+        first.join(timeout=delay)
+        if first.ready():
+            return first.value
+
+        # the response is late, the request is also sent to the next replica.
+        # The slowest request is not cancelled: the kraken would compute it anyway
+        # and its response time is needed to track the latency of the replica
+        self.nb_hedged += 1
+        remaining = max(timeout - int((time.time() - start) * 1000), 0)
+        futures = [first, gevent.spawn(self._send_in_greenlet, endpoints[1:], payload, remaining)]
+        while futures:
+            done = gevent.wait(futures, count=1)[0]
+            futures.remove(done)
+            if done.value is not None:
+                return done.value
+        return None
+
+    def stats(self):
+        return {
+            'hedging_percentile': self.hedging_percentile,
+            'nb_hedged': self.nb_hedged,
+            'endpoints': [e.stats() for e in self.endpoints],
+        }
@@ -0,0 +1,115 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+from threading import Lock
+import time
+
+
+class LruCache(object):
+    """
+    small in-process cache with a bounded size and a time to live
+
+    when the cache is full, the least recently used entry is evicted
+
+    >>> c = LruCache(max_size=2, ttl=60)
+    >>> c.set('a', 1)
+    >>> c.set('b', 2)
+    >>> c.get('a')
+    1
+    >>> c.set('c', 3)  # 'b' is the least recently used, it is evicted
+    >>> c.get('b') is None
+    True
+    >>> sorted(c.keys())
+    [u'a', u'c']
+    >>> c.stats()['nb_hits'], c.stats()['nb_misses']
+    (1, 1)
+    """
+
+    def __init__(self, max_size, ttl):
+        """
+        :param max_size: max number of entries
+        :param ttl: time to live of the entries in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.nb_evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        return self._data.keys()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None or item[1] < time.time():
+                self.nb_misses += 1
+                return default
+            # we put it back at the end, it is now the most recently used
+            self._data[key] = item
+            self.nb_hits += 1
+            return item[0]
+
+    def set(self, key, value, ttl=None):
+        expiration = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expiration)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.nb_evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        nb_calls = self.nb_hits + self.nb_misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'nb_hits': self.nb_hits,
+            'nb_misses': self.nb_misses,
+            'nb_evictions': self.nb_evictions,
+            'hit_rate': float(self.nb_hits) / nb_calls if nb_calls else None,
+        }
@@ -37,7 +37,7 @@ from jormungandr._version import __version__
 from jormungandr.exceptions import DeadSocketException
 from jormungandr.module_resource import ModuleResource
 from navitiacommon import type_pb2, request_pb2
-from jormungandr import i_manager
+from jormungandr import i_manager, app, timing
 from jormungandr.protobuf_to_dict import protobuf_to_dict
 from jormungandr.interfaces.v1 import fields
 from jormungandr import bss_provider_manager
@@ -79,6 +79,8 @@ class TechnicalStatus(ModuleResource):
             "regions": [],
             "bss_providers": [provider.status() for provider in bss_provider_manager.bss_providers]
         }
+        if app.config.get('TIMING_SPANS'):
+            response['timings'] = timing.timings.stats()
         regions = i_manager.get_regions()
         for key_region in regions:
             req = request_pb2.Request()
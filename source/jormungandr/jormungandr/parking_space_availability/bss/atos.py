@@ -30,7 +30,9 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from jormungandr.parking_space_availability.bss.bss_provider import BssProvider
 from jormungandr.parking_space_availability.bss.stands import Stands
+from jormungandr.parking_space_availability.bss.stations_snapshot import StationsSnapshot
 from jormungandr import cache, app
+from jormungandr.exceptions import TechnicalError
 import zeep
 import logging
 import pybreaker
@@ -46,6 +48,12 @@ class AtosProvider(BssProvider):
         self.timeout = timeout
         self._client = None
         self.breaker = pybreaker.CircuitBreaker(fail_max=kwargs.get('fail_max', 5), reset_timeout=kwargs.get('reset_timeout', 120))
+        self.snapshot = None
+        if kwargs.get('snapshot_refresh_period'):
+            # the stands of all the stations are refreshed in the background and not during the requests
+            self.snapshot = StationsSnapshot('atos {}'.format(self.id_ao),
+                                             lambda: self.breaker.call(self._fetch_all_stands),
+                                             kwargs['snapshot_refresh_period'])
 
     def __repr__(self):
         return self.WS_URL + str(self.id_ao)
@@ -58,7 +66,9 @@ class AtosProvider(BssProvider):
     def get_informations(self, poi):
         logging.debug('building stands')
         try:
-            all_stands = self.breaker.call(self._get_all_stands)
+            all_stands = self.snapshot.get_stations() if self.snapshot else None
+            if all_stands is None:
+                all_stands = self.breaker.call(self._get_all_stands)
             ref = poi.get('properties', {}).get('ref')
             if ref:
                 stands = all_stands.get(ref.lstrip('0'))
@@ -69,9 +79,13 @@ class AtosProvider(BssProvider):
 
     @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_ATOS', 30))
     def _get_all_stands(self):
+        return self._fetch_all_stands()
+
+    def _fetch_all_stands(self):
         client = self._get_client()
         if not client:
-            return {}
+            # it is a failure, an empty dict would be kept as the stands of all the stations
+            raise TechnicalError('impossible to access the atos service {}'.format(self.id_ao))
         all_stands = client.service.getSummaryInformationTerminals(self.id_ao)
         return {stands.libelle: Stands(stands.nbPlacesDispo, stands.nbVelosDispo) for stands in all_stands}
 
@@ -82,4 +96,7 @@ class AtosProvider(BssProvider):
         return self._client
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators, 'id_ao': self.id_ao}
+        status = {'network': self.network, 'operators': self.operators, 'id_ao': self.id_ao}
+        if self.snapshot:
+            status['snapshot'] = self.snapshot.status()
+        return status
@@ -29,7 +29,9 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from jormungandr.parking_space_availability.bss.bss_provider import BssProvider
 from jormungandr.parking_space_availability.bss.stands import Stands
+from jormungandr.parking_space_availability.bss.stations_snapshot import StationsSnapshot
 from jormungandr import cache, app
+from jormungandr.http_client import HttpClient
 import pybreaker
 import requests as requests
 import logging
@@ -38,8 +40,14 @@ import logging
 class JcdecauxProvider(BssProvider):
 
     WS_URL_TEMPLATE = 'https://api.jcdecaux.com/vls/v1/stations/{}?contract={}&apiKey={}'
+    WS_ALL_STATIONS_URL_TEMPLATE = 'https://api.jcdecaux.com/vls/v1/stations?contract={}&apiKey={}'
 
-    def __init__(self, network, contract, api_key, operators={'jcdecaux'}, timeout=10, **kwargs):
+    def __init__(self, network, contract, api_key, operators={'jcdecaux'}, timeout=10,
+                 snapshot_refresh_period=None, **kwargs):
+        """
+        :param snapshot_refresh_period: if given (in seconds), all the stations of the contract are
+        fetched periodically in the background and the stands are read from this snapshot
+        """
         self.network = network.lower()
         self.contract = contract
         self.api_key = api_key
@@ -48,6 +56,11 @@ class JcdecauxProvider(BssProvider):
         fail_max = kwargs.get('circuit_breaker_max_fail', app.config['CIRCUIT_BREAKER_MAX_JCDECAUX_FAIL'])
         reset_timeout = kwargs.get('circuit_breaker_reset_timeout', app.config['CIRCUIT_BREAKER_JCDECAUX_TIMEOUT_S'])
         self.breaker = pybreaker.CircuitBreaker(fail_max=fail_max, reset_timeout=reset_timeout)
+        self.http_client = HttpClient('jcdecaux {}'.format(self.contract), **kwargs.get('http_client', {}))
+        self.snapshot = None
+        if snapshot_refresh_period:
+            self.snapshot = StationsSnapshot('jcdecaux {}'.format(self.contract), self._get_all_stands,
+                                             snapshot_refresh_period)
 
     def support_poi(self, poi):
         properties = poi.get('properties', {})
@@ -57,7 +70,7 @@ class JcdecauxProvider(BssProvider):
     @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_JCDECAUX', 30))
     def _call_webservice(self, station_id):
         try:
-            data = self.breaker.call(requests.get, self.WS_URL_TEMPLATE.format(station_id, self.contract, self.api_key), timeout=self.timeout)
+            data = self.breaker.call(self.http_client.get, self.WS_URL_TEMPLATE.format(station_id, self.contract, self.api_key), timeout=self.timeout)
             return data.json()
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('JCDecaux service dead (error: {})'.format(e))
@@ -67,11 +80,41 @@ class JcdecauxProvider(BssProvider):
             logging.getLogger(__name__).exception('JCDecaux error')
         return None
 
+    def _get_all_stands(self):
+        """
+        get the stands of all the stations of the contract, for the snapshot
+        """
+        try:
+            data = self.breaker.call(self.http_client.get, self.WS_ALL_STATIONS_URL_TEMPLATE.format(self.contract,
+                                                                                                    self.api_key),
+                                     timeout=self.timeout)
+            stations = data.json()
+        except pybreaker.CircuitBreakerError as e:
+            logging.getLogger(__name__).error('JCDecaux service dead (error: {})'.format(e))
+            return None
+        except requests.Timeout as t:
+            logging.getLogger(__name__).error('JCDecaux service timeout (error: {})'.format(t))
+            return None
+        if not isinstance(stations, list):
+            logging.getLogger(__name__).error('invalid JCDecaux response: {}'.format(stations))
+            return None
+        return {unicode(s['number']): Stands(s['available_bike_stands'], s['available_bikes'])
+                for s in stations
+                if 'number' in s and 'available_bike_stands' in s and 'available_bikes' in s}
+
     def get_informations(self, poi):
         ref = poi.get('properties', {}).get('ref')
+        if self.snapshot:
+            stations = self.snapshot.get_stations()
+            if stations is not None:
+                return stations.get(ref)
         data = self._call_webservice(ref)
         if data and 'available_bike_stands' in data and 'available_bikes' in data:
             return Stands(data['available_bike_stands'], data['available_bikes'])
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators, 'contract': self.contract}
+        status = {'network': self.network, 'operators': self.operators, 'contract': self.contract,
+                  'http_client': self.http_client.stats()}
+        if self.snapshot:
+            status['snapshot'] = self.snapshot.status()
+        return status
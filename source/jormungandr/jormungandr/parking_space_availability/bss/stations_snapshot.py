@@ -0,0 +1,95 @@
+# Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import logging
+import time
+import gevent
+
+
+class StationsSnapshot(object):
+    """
+    availability of all the stations of a bss provider, refreshed in the background by a greenlet
+
+    the greenlet is started at the first use of the snapshot, until the first successful refresh
+    (or if the refreshes fail for more than max_age seconds) the snapshot is unavailable
+    and the providers should fall back on their direct call to the service
+    """
+
+    def __init__(self, name, fetch, refresh_period, max_age=None):
+        """
+        :param fetch: function returning a dict station ref -> Stands for all the stations, or None on failure
+        :param refresh_period: time (in seconds) between two refreshes
+        :param max_age: time (in seconds) after which the stations are too old to be used
+        """
+        self.name = name
+        self.fetch = fetch
+        self.refresh_period = refresh_period
+        self.max_age = max_age if max_age is not None else 3 * refresh_period
+        self._stations = None
+        self._update_date = None
+        self._greenlet = None
+        self.nb_refreshes = 0
+        self.nb_failures = 0
+
+    def refresh(self):
+        try:
+            stations = self.fetch()
+        except Exception:
+            logging.getLogger(__name__).exception('impossible to refresh the stations of %s', self.name)
+            stations = None
+        if stations is None:
+            self.nb_failures += 1
+            return
+        self._stations = stations
+        self._update_date = time.time()
+        self.nb_refreshes += 1
+
+    def _refresh_loop(self):
+        while True:
+            self.refresh()
+            gevent.sleep(self.refresh_period)
+
+    def get_stations(self):
+        """
+        :return: the dict station ref -> Stands, or None if the snapshot is not available
+        """
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._refresh_loop)
+        if self._stations is None or time.time() - self._update_date > self.max_age:
+            return None
+        return self._stations
+
+    def status(self):
+        return {
+            'refresh_period': self.refresh_period,
+            'nb_stations': len(self._stations) if self._stations is not None else None,
+            'last_update': self._update_date,
+            'nb_refreshes': self.nb_refreshes,
+            'nb_failures': self.nb_failures,
+        }
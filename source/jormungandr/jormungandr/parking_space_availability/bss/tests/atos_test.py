@@ -126,3 +126,27 @@ def parking_space_availability_atos_get_all_stands_urlerror_test():
 
     with pytest.raises(Exception):
         provider._get_all_stands()
+
+
+def parking_space_availability_atos_snapshot_without_client_test():
+    """
+    without client the refresh fails, the snapshot keeps the previous stands
+    """
+    provider = AtosProvider(u'10', u'vélitul', u'https://webservice.atos.com?wsdl', {'keolis'},
+                            snapshot_refresh_period=30)
+    stands = lambda: None
+    stands.libelle = '2'
+    stands.nbPlacesDispo = 5
+    stands.nbVelosDispo = 9
+    client = lambda: None
+    client.service = lambda: None
+    client.service.getSummaryInformationTerminals = MagicMock(return_value=[stands])
+    provider._get_client = MagicMock(return_value=client)
+    provider.snapshot.refresh()
+
+    provider._get_client = MagicMock(return_value=None)
+    provider.snapshot.refresh()
+    assert provider.snapshot.nb_failures == 1
+    assert provider.breaker.fail_counter == 1
+    assert provider.snapshot.status()['nb_stations'] == 1
+    assert provider.get_informations(poi) == Stands(5, 9)
@@ -101,3 +101,22 @@ def test_call_mocked_request():
         m.get('https://api.jcdecaux.com/vls/v1/stations/2', json=webservice_response)
         assert provider.get_informations(poi) == Stands(4, 8)
         assert m.called
+
+def parking_space_availability_jcdecaux_snapshot_test():
+    """
+    with a snapshot, the stands are read in the stations of the whole contract
+    """
+    all_stations = [
+        {'number': 2, 'available_bike_stands': 4, 'available_bikes': 8},
+        {'number': 3, 'available_bike_stands': 1, 'available_bikes': 2},
+    ]
+    provider = JcdecauxProvider(u"vélib'", 'Paris', 'api_key', {'jcdecaux'}, snapshot_refresh_period=30)
+    provider._call_webservice = MagicMock(return_value=None)
+    with requests_mock.Mocker() as m:
+        m.get('https://api.jcdecaux.com/vls/v1/stations?contract=Paris', json=all_stations)
+        provider.snapshot.refresh()
+        provider.snapshot._greenlet = 'not started in the test'
+        assert provider.get_informations(poi) == Stands(4, 8)
+        assert provider.get_informations({'properties': {'ref': '3'}}) == Stands(1, 2)
+        assert provider.get_informations({'properties': {'ref': '42'}}) is None
+        assert not provider._call_webservice.called
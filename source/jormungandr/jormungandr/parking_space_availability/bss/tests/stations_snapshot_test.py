@@ -0,0 +1,70 @@
+# Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+from jormungandr.parking_space_availability.bss.stations_snapshot import StationsSnapshot
+from jormungandr.parking_space_availability.bss.stands import Stands
+
+
+def stations_snapshot_refresh_test():
+    """
+    the snapshot is unavailable until the background greenlet has fetched the stations
+    """
+    all_stations = {'2': Stands(4, 8)}
+    snapshot = StationsSnapshot('test', lambda: all_stations, refresh_period=10)
+    assert snapshot.get_stations() is None
+    gevent.sleep(0)
+    assert snapshot.get_stations() == all_stations
+    assert snapshot.nb_refreshes == 1
+    assert snapshot.status()['nb_stations'] == 1
+
+
+def stations_snapshot_failure_test():
+    """
+    a failing refresh keeps the previous stations until they are too old
+    """
+    responses = [{'2': Stands(4, 8)}, None]
+    snapshot = StationsSnapshot('test', lambda: responses.pop(0), refresh_period=10, max_age=60)
+    snapshot.refresh()
+    snapshot._greenlet = 'not started in the test'
+    snapshot.refresh()
+    assert snapshot.nb_failures == 1
+    assert snapshot.get_stations() == {'2': Stands(4, 8)}
+    snapshot._update_date -= 61
+    assert snapshot.get_stations() is None
+
+
+def stations_snapshot_exception_test():
+    def fetch():
+        raise Exception('service is dead')
+    snapshot = StationsSnapshot('test', fetch, refresh_period=10)
+    snapshot.refresh()
+    assert snapshot.nb_failures == 1
+    snapshot._greenlet = 'not started in the test'
+    assert snapshot.get_stations() is None
@@ -31,7 +31,7 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 from functools import wraps
-from jormungandr import authentication
+from jormungandr import authentication, i_manager
 import flask_restful
 from datetime import datetime
 
@@ -48,3 +48,18 @@ def quota_control(func):
         return func(*args, **kwargs)
 
     return wrapper
+
+
+def admission_control(func):
+    """
+    Decorator limiting the number of requests computed at the same time for a token
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = authentication.get_token()
+        user = authentication.get_user(token=token, abort_if_no_token=False)
+        billing_plan = user.billing_plan.name if user is not None and user.billing_plan else None
+        with i_manager.admission_controller.admit_client(token, billing_plan):
+            return func(*args, **kwargs)
+
+    return wrapper
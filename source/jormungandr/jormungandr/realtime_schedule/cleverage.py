@@ -34,6 +34,7 @@ import pybreaker
 import pytz
 import requests as requests
 from jormungandr import cache, app
+from jormungandr.http_client import HttpClient
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime
 
@@ -53,6 +54,7 @@ class Cleverage(RealtimeProxy):
         self.instance = instance
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_CLEVERAGE_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_CLEVERAGE_TIMEOUT_S'])
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
         self.timezone = pytz.timezone(timezone)
 
     def __repr__(self):
@@ -68,7 +70,7 @@ class Cleverage(RealtimeProxy):
         """
         logging.getLogger(__name__).debug('Cleverage RT service , call url : {}'.format(url))
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout, headers=self.service_args)
+            return self.breaker.call(self.http_client.get, url, timeout=self.timeout, headers=self.service_args)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Cleverage RT service dead, using base '
                                               'schedule (error: {}'.format(e))
@@ -151,4 +153,5 @@ class Cleverage(RealtimeProxy):
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
+                'http_client': self.http_client.stats(),
                 }
@@ -40,6 +40,10 @@ class RealtimeProxy(object):
     """
     __metaclass__ = ABCMeta
 
+    # True if the proxy can get the next passages of several route points at once
+    # (it must then implement _get_next_passages_for_route_points)
+    supports_multiple_route_points = False
+
     @abstractmethod
     def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt):
         """
@@ -47,6 +51,14 @@ class RealtimeProxy(object):
         """
         pass
 
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt):
+        """
+        method that calls the external service to get the next passages of several route_points
+
+        :return: a dict route_point -> next passages
+        """
+        raise NotImplementedError()
+
     def _filter_passages(self, passages, count, from_dt):
         """
         after getting the next passages from the proxy, we might want to filter some
@@ -84,6 +96,19 @@ class RealtimeProxy(object):
 
         return filtered_passage
 
+    def next_passages_for_route_points(self, route_points, count=None, from_dt=None, current_dt=None):
+        """
+        returns the next realtime passages of several route points, as a dict route_point -> passages
+
+        the route points are queried in one go if the proxy supports it, else one by one
+        """
+        if not self.supports_multiple_route_points:
+            return {rp: self.next_passage_for_route_point(rp, count, from_dt, current_dt) for rp in route_points}
+
+        next_passages = self._get_next_passages_for_route_points(route_points, count, from_dt, current_dt)
+
+        return {rp: self._filter_passages(next_passages.get(rp), count, from_dt) for rp in route_points}
+
     @abstractmethod
     def status(self):
         """
@@ -30,10 +30,14 @@
 # www.navitia.io
 
 from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import defaultdict
 from flask import logging
+import gevent
+import gevent.pool
 import pybreaker
 import requests as requests
 from jormungandr import cache, app
+from jormungandr.http_client import HttpClient
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy
 from jormungandr.schedule import RealTimePassage
 import xml.etree.ElementTree as et
@@ -47,7 +51,7 @@ class Siri(RealtimeProxy):
     """
 
     def __init__(self, id, service_url, requestor_ref,
-                 object_id_tag=None, destination_id_tag=None, instance=None, timeout=10, **kwargs):
+                 object_id_tag=None, destination_id_tag=None, instance=None, timeout=10, pool_size=None, **kwargs):
         self.service_url = service_url
         self.requestor_ref = requestor_ref # login for siri
         self.timeout = timeout  #timeout in seconds
@@ -57,6 +61,9 @@ class Siri(RealtimeProxy):
         self.instance = instance
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config.get('CIRCUIT_BREAKER_MAX_SIRI_FAIL', 5),
                                                 reset_timeout=app.config.get('CIRCUIT_BREAKER_SIRI_TIMEOUT_S', 60))
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
+        # max number of stops queried at the same time by a request
+        self.pool_size = pool_size or app.config.get('GREENLET_POOL_SIZE', 3)
 
     def __repr__(self):
         """
@@ -64,8 +71,9 @@ class Siri(RealtimeProxy):
         """
         return self.rt_system_id
 
-    def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt):
-        stop = route_point.fetch_stop_id(self.object_id_tag)
+    supports_multiple_route_points = True
+
+    def _get_stop_monitoring(self, stop, count, from_dt):
         request = self._make_request(monitoring_ref=stop, dt=from_dt, count=count)
         if not request:
             return None
@@ -73,7 +81,45 @@ class Siri(RealtimeProxy):
         if not siri_response or siri_response.status_code != 200:
             return None
         logging.getLogger(__name__).debug('siri for {}: {}'.format(stop, siri_response.text))
-        return self._get_passages(siri_response.content, route_point)
+        return siri_response.content
+
+    def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt):
+        stop = route_point.fetch_stop_id(self.object_id_tag)
+        content = self._get_stop_monitoring(stop, count, from_dt)
+        if content is None:
+            return None
+        return self._get_passages(content, route_point)
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt):
+        """
+        the StopMonitoring response gives the visits of all the lines of the stop,
+        so there is only one call by stop for all the route points of this stop,
+        the stops are queried concurrently on a bounded pool of greenlets
+        """
+        route_points_by_stop = defaultdict(list)
+        for route_point in route_points:
+            route_points_by_stop[route_point.fetch_stop_id(self.object_id_tag)].append(route_point)
+
+        pool = gevent.pool.Pool(self.pool_size)
+        futures = {stop: pool.spawn(self._get_stop_monitoring, stop, count, from_dt)
+                   for stop in route_points_by_stop}
+        gevent.joinall(futures.values())
+
+        next_passages = {}
+        for stop, stop_route_points in route_points_by_stop.items():
+            future = futures[stop]
+            if not future.successful():
+                logging.getLogger(__name__).error('siri RT error on {}: {}'.format(stop, future.exception))
+                continue
+            content = future.value
+            if content is None:
+                continue
+            try:
+                for route_point in stop_route_points:
+                    next_passages[route_point] = self._get_passages(content, route_point)
+            except et.ParseError:
+                continue
+        return next_passages
 
     def status(self):
         return {
@@ -84,6 +130,7 @@ class Siri(RealtimeProxy):
                 'fail_counter': self.breaker.fail_counter,
                 'reset_timeout': self.breaker.reset_timeout
             },
+            'http_client': self.http_client.stats(),
         }
 
     def _get_passages(self, xml, route_point):
@@ -125,7 +172,7 @@ class Siri(RealtimeProxy):
 
         logging.getLogger(__name__).debug('siri RT service, post at {}: {}'.format(self.service_url, request))
         try:
-            return self.breaker.call(requests.post,
+            return self.breaker.call(self.http_client.post,
                                      url=self.service_url,
                                      headers=headers,
                                      data=encoded_request,
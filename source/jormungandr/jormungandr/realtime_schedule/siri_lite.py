@@ -34,6 +34,7 @@ import pybreaker
 import pytz
 import requests as requests
 from jormungandr import cache, app
+from jormungandr.http_client import HttpClient
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime
 
@@ -49,6 +50,7 @@ class SiriLite(RealtimeProxy):
         self.object_id_tag = object_id_tag if object_id_tag else id
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config.get('CIRCUIT_BREAKER_MAX_SIRILITE_FAIL', 5),
                                                 reset_timeout=app.config.get('CIRCUIT_BREAKER_SIRILITE_TIMEOUT_S', 60))
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
 
     def __repr__(self):
         """
@@ -60,7 +62,7 @@ class SiriLite(RealtimeProxy):
     def _call(self, url):
         logging.getLogger(__name__).debug('sirilite RT service, call url: {}'.format(url))
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self.breaker.call(self.http_client.get, url, timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('sirilite RT service dead, using base '
                                               'schedule (error: {}'.format(e))
@@ -154,4 +156,5 @@ class SiriLite(RealtimeProxy):
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
+                'http_client': self.http_client.stats(),
                 }
@@ -40,6 +40,7 @@ from flask import logging
 import pybreaker
 import requests as requests
 from jormungandr import cache, app
+from jormungandr.http_client import HttpClient
 from datetime import datetime, time
 from jormungandr.utils import timestamp_to_datetime
 from navitiacommon.ratelimit import RateLimiter, FakeRateLimiter
@@ -84,6 +85,7 @@ class Synthese(RealtimeProxy):
         self.instance = instance
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_SYNTHESE_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_SYNTHESE_TIMEOUT_S'])
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
         self.timezone = pytz.timezone(timezone)
         if not redis_host:
             self.rate_limiter = FakeRateLimiter()
@@ -107,7 +109,7 @@ class Synthese(RealtimeProxy):
             if not self.rate_limiter.acquire(self.rt_system_id, block=False):
                 self.record_external_failure('maximum rate reached')
                 return None  #this should not be cached :(
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self.breaker.call(self.http_client.get, url, timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Synthese RT service dead, using base '
                                               'schedule (error: {}'.format(e))
@@ -220,6 +222,7 @@ class Synthese(RealtimeProxy):
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
+                'http_client': self.http_client.stats(),
                 }
 
     def _timestamp_to_date(self, timestamp):
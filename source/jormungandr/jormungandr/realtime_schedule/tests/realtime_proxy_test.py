@@ -29,9 +29,11 @@
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
 from datetime import datetime
+import mock
 import pytz
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy
-from jormungandr.schedule import RealTimePassage
+from jormungandr.schedule import RealTimePassage, RoutePoint, MixedSchedule, RT_PROXY_PROPERTY_NAME
+from navitiacommon import type_pb2
 from jormungandr.utils import date_to_timestamp as d2t
 
 
@@ -121,3 +123,84 @@ def filter_filter_dt_all_test(mocker):
 
     r = proxy.next_passage_for_route_point(None, count=1, from_dt=d2t(dt("15:00")))
     assert r is None
+
+
+class MultipleRoutePointsProxy(CustomProxy):
+    """
+    mock proxy that gets the next passages of all the route points in one call
+    """
+    supports_multiple_route_points = True
+
+    def __init__(self, passages):
+        super(MultipleRoutePointsProxy, self).__init__(passages)
+        self.nb_calls = 0
+
+    def _get_next_passages_for_route_points(self, route_points, count=None, from_dt=None, current_dt=None):
+        self.nb_calls += 1
+        return {rp: list(self.hard_coded_passages) for rp in route_points}
+
+
+def next_passages_for_route_points_test():
+    proxy = CustomProxy([passage("10:00"), passage("11:00"), passage("12:00")])
+
+    r = proxy.next_passages_for_route_points(['rp1', 'rp2'], count=2)
+
+    assert {rp: map(get_dt, p) for rp, p in r.items()} == {'rp1': [dt("10:00"), dt("11:00")],
+                                                           'rp2': [dt("10:00"), dt("11:00")]}
+
+
+def next_passages_for_route_points_in_one_call_test():
+    proxy = MultipleRoutePointsProxy([passage("10:00"), passage("11:00"), passage("12:00")])
+
+    r = proxy.next_passages_for_route_points(['rp1', 'rp2'], count=1)
+
+    assert proxy.nb_calls == 1
+    assert {rp: map(get_dt, p) for rp, p in r.items()} == {'rp1': [dt("10:00")], 'rp2': [dt("10:00")]}
+
+
+def _route_point(stop_uri, route_uri, rt_system=None):
+    route = type_pb2.Route()
+    route.uri = route_uri
+    if rt_system:
+        prop = route.line.properties.add()
+        prop.name = RT_PROXY_PROPERTY_NAME
+        prop.value = rt_system
+    stop_point = type_pb2.StopPoint()
+    stop_point.uri = stop_uri
+    return RoutePoint(route, stop_point)
+
+
+class FailingProxy(CustomProxy):
+    def _get_next_passage_for_route_point(self, route_point, count=None, from_dt=None, current_dt=None):
+        raise Exception('proxy is dead')
+
+
+def mixed_schedule_realtime_passages_by_route_point_test():
+    """
+    the route points are grouped by realtime system,
+    the proxy supporting it is called only once for all its route points
+    """
+    multiple = MultipleRoutePointsProxy([passage("10:00")])
+    proxies = {'multiple': multiple,
+               'single': CustomProxy([passage("11:00")]),
+               'failing': FailingProxy([])}
+    instance = mock.MagicMock()
+    instance.realtime_proxy_manager.get = proxies.get
+    route_points = [_route_point('sp1', 'r1', 'multiple'),
+                    _route_point('sp2', 'r1', 'multiple'),
+                    _route_point('sp1', 'r2', 'single'),
+                    _route_point('sp2', 'r2', 'single'),
+                    _route_point('sp1', 'r3', 'failing'),
+                    _route_point('sp1', 'r4', 'unknown'),
+                    _route_point('sp1', 'r5')]
+    request = {'items_per_schedule': None, 'from_datetime': None, '_current_datetime': None}
+
+    r = MixedSchedule(instance)._get_next_realtime_passages_by_route_point(route_points, request)
+
+    assert multiple.nb_calls == 1
+    assert {rp.pb_route.uri: p and map(get_dt, p) for rp, p in r.items()} == {'r1': [dt("10:00")],
+                                                                             'r2': [dt("11:00")],
+                                                                             'r3': None,
+                                                                             'r4': None,
+                                                                             'r5': None}
+    assert len(r) == len(route_points)
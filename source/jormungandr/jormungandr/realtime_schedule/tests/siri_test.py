@@ -29,6 +29,7 @@
 # www.navitia.io
 import datetime
 from dateutil.parser import parse
+import gevent
 import mock
 import pytz
 from jormungandr.realtime_schedule.siri import Siri
@@ -152,3 +153,49 @@ def status_test():
     siri = Siri(id='tata', service_url='http://bob.com/', requestor_ref='Stibada')
     status = siri.status()
     assert status['id'] == 'tata'
+
+
+def next_passages_for_route_points_test():
+    """
+    the route points of the same stop share the same siri call
+    """
+    siri = Siri(id='tata', service_url='http://bob.com/', requestor_ref='Stibada')
+    mock_requests = MockRequests({'http://bob.com/': (mock_good_response(), 200)})
+    route_points = [MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu'),
+                    MockRoutePoint(route_id='route_titi', line_id='line_toto', stop_id='stop_tutu'),
+                    MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tete')]
+
+    with mock.patch('requests.post', side_effect=mock_requests.post) as mock_post:
+        passages = siri.next_passages_for_route_points(route_points,
+                                                       from_dt=_timestamp("12:00"),
+                                                       current_dt=_timestamp("12:00"),
+                                                       count=1)
+        assert mock_post.call_count == 2
+        assert len(passages[route_points[0]]) == 1
+        assert passages[route_points[0]][0].datetime == datetime.datetime(2016, 3, 29, 13, 37, tzinfo=pytz.UTC)
+        assert passages[route_points[1]] == []
+        assert passages[route_points[2]] == []
+
+
+def next_passages_for_route_points_bounded_test():
+    """
+    the stops are queried concurrently, but not more than pool_size at the same time
+    """
+    siri = Siri(id='tata', service_url='http://bob.com/', requestor_ref='Stibada', pool_size=2)
+    running = []
+    max_running = []
+
+    def get_stop_monitoring(stop, count, from_dt):
+        running.append(stop)
+        max_running.append(len(running))
+        gevent.sleep(0.01)
+        running.remove(stop)
+        return None
+    siri._get_stop_monitoring = get_stop_monitoring
+
+    route_points = [MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_{}'.format(i))
+                    for i in range(5)]
+    siri.next_passages_for_route_points(route_points, from_dt=_timestamp("12:00"),
+                                        current_dt=_timestamp("12:00"), count=1)
+    assert max(max_running) == 2
+    assert len(max_running) == 5
@@ -34,6 +34,7 @@ import pybreaker
 import pytz
 import requests as requests
 from jormungandr import cache, app
+from jormungandr.http_client import HttpClient
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime, time
@@ -63,6 +64,7 @@ class Timeo(RealtimeProxy):
         fail_max = kwargs.get('circuit_breaker_max_fail', app.config['CIRCUIT_BREAKER_MAX_TIMEO_FAIL'])
         reset_timeout = kwargs.get('circuit_breaker_reset_timeout', app.config['CIRCUIT_BREAKER_TIMEO_TIMEOUT_S'])
         self.breaker = pybreaker.CircuitBreaker(fail_max=fail_max, reset_timeout=reset_timeout)
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
 
         # Note: if the timezone is not know, pytz raise an error
         self.timezone = pytz.timezone(timezone)
@@ -97,7 +99,7 @@ class Timeo(RealtimeProxy):
         try:
             if not self.rate_limiter.acquire(self.rt_system_id, block=False):
                 return None
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self.breaker.call(self.http_client.get, url, timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Timeo RT service dead, using base '
                                               'schedule (error: {}'.format(e))
@@ -244,6 +246,7 @@ class Timeo(RealtimeProxy):
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
+                'http_client': self.http_client.stats(),
                 }
 
     @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PTOBJECTS', 600))
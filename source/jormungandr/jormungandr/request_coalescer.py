@@ -0,0 +1,154 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import copy
+from gevent.lock import Semaphore
+from jormungandr.lru_cache import LruCache
+
+
+_MISSING = object()
+
+
+class _InFlightRequest(object):
+    def __init__(self):
+        self.lock = Semaphore()
+        self.response = _MISSING
+        self.error = None
+
+
+def _copy_response(response):
+    if hasattr(response, 'CopyFrom'):
+        # protobuf response
+        response_copy = type(response)()
+        response_copy.CopyFrom(response)
+        return response_copy
+    return copy.deepcopy(response)
+
+
+class RequestCoalescer(object):
+    """
+    share the response of a request between the identical requests dispatched at the same time
+
+    when an identical request (same api, same instance, same arguments) is already being computed,
+    the greenlet waits for its response instead of calling the kraken.
+    When the request fails, the waiting requests get the same error.
+    With a ttl the responses are also kept for a few seconds and given to the next identical requests,
+    the datetimes of the requests (ex: from_datetime of the departure boards, to the second) are then rounded
+    to the ttl so that the requests made from the current time are identical during the ttl.
+
+    Each caller gets its own copy of the response since the interfaces can modify it.
+    """
+
+    def __init__(self, apis, ttl=0, max_size=1000, ignored_args=('_current_datetime', 'original_datetime'),
+                 rounded_args=('from_datetime',)):
+        """
+        :param apis: the apis whose requests are coalesced (ex: departure_boards, stop_schedules...)
+        :param ttl: time to live (in seconds) of the responses, 0 to only share the responses of the running requests
+        :param max_size: max number of responses kept
+        :param ignored_args: arguments not taken into account to compare the requests,
+            by default the datetimes of the request at the microsecond (from_datetime is used)
+        :param rounded_args: timestamp arguments rounded down to the ttl to compare the requests
+        """
+        self.apis = set(apis)
+        self.ttl = ttl
+        self.ignored_args = set(ignored_args)
+        self.rounded_args = set(rounded_args)
+        self.responses = LruCache(max_size=max_size, ttl=ttl) if ttl else None
+        self._in_flight = {}
+        self.nb_calls = 0
+        self.nb_coalesced = 0
+
+    def handles(self, api):
+        return api in self.apis
+
+    def _round(self, arg, value):
+        if self.ttl and arg in self.rounded_args and isinstance(value, (int, long)):
+            return value - value % self.ttl
+        return value
+
+    def _key(self, api, instance, arguments):
+        args = sorted((k, self._round(k, v)) for k, v in arguments.items() if k not in self.ignored_args)
+        # the responses of an older version of the data must not be given
+        return api, instance.name, instance.publication_date, repr(args)
+
+    def call(self, api_func, api, instance, arguments):
+        """
+        call api_func(arguments, instance) unless an identical request is being computed or has been cached
+        """
+        key = self._key(api, instance, arguments)
+        if self.responses is not None:
+            response = self.responses.get(key, _MISSING)
+            if response is not _MISSING:
+                self.nb_coalesced += 1
+                return _copy_response(response)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            with in_flight.lock:
+                pass
+            if in_flight.error is not None:
+                # the kraken must not get all the waiting requests when it is dead or too slow
+                self.nb_coalesced += 1
+                raise in_flight.error
+            if in_flight.response is not _MISSING:
+                self.nb_coalesced += 1
+                return _copy_response(in_flight.response)
+            # the other request has been killed, we try on our own
+
+        in_flight = _InFlightRequest()
+        with in_flight.lock:
+            self._in_flight[key] = in_flight
+            try:
+                self.nb_calls += 1
+                try:
+                    response = api_func(arguments, instance)
+                except Exception as e:
+                    in_flight.error = e
+                    raise
+                # the response is copied since the caller can modify it
+                in_flight.response = _copy_response(response)
+                if self.responses is not None:
+                    self.responses.set(key, in_flight.response)
+                return response
+            finally:
+                if self._in_flight.get(key) is in_flight:
+                    del self._in_flight[key]
+
+    def stats(self):
+        return {
+            'apis': sorted(self.apis),
+            'nb_calls': self.nb_calls,
+            'nb_coalesced': self.nb_coalesced,
+            'nb_in_flight': len(self._in_flight),
+            'responses': self.responses.stats() if self.responses is not None else None,
+        }
@@ -49,6 +49,7 @@ from jormungandr.scenarios.helpers import fallback_mode_comparator
 from jormungandr.utils import pb_del_if, date_to_timestamp
 import flask
 import gevent, gevent.pool
+from jormungandr import timing
 
 non_pt_types = ['non_pt_walk', 'non_pt_bike', 'non_pt_bss']
 
@@ -169,7 +170,8 @@ class Scenario(simple.Scenario):
                 req.journeys.streetnetwork_params.enable_direct_path = False
             else:
                 req.journeys.streetnetwork_params.enable_direct_path = True
-            futures.append(pool.spawn(worker, o_mode, d_mode, instance, local_req, request_id=flask.request.id))
+            futures.append(pool.spawn(timing.keep_spans(worker), o_mode, d_mode, instance, local_req,
+                                      request_id=flask.request.id))
 
         for future in gevent.iwait(futures):
             o_mode, d_mode, local_resp = future.get()
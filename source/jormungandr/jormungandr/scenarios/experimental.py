@@ -36,7 +36,7 @@ from jormungandr.scenarios.utils import fill_uris
 from jormungandr.planner import JourneyParameters
 from flask import g
 from jormungandr.utils import get_uri_pt_object, generate_id, get_pt_object_coord, PeriodExtremity
-from jormungandr import app
+from jormungandr import app, timing
 import gevent
 import gevent.pool
 import collections
@@ -114,7 +114,15 @@ def get_direct_path_if_exists(fallback_direct_path_pool, mode, orig_uri, dest_ur
         return None
 
     # align datetimes to requested ones (as we consider fallback duration are the same no matter when)
-    journey = dp_copy.journeys[0]
+    align_direct_path_datetimes(dp_copy.journeys[0], fallback_extremity)
+    return dp_copy
+
+
+def align_direct_path_datetimes(journey, fallback_extremity):
+    """
+    :param fallback_extremity: is a PeriodExtremity (a datetime and it's meaning on the fallback period)
+    shift the datetimes of the direct path journey to the given fallback extremity
+    """
     datetime, represents_start_fallback = fallback_extremity
     if represents_start_fallback:
         journey.departure_date_time = datetime
@@ -128,7 +136,6 @@ def get_direct_path_if_exists(fallback_direct_path_pool, mode, orig_uri, dest_ur
         for s in journey.sections:
             s.begin_date_time += delta
             s.end_date_time += delta
-    return dp_copy
 
 
 class FallbackDuration(dict):
@@ -297,6 +304,12 @@ def _sn_routing_matrix(instance, origins, destinations, is_orig_center, mode, ma
             return {mode: {center_isochrone.uri: {"duration": 0, "status": response_pb2.reached}}}
         else:
             return {mode: {}}
+    sn_cache = instance.street_network_cache
+    if sn_cache:
+        result = sn_cache.get_routing_matrix(center_isochrone, places_isochrone, is_orig_center,
+                                             mode, max_duration_to_pt, request)
+        if result is not None:
+            return result
     sn_routing_matrix = instance.get_street_network_routing_matrix(origins,
                                                                    destinations,
                                                                    mode,
@@ -312,6 +325,9 @@ def _sn_routing_matrix(instance, origins, destinations, is_orig_center, mode, ma
             duration = _get_duration(r, places_isochrone[pos], mode, **kwargs)
             if duration < max_duration_to_pt:
                 result[mode].update({places_isochrone[pos].uri: {'duration': duration, 'status': r.routing_status}})
+    if sn_cache:
+        sn_cache.set_routing_matrix(center_isochrone, places_isochrone, is_orig_center,
+                                    mode, max_duration_to_pt, request, result)
     return result
 
 
@@ -336,7 +352,7 @@ class AsyncWorker(object):
         called_arr_modes = set()
         for dep_mode, arr_mode in self.krakens_call:
             if dep_mode not in called_dep_modes:
-                origin_futures.append(self.pool.spawn(_sn_routing_matrix,
+                origin_futures.append(self.pool.spawn(timing.keep_spans(_sn_routing_matrix),
                                                       self.instance,
                                                       [origin],
                                                       origins_places_crowfly[dep_mode],
@@ -347,7 +363,7 @@ class AsyncWorker(object):
                                                       **self.speed_switcher))
                 called_dep_modes.add(dep_mode)
             if arr_mode not in called_arr_modes:
-                destination_futures.append(self.pool.spawn(_sn_routing_matrix,
+                destination_futures.append(self.pool.spawn(timing.keep_spans(_sn_routing_matrix),
                                                            self.instance,
                                                            destinations_places_crowfly[arr_mode],
                                                            [destination],
@@ -368,7 +384,7 @@ class AsyncWorker(object):
         called_arr_modes = set()
         for dep_mode, arr_mode in self.krakens_call:
             if dep_mode not in called_dep_modes:
-                origin_futures.append(self.pool.spawn(_get_places_crowfly,
+                origin_futures.append(self.pool.spawn(timing.keep_spans(_get_places_crowfly),
                                                       self.instance,
                                                       dep_mode,
                                                       origin,
@@ -376,7 +392,7 @@ class AsyncWorker(object):
                                                       **self.speed_switcher))
                 called_dep_modes.add(dep_mode)
             if arr_mode not in called_arr_modes:
-                destination_futures.append(self.pool.spawn(_get_places_crowfly,
+                destination_futures.append(self.pool.spawn(timing.keep_spans(_get_places_crowfly),
                                                            self.instance,
                                                            arr_mode,
                                                            destination,
@@ -392,12 +408,12 @@ class AsyncWorker(object):
         called_arr_modes = set()
         for dep_mode, arr_mode in self.krakens_call:
             if dep_mode not in called_dep_modes:
-                origin_futures.append(self.pool.spawn(_update_crowfly_duration, self.instance, dep_mode,
-                                                      g.requested_origin))
+                origin_futures.append(self.pool.spawn(timing.keep_spans(_update_crowfly_duration),
+                                                      self.instance, dep_mode, g.requested_origin))
                 called_dep_modes.add(dep_mode)
             if arr_mode not in called_arr_modes:
-                destination_futures.append(self.pool.spawn(_update_crowfly_duration, self.instance, arr_mode,
-                                                           g.requested_destination))
+                destination_futures.append(self.pool.spawn(timing.keep_spans(_update_crowfly_duration),
+                                                           self.instance, arr_mode, g.requested_destination))
                 called_arr_modes.add(arr_mode)
         return origin_futures, destination_futures
 
@@ -409,6 +425,13 @@ class AsyncWorker(object):
         '''
         dp_key = make_direct_path_key(mode, pt_object_origin.uri, pt_object_destination.uri,
                                       is_fallback_at_end, fallback_extremity)
+        sn_cache = instance.street_network_cache
+        if sn_cache:
+            dp = sn_cache.get_direct_path(mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request)
+            if dp is not None:
+                if dp.journeys:
+                    align_direct_path_datetimes(dp.journeys[0], fallback_extremity)
+                return dp_key, dp
         dp = instance.direct_path(mode,
                                   pt_object_origin,
                                   pt_object_destination,
@@ -416,6 +439,8 @@ class AsyncWorker(object):
                                   request)
         if is_fallback_at_end:
             _reverse_journeys(dp)
+        if sn_cache:
+            sn_cache.set_direct_path(mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request, dp)
         return dp_key, dp
 
     def get_direct_path_futures(self, fallback_direct_path_pool, origin, destination,
@@ -428,7 +453,7 @@ class AsyncWorker(object):
             dp_key = make_direct_path_key(dep_mode, origin.uri, destination.uri,
                                           is_fallback_at_end, fallback_extremity)
             if dp_key not in fallback_direct_path_pool:
-                futures_direct_path.append(self.pool.spawn(self._get_direct_path,
+                futures_direct_path.append(self.pool.spawn(timing.keep_spans(self._get_direct_path),
                                                            self.instance,
                                                            dep_mode, origin, destination,
                                                            fallback_extremity,
@@ -472,7 +497,7 @@ class AsyncWorker(object):
                                                                      fallback_extremity.datetime,
                                                                      fallback_extremity.represents_start,
                                                                      journey_parameters, bike_in_pt)
-            futures_jourenys.append(self.pool.spawn(worker_journey))
+            futures_jourenys.append(self.pool.spawn(timing.keep_spans(worker_journey)))
         return futures_jourenys
 
     @staticmethod
@@ -582,11 +607,11 @@ class AsyncWorker(object):
         futures = []
         for dep_mode, arr_mode, journey in map_response:
             # from
-            futures.append(self.pool.spawn(self._build_from, journey, g.requested_origin,
+            futures.append(self.pool.spawn(timing.keep_spans(self._build_from), journey, g.requested_origin,
                                            crowfly_stop_points, odt_stop_points,
                                            dep_mode, g.fallback_direct_path_pool, g.origins_fallback))
             # to
-            futures.append(self.pool.spawn(self._build_to, journey, g.requested_destination,
+            futures.append(self.pool.spawn(timing.keep_spans(self._build_to), journey, g.requested_destination,
                                            crowfly_stop_points, odt_stop_points,
                                            arr_mode, g.fallback_direct_path_pool, g.destinations_fallback))
 
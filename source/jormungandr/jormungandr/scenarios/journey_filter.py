@@ -30,9 +30,11 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 import logging
 import itertools
 import datetime
-from jormungandr.scenarios.utils import compare, get_pseudo_duration, get_or_default, mode_weight
+import collections
+from jormungandr.scenarios.utils import get_pseudo_duration, get_or_default, mode_weight
 from navitiacommon import response_pb2
 from jormungandr.utils import pb_del_if
+from jormungandr import timing
 
 def delete_journeys(responses, request):
 
@@ -47,6 +49,7 @@ def delete_journeys(responses, request):
         logging.getLogger(__name__).info('filtering {} journeys'.format(nb_deleted))
 
 
+@timing.timed('journey_filter')
 def filter_journeys(response_list, instance, request):
     """
     Filter by side effect the list of pb responses's journeys
@@ -72,6 +75,7 @@ def filter_journeys(response_list, instance, request):
     return response_list
 
 
+@timing.timed('journey_filter')
 def final_filter_journeys(response_list, instance, request):
     """
     Filter by side effect the list of pb responses's journeys
@@ -145,13 +149,23 @@ def _filter_similar_journeys(journeys, request, similar_journey_generator):
     The given generator tells which part of journeys are compared
 
     in case of similar journeys we let _get_worst_similar_vjs decide which one to delete
+
+    2 journeys are similar if the generator gives the same values for both of them, so instead of comparing
+    all the pairs of journeys, we compute the signature of each journey once and group the journeys by signature.
+    Only the journeys of the same group are compared
     """
 
     logger = logging.getLogger(__name__)
-    for j1, j2 in itertools.combinations(journeys, 2):
-        if to_be_deleted(j1) or to_be_deleted(j2):
+    similar_groups = collections.defaultdict(list)
+    for j in journeys:
+        if to_be_deleted(j):
             continue
-        if compare(j1, j2, similar_journey_generator):
+        similar_groups[tuple(similar_journey_generator(j))].append(j)
+
+    for similar_journeys in similar_groups.values():
+        for j1, j2 in itertools.combinations(similar_journeys, 2):
+            if to_be_deleted(j1) or to_be_deleted(j2):
+                continue
             #chose the best
             worst = _get_worst_similar(j1, j2, request)
             logger.debug("the journeys {}, {} are similar, we delete {}".format(j1.internal_id,
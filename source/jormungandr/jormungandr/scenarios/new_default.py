@@ -45,11 +45,13 @@ from jormungandr.utils import date_to_timestamp
 from jormungandr.scenarios.simple import get_pb_data_freshness
 import gevent, gevent.pool
 import flask
-from jormungandr import app
+from jormungandr import app, timing
 
 SECTION_TYPES_TO_RETAIN = {response_pb2.PUBLIC_TRANSPORT, response_pb2.STREET_NETWORK}
 JOURNEY_TYPES_TO_RETAIN = ['best', 'comfort', 'non_pt_walk', 'non_pt_bike', 'non_pt_bss']
 STREET_NETWORK_MODE_TO_RETAIN = {response_pb2.Car, response_pb2.Bike, response_pb2.Bss}
+# max effort of the culling search (number of journeys evaluated while bounding the search)
+MAX_CULLING_SEARCH_EFFORT = 300000
 
 
 def get_kraken_calls(request):
@@ -260,8 +262,146 @@ def _build_selected_sections_matrix(sections_set, candidates_pool):
     return np.array(selected_sections_matrix)
 
 
+def _build_sections_masks(sections_set, candidates_pool):
+    """
+    Each journey is represented by a bitset (an int) of the sections it uses
+
+    It's the same information as a line of the selected sections matrix
+    """
+    sections_2_bit = {s: 1 << i for i, s in enumerate(sections_set)}
+    masks = []
+    for j in candidates_pool:
+        mask = 0
+        for s in j.sections:
+            mask |= sections_2_bit.get(_get_section_id(s), 0)
+        masks.append(mask)
+    return masks
+
+
+def _popcount(mask):
+    return bin(mask).count(str('1'))
+
+
+def _find_best_selection(sections_masks, pseudo_durations, nb_journeys_to_find, idx_of_jrny_must_keep,
+                         max_effort=MAX_CULLING_SEARCH_EFFORT):
+    """
+    Find the combination of nb_journeys_to_find journeys (containing all the must-keep journeys) that has the
+    best score, without enumerating all the combinations.
+
+    The score of a combination is, in this order:
+     * the number of sections not covered by the combination (integrity)
+     * the total number of sections of the combination
+     * the sum of the pseudo durations of the journeys
+     * the combination that would have been generated first by gen_all_combin (colex order)
+
+    This gives the same result as the exhaustive search of _get_sorted_solutions_indexes followed by the
+    pseudo duration sort.
+
+    The search is a branch and bound:
+     * a greedy solution is computed first to have a good initial bound
+     * the free journeys are then either taken or not, in index order
+     * a branch is cut as soon as a lower bound of its score is worse than the best score found
+
+    The search is bounded: once max_effort journeys have been evaluated, the best combination found so far
+    is returned.
+
+    :return: the sorted list of the selected indexes
+    """
+    logger = logging.getLogger(__name__)
+    must_keep = sorted(set(idx_of_jrny_must_keep))
+    free = [i for i in range(len(sections_masks)) if i not in set(must_keep)]
+    nb_to_choose = nb_journeys_to_find - len(must_keep)
+    nb_sections_total = _popcount(reduce(lambda a, b: a | b, sections_masks, 0))
+    counts = [_popcount(m) for m in sections_masks]
+
+    base_union = 0
+    for i in must_keep:
+        base_union |= sections_masks[i]
+    base_count = sum(counts[i] for i in must_keep)
+    base_pseudo = sum(pseudo_durations[i] for i in must_keep)
+
+    # for the bounds: union of the remaining sections and
+    # cumulative sums of the smallest counts/pseudo durations of the remaining journeys
+    nb_free = len(free)
+    suffix_union = [0] * (nb_free + 1)
+    for pos in range(nb_free - 1, -1, -1):
+        suffix_union[pos] = suffix_union[pos + 1] | sections_masks[free[pos]]
+
+    def _smallest_cumulative_sums(values):
+        res = [0]
+        for v in sorted(values):
+            res.append(res[-1] + v)
+        return res
+
+    suffix_min_counts = [_smallest_cumulative_sums(counts[i] for i in free[pos:]) for pos in range(nb_free)]
+    suffix_min_pseudo = [_smallest_cumulative_sums(pseudo_durations[i] for i in free[pos:])
+                         for pos in range(nb_free)]
+
+    def _key(selection):
+        union = 0
+        for i in selection:
+            union |= sections_masks[i]
+        return (nb_sections_total - _popcount(union),
+                sum(counts[i] for i in selection),
+                sum(pseudo_durations[i] for i in selection),
+                tuple(sorted(selection, reverse=True)))
+
+    # greedy initial solution
+    selection = list(must_keep)
+    union = base_union
+    candidates = set(free)
+    for _ in range(nb_to_choose):
+        best_candidate = min(candidates, key=lambda i: (-_popcount(sections_masks[i] & ~union),
+                                                        counts[i], pseudo_durations[i], i))
+        candidates.remove(best_candidate)
+        selection.append(best_candidate)
+        union |= sections_masks[best_candidate]
+    best = {'key': _key(selection), 'selection': selection}
+    effort = [0]
+
+    def _search(pos, nb_left, union, count, pseudo, chosen):
+        if nb_left == 0:
+            selection = must_keep + chosen
+            key = _key(selection)
+            if key < best['key']:
+                best['key'] = key
+                best['selection'] = selection
+            return
+        if nb_free - pos < nb_left or effort[0] >= max_effort:
+            return
+        effort[0] += nb_free - pos
+        # at best, the nb_left journeys with the biggest gains cover all the remaining sections
+        uncovered = suffix_union[pos] & ~union
+        gains = sorted((_popcount(sections_masks[i] & uncovered) for i in free[pos:]), reverse=True)
+        lower_bound = (nb_sections_total - _popcount(union) - min(_popcount(uncovered), sum(gains[:nb_left])),
+                       count + suffix_min_counts[pos][nb_left],
+                       pseudo + suffix_min_pseudo[pos][nb_left])
+        if lower_bound > best['key'][:3]:
+            return
+        i = free[pos]
+        chosen.append(i)
+        _search(pos + 1, nb_left - 1, union | sections_masks[i], count + counts[i], pseudo + pseudo_durations[i],
+                chosen)
+        chosen.pop()
+        _search(pos + 1, nb_left, union, count, pseudo, chosen)
+
+    _search(0, nb_to_choose, base_union, base_count, base_pseudo, [])
+
+    if effort[0] >= max_effort:
+        logger.warning('culling search stopped before its end, the selection might not be the best one')
+    logger.debug("Best Itegrity: {0}".format(best['key'][0]))
+    logger.debug("Best Nb sections: {0}".format(best['key'][1]))
+
+    return sorted(best['selection'])
+
+
 def _get_sorted_solutions_indexes(selected_sections_matrix, nb_journeys_to_find, idx_of_jrny_must_keep):
     """
+    Exhaustive version of _find_best_selection, it enumerates all the combinations.
+
+    It is not used anymore in the culling since the number of combinations explodes with the number of journeys,
+    it is kept as the reference implementation (for the tests and benchmarks)
+
     The entry is a 2D array where its lines are journeys, its columns are (non) chosen sections
     """
     logger = logging.getLogger(__name__)
@@ -333,6 +473,7 @@ def _get_sorted_solutions_indexes(selected_sections_matrix, nb_journeys_to_find,
     return best_indexes, selection_matrix
 
 
+@timing.timed('culling')
 def culling_journeys(resp, request):
     """
     Remove some journeys if there are too many of them to have max_nb_journeys journeys.
@@ -431,39 +572,27 @@ def culling_journeys(resp, request):
     The candidate pool will be like [Journey_2, Journey_3]
     The sections set will be like set([Line 14, Line 6, Line 8, Bus 165])
 
-    selected_sections_matrix:
-    [[1,1,0,1] -> journey_2
-     [1,0,1,1] -> journey_3
+    sections_masks:
+    [0b1011 -> journey_2
+     0b1101 -> journey_3
     ]
     """
-    selected_sections_matrix = _build_selected_sections_matrix(sections_set, candidates_pool)
-
-    best_indexes, selection_matrix = _get_sorted_solutions_indexes(selected_sections_matrix,
-                                                                   nb_journeys_to_find,
-                                                                   idx_of_jrnys_must_keep)
-
-    logger.debug("Nb best solutions: {0}".format(best_indexes.shape[0]))
-
-    the_best_index = best_indexes[0]
+    sections_masks = _build_sections_masks(sections_set, candidates_pool)
 
-    logger.debug("Trying to find the best of best")
-    """
-    Let's find the best of best :)
-    """
-    # If there're several solutions which have the same score of integrity and nb_sections
-    if best_indexes.shape[0] != 1:
-        requested_dt = request['datetime']
-        is_clockwise = request.get('clockwise', True)
+    requested_dt = request.get('datetime')
+    is_clockwise = request.get('clockwise', True)
+    if requested_dt is not None:
+        pseudo_durations = [get_pseudo_duration(jrny, requested_dt, is_clockwise) for jrny in candidates_pool]
+    else:
+        pseudo_durations = [0] * len(candidates_pool)
 
-        def combinations_sorter(v):
-            # Hoping to find We sort the solution by the sum of journeys' pseudo duration
-            return np.sum((get_pseudo_duration(jrny, requested_dt, is_clockwise)
-                           for jrny in np.array(candidates_pool)[np.where(selection_matrix[v, :])]))
-        the_best_index = min(best_indexes, key=combinations_sorter)
+    selected_indexes = set(_find_best_selection(sections_masks, pseudo_durations, nb_journeys_to_find,
+                                                idx_of_jrnys_must_keep))
 
     logger.debug('Removing non selected journeys')
-    for jrny in candidates_pool[np.where(selection_matrix[the_best_index, :] == 0)]:
-        journey_filter.mark_as_dead(jrny, 'Filtered by max_nb_journeys')
+    for idx, jrny in enumerate(candidates_pool):
+        if idx not in selected_indexes:
+            journey_filter.mark_as_dead(jrny, 'Filtered by max_nb_journeys')
 
     journey_filter.delete_journeys((resp,), request)
 
@@ -728,13 +857,15 @@ class Scenario(simple.Scenario):
         logger = logging.getLogger(__name__)
         futures = []
         def worker(dep_mode, arr_mode, instance, request, request_id):
-            return (dep_mode, arr_mode, instance.send_and_receive(request, request_id=request_id))
+            return (dep_mode, arr_mode, instance.send_and_receive_journeys(request, request_id=request_id))
 
         pool = gevent.pool.Pool(app.config.get('GREENLET_POOL_SIZE', 3))
         for dep_mode, arr_mode in krakens_call:
             pb_request = create_pb_request(request_type, request, dep_mode, arr_mode)
             #we spawn a new green thread, it won't have access to our thread local request object so we set request_id
-            futures.append(pool.spawn(worker, dep_mode, arr_mode, instance, pb_request, request_id=flask.request.id))
+            #and keep the timing spans of the request
+            futures.append(pool.spawn(timing.keep_spans(worker), dep_mode, arr_mode, instance, pb_request,
+                                      request_id=flask.request.id))
 
         for future in gevent.iwait(futures):
             dep_mode, arr_mode, local_resp = future.get()
@@ -37,6 +37,7 @@ from jormungandr.interfaces.common import pb_odt_level
 from jormungandr.scenarios.utils import pb_type, pt_object_type, add_link
 from jormungandr.scenarios.utils import build_pagination
 from jormungandr.scenarios.utils import updated_common_journey_request_with_default
+from jormungandr import autocomplete_cache
 
 
 def get_pb_data_freshness(request):
@@ -141,7 +142,10 @@ class Scenario(object):
         return resp
 
     def places(self, request, instance):
-        return instance.get_autocomplete(request.get('_autocomplete')).get(request, instance)
+        autocomplete = instance.get_autocomplete(request.get('_autocomplete'))
+        if autocomplete_cache:
+            return autocomplete_cache.get(autocomplete, request, instance)
+        return autocomplete.get(request, instance)
 
     def place_uri(self, request, instance):
         autocomplete = instance.get_autocomplete(request.get('_autocomplete'))
@@ -28,7 +28,7 @@
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
 from jormungandr.scenarios import journey_filter
-from jormungandr.scenarios.utils import DepartureJourneySorter, ArrivalJourneySorter
+from jormungandr.scenarios.utils import DepartureJourneySorter, ArrivalJourneySorter, compare
 from jormungandr.scenarios.journey_filter import to_be_deleted
 import navitiacommon.response_pb2 as response_pb2
 from navitiacommon import default_values
@@ -363,6 +363,25 @@ def test_similar_journeys_test3():
     assert 'to_delete' in journey2.tags
 
 
+def test_similar_journeys_several_groups():
+    """
+    journeys are only compared to the journeys with the same vjs
+    """
+    responses = [response_pb2.Response()]
+    for duration, vj in [(42, 'bob'), (40, 'bobette'), (43, 'bob'), (41, 'bob'), (44, 'bobette'), (45, 'bobitto')]:
+        journey = responses[0].journeys.add()
+        journey.internal_id = '{}-{}'.format(vj, duration)
+        journey.duration = duration
+        section = journey.sections.add()
+        section.type = response_pb2.PUBLIC_TRANSPORT
+        section.pt_display_informations.uris.vehicle_journey = vj
+
+    journey_filter._filter_similar_vj_journeys(list(journeys_gen(responses)), {})
+
+    kept = {j.internal_id for j in responses[0].journeys if not to_be_deleted(j)}
+    assert kept == {'bob-41', 'bobette-40', 'bobitto-45'}
+
+
 def test_similar_journeys_different_transfer():
     """
      If 2 journeys take the same vjs but with a different number of sections,
@@ -588,7 +607,7 @@ def test_similar_journeys_car_park():
     journey2.sections.add()
     journey2.sections[-1].type = response_pb2.PARK
 
-    assert journey_filter.compare(journey1, journey2, journey_filter.similar_journeys_vj_generator)
+    assert compare(journey1, journey2, journey_filter.similar_journeys_vj_generator)
 
 
 def test_similar_journeys_bss_park():
@@ -614,7 +633,7 @@ def test_similar_journeys_bss_park():
     journey2.sections[-1].type = response_pb2.STREET_NETWORK
     journey2.sections[-1].street_network.mode = response_pb2.Bss
 
-    assert journey_filter.compare(journey1, journey2, journey_filter.similar_journeys_vj_generator)
+    assert compare(journey1, journey2, journey_filter.similar_journeys_vj_generator)
 
 class MockInstance(object):
     def __init__(self):
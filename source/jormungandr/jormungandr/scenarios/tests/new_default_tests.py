@@ -32,7 +32,9 @@ import navitiacommon.response_pb2 as response_pb2
 import jormungandr.scenarios.tests.helpers_tests as helpers_tests
 from jormungandr.scenarios import new_default
 from jormungandr.scenarios.new_default import _tag_journey_by_mode, get_kraken_calls
+from jormungandr.scenarios.utils import get_pseudo_duration
 from werkzeug.exceptions import HTTPException
+import numpy as np
 import pytest
 """
  sections       0   1   2   3   4   5   6   7   8   9   10
@@ -193,6 +195,29 @@ def get_sorted_solutions_indexes_test():
     assert all(selection_matrix[best_indexes[0]] == [0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0])
 
 
+def find_best_selection_test():
+    """
+    the branch and bound search must select the same journeys as the exhaustive search
+    """
+    mocked_pb_response = build_mocked_response()
+    candidates_pool, sections_set, idx_jrny_must_keep = \
+        new_default._build_candidate_pool_and_sections_set(mocked_pb_response)
+    selected_sections_matrix = new_default._build_selected_sections_matrix(sections_set, candidates_pool)
+    sections_masks = new_default._build_sections_masks(sections_set, candidates_pool)
+    pseudo_durations = [get_pseudo_duration(j, 1444903200, True) for j in candidates_pool]
+
+    for nb_journeys_to_find in range(5, 10):
+        best_indexes, selection_matrix = \
+            new_default._get_sorted_solutions_indexes(selected_sections_matrix, nb_journeys_to_find,
+                                                      idx_jrny_must_keep)
+        best = min(best_indexes,
+                   key=lambda v: sum(pseudo_durations[i] for i in np.where(selection_matrix[v, :])[0]))
+        expected = np.where(selection_matrix[best, :])[0].tolist()
+
+        assert new_default._find_best_selection(sections_masks, pseudo_durations, nb_journeys_to_find,
+                                                idx_jrny_must_keep) == expected
+
+
 def culling_jounreys_1_test():
     """
     Test when max_nb_journeys is bigger than journey's length in response,
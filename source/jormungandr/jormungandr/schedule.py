@@ -40,7 +40,10 @@ from navitiacommon import type_pb2, request_pb2, response_pb2
 from jormungandr.utils import date_to_timestamp, pb_del_if
 import datetime
 from copy import deepcopy
-from jormungandr import new_relic
+from collections import defaultdict
+import gevent
+import gevent.pool
+from jormungandr import new_relic, app, timing
 
 RT_PROXY_PROPERTY_NAME = 'realtime_system'
 RT_PROXY_DATA_FRESHNESS = 'realtime'
@@ -231,39 +234,69 @@ class MixedSchedule(object):
     def __init__(self, instance):
         self.instance = instance
 
-    def _get_next_realtime_passages(self, route_point, request):
-        log = logging.getLogger(__name__)
+    def _get_next_realtime_passages_by_route_point(self, route_points, request):
+        """
+        get the next realtime passages of several route points
 
-        if not route_point:
-            return None
+        the route points are grouped by realtime system, a system able to handle several route points
+        is called once for all its route points, the others are called once by route point.
+        All those calls are done concurrently, on a bounded pool of greenlets
 
-        rt_system_code = get_realtime_system_code(route_point)
-        if not rt_system_code:
-            return None
+        :return: a dict route_point -> next realtime passages (None if the base schedule must be used)
+        """
+        log = logging.getLogger(__name__)
+        next_rt_passages = {}
+        route_points_by_system = defaultdict(list)
+        for route_point in route_points:
+            rt_system_code = get_realtime_system_code(route_point)
+            if rt_system_code:
+                route_points_by_system[rt_system_code].append(route_point)
+            else:
+                next_rt_passages[route_point] = None
+
+        calls = []
+        for rt_system_code, system_route_points in route_points_by_system.items():
+            rt_system = self.instance.realtime_proxy_manager.get(rt_system_code)
+            if not rt_system:
+                log.info('impossible to find {}, no realtime added'.format(rt_system_code))
+                new_relic.record_custom_event('realtime_internal_failure', {'rt_system_id': rt_system_code,
+                                                                            'message': 'no handler found'})
+                next_rt_passages.update((rp, None) for rp in system_route_points)
+            elif rt_system.supports_multiple_route_points:
+                calls.append((rt_system_code, rt_system, system_route_points))
+            else:
+                calls.extend((rt_system_code, rt_system, [rp]) for rp in system_route_points)
+
+        if len(calls) == 1:
+            next_rt_passages.update(self._call_realtime_system(request, *calls[0]))
+        elif calls:
+            pool = gevent.pool.Pool(app.config.get('GREENLET_POOL_SIZE', 3))
+            futures = [pool.spawn(timing.keep_spans(self._call_realtime_system), request, *call) for call in calls]
+            for future in gevent.iwait(futures):
+                next_rt_passages.update(future.get())
 
-        rt_system = self.instance.realtime_proxy_manager.get(rt_system_code)
-        if not rt_system:
-            log.info('impossible to find {}, no realtime added'.format(rt_system_code))
-            new_relic.record_custom_event('realtime_internal_failure', {'rt_system_id': rt_system_code,
-                                                                        'message': 'no handler found'})
-            return None
+        return next_rt_passages
 
-        next_rt_passages = None
+    @staticmethod
+    def _call_realtime_system(request, rt_system_code, rt_system, route_points):
+        log = logging.getLogger(__name__)
+        next_rt_passages = {}
         try:
-            next_rt_passages = rt_system.next_passage_for_route_point(route_point,
-                                                                      request['items_per_schedule'],
-                                                                      request['from_datetime'],
-                                                                      request['_current_datetime'])
+            next_rt_passages = rt_system.next_passages_for_route_points(route_points,
+                                                                        request['items_per_schedule'],
+                                                                        request['from_datetime'],
+                                                                        request['_current_datetime'])
         except Exception as e:
             log.exception('failure while requesting next passages to external RT system {}'.format(rt_system_code))
             new_relic.record_custom_event('realtime_internal_failure', {'rt_system_id': rt_system_code,
                                                                         'message': str(e)})
 
-        if next_rt_passages is None:
-            log.debug('no next passages, using base schedule')
-            return None
-
-        return next_rt_passages
+        result = {}
+        for route_point in route_points:
+            result[route_point] = next_rt_passages.get(route_point)
+            if result[route_point] is None:
+                log.debug('no next passages, using base schedule')
+        return result
 
     def __stop_times(self, request, api, departure_filter="", arrival_filter=""):
         req = request_pb2.Request()
@@ -318,9 +351,9 @@ class MixedSchedule(object):
                              _create_template_from_pb_route_point(rp))
                             for rp in resp.route_points)
 
+        next_rt_passages = self._get_next_realtime_passages_by_route_point(route_points.keys(), request)
         for route_point, template in route_points.items():
-            next_rt_passages = self._get_next_realtime_passages(route_point, request)
-            _update_passages(resp.next_departures, route_point, template, next_rt_passages)
+            _update_passages(resp.next_departures, route_point, template, next_rt_passages[route_point])
 
         # sort
         def comparator(p1, p2):
@@ -346,8 +379,8 @@ class MixedSchedule(object):
         if request['data_freshness'] != RT_PROXY_DATA_FRESHNESS:
             return resp
 
-        for stop_schedule in resp.stop_schedules:
-            route_point = _get_route_point_from_stop_schedule(stop_schedule)
-            next_rt_passages = self._get_next_realtime_passages(route_point, request)
-            _update_stop_schedule(stop_schedule, next_rt_passages)
+        route_points = [_get_route_point_from_stop_schedule(stop_schedule) for stop_schedule in resp.stop_schedules]
+        next_rt_passages = self._get_next_realtime_passages_by_route_point(route_points, request)
+        for stop_schedule, route_point in zip(resp.stop_schedules, route_points):
+            _update_stop_schedule(stop_schedule, next_rt_passages[route_point])
         return resp
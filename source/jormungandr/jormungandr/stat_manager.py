@@ -39,7 +39,10 @@ from jormungandr import app
 from jormungandr.authentication import get_user, get_token, get_app_name, get_used_coverages
 from jormungandr import utils
 import re
+import copy
 from threading import Lock
+import gevent
+import gevent.queue
 
 import pytz
 import time
@@ -134,6 +137,17 @@ class StatManager(object):
 
         self.lock = Lock()
 
+        # with asynchronous publishing, what is needed to build the stats is pushed in a bounded queue,
+        # a background greenlet builds and publishes them, up to batch_size stats in a row
+        self.async_publishing = app.config.get('STAT_ASYNC_PUBLISHING', False)
+        self.batch_size = app.config.get('STAT_BATCH_SIZE', 100)
+        self.queue = gevent.queue.Queue(maxsize=app.config.get('STAT_QUEUE_SIZE', 10000))
+        self._publisher = None
+        self.nb_published = 0
+        self.nb_dropped = 0
+        self.nb_publish_errors = 0
+        self.nb_build_errors = 0
+
     def _init_rabbitmq(self):
         """
         connection to rabbitmq and initialize queues
@@ -153,20 +167,45 @@ class StatManager(object):
             return
 
         try:
-            self._manage_stat(start_time, call_result)
+            if self.async_publishing:
+                self._push_stat(start_time, call_result)
+            else:
+                self._manage_stat(start_time, call_result)
         except Exception as e:
             #if stat are not working we don't want jormungandr to stop.
             logging.getLogger(__name__).exception('Error during stat management')
 
     def _manage_stat(self, start_time, call_result):
-        end_time = time.time()
+        self.publish_request(self._build_stat(start_time, time.time(), call_result))
+
+    def _build_stat(self, start_time, end_time, call_result):
         stat_request = stat_pb2.StatRequest()
         stat_request.request_duration = int((end_time - start_time) * 1000) #In milliseconds
         self.fill_request(stat_request, start_time, call_result)
         self.fill_coverages(stat_request)
         self.fill_parameters(stat_request)
         self.fill_result(stat_request, call_result)
-        self.publish_request(stat_request)
+        return stat_request
+
+    def _push_stat(self, start_time, call_result):
+        """
+        keep what is needed to build the stat, it is built by the publisher greenlet
+
+        the response is copied since the next decorators modify it (links...),
+        the request is rebuilt from a copy of its environ and of its flask g
+        """
+        if self._publisher is None:
+            self._publisher = gevent.spawn(self._publisher_loop)
+        call_result = (copy.copy(call_result[0]),) + tuple(call_result[1:])
+        try:
+            self.queue.put_nowait((start_time, time.time(), call_result, dict(request.environ), dict(g.__dict__)))
+        except gevent.queue.Full:
+            self.nb_dropped += 1
+
+    def _build_stat_in_request_context(self, start_time, end_time, call_result, environ, request_g):
+        with app.request_context(environ):
+            g.__dict__.update(request_g)
+            return self._build_stat(start_time, end_time, call_result)
 
     def fill_info_response(self, stat_info_response, call_result):
         """
@@ -487,21 +526,71 @@ class StatManager(object):
     def publish_request(self, stat_request):
         pbf = stat_request.SerializeToString()
         with self.lock:
-            try:
-                if self.producer is None:
-                    #if the initialization failed we have to retry the creation of the objects
-                    self._init_rabbitmq()
-                self.producer.publish(pbf, routing_key=stat_request.api)
-            except self.connection.connection_errors + self.connection.channel_errors:
-                logging.getLogger(__name__).exception('Server went away, will be reconnected..')
-                #Relese and close the previous connection
-                if self.connection and self.connection.connected:
-                    self.connection.release()
-                #Initialize a new connection to RabbitMQ
+            self._publish(pbf, stat_request.api)
+
+    def _publish(self, pbf, routing_key):
+        try:
+            if self.producer is None:
+                #if the initialization failed we have to retry the creation of the objects
                 self._init_rabbitmq()
-                #If connection is established publish the stat message.
-                if self.save_stat:
-                    self.producer.publish(pbf, routing_key=stat_request.api)
+            self.producer.publish(pbf, routing_key=routing_key)
+        except self.connection.connection_errors + self.connection.channel_errors:
+            logging.getLogger(__name__).exception('Server went away, will be reconnected..')
+            #Relese and close the previous connection
+            if self.connection and self.connection.connected:
+                self.connection.release()
+            #Initialize a new connection to RabbitMQ
+            self._init_rabbitmq()
+            #If connection is established publish the stat message.
+            if self.save_stat:
+                self.producer.publish(pbf, routing_key=routing_key)
+
+    def _get_batch(self):
+        """
+        wait for a stat, then take the other waiting stats, up to batch_size
+        """
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except gevent.queue.Empty:
+                break
+        return batch
+
+    def _publish_batch(self, batch):
+        stats = []
+        for pending_stat in batch:
+            try:
+                stat_request = self._build_stat_in_request_context(*pending_stat)
+                stats.append((stat_request.SerializeToString(), stat_request.api))
+            except Exception:
+                logging.getLogger(__name__).exception('impossible to build a stat')
+                self.nb_build_errors += 1
+
+        # the lock is taken once for the batch, but AMQP has no bulk publish: there is one message by stat
+        with self.lock:
+            for pbf, routing_key in stats:
+                try:
+                    self._publish(pbf, routing_key)
+                    self.nb_published += 1
+                except Exception:
+                    logging.getLogger(__name__).exception('impossible to publish a stat')
+                    self.nb_publish_errors += 1
+
+    def _publisher_loop(self):
+        while True:
+            self._publish_batch(self._get_batch())
+
+    def stats(self):
+        return {
+            'async_publishing': self.async_publishing,
+            'queue_size': self.queue.qsize(),
+            'max_queue_size': self.queue.maxsize,
+            'nb_published': self.nb_published,
+            'nb_dropped': self.nb_dropped,
+            'nb_publish_errors': self.nb_publish_errors,
+            'nb_build_errors': self.nb_build_errors,
+        }
 
     def fill_admin_from(self, stat_section, admin):
         if admin[0]:
@@ -34,6 +34,7 @@ import pybreaker
 import json
 from navitiacommon import response_pb2
 from jormungandr import app
+from jormungandr.http_client import HttpClient
 from jormungandr.exceptions import TechnicalError, InvalidArguments, UnableToParse
 from jormungandr.street_network.street_network import AbstractStreetNetworkService
 from jormungandr.utils import get_pt_object_coord, is_url, decode_polyline
@@ -51,6 +52,7 @@ class Geovelo(AbstractStreetNetworkService):
         self.timeout = timeout
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_GEOVELO_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_GEOVELO_TIMEOUT_S'])
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
 
     @classmethod
     def _pt_object_summary_isochrone(cls, pt_object):
@@ -81,10 +83,10 @@ class Geovelo(AbstractStreetNetworkService):
             'transportModes': ['BIKE']
         }
 
-    def _call_geovelo(self, url, method=requests.post, data=None):
+    def _call_geovelo(self, url, method=None, data=None):
         logging.getLogger(__name__).debug('Geovelo routing service , call url : {}'.format(url))
         try:
-            return self.breaker.call(method, url, timeout=self.timeout, data=data,
+            return self.breaker.call(method or self.http_client.post, url, timeout=self.timeout, data=data,
                                      headers={'content-type': 'application/json',
                                               'Api-Key': self.api_key})
         except pybreaker.CircuitBreakerError as e:
@@ -144,7 +146,7 @@ class Geovelo(AbstractStreetNetworkService):
 
         data = self._make_request_arguments_isochrone(origins, destinations)
         r = self._call_geovelo('{}/{}'.format(self.service_url, 'api/v2/routes_m2m'),
-                               requests.post, json.dumps(data))
+                               self.http_client.post, json.dumps(data))
         self._check_response(r)
         resp_json = r.json()
 
@@ -254,7 +256,7 @@ class Geovelo(AbstractStreetNetworkService):
                                                                 'single_result=true&'
                                                                 'bike_stations=false&'
                                                                 'objects_as_ids=true&'),
-                               requests.post, json.dumps(data))
+                               self.http_client.post, json.dumps(data))
         self._check_response(r)
         resp_json = r.json()
 
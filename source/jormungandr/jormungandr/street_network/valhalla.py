@@ -33,6 +33,7 @@ import logging
 import pybreaker
 import requests as requests
 from jormungandr import app
+from jormungandr.http_client import HttpClient
 import json
 from jormungandr.exceptions import TechnicalError, InvalidArguments, ApiNotFound
 from jormungandr.utils import is_url, kilometers_to_meters, get_pt_object_coord, decode_polyline
@@ -57,11 +58,12 @@ class Valhalla(AbstractStreetNetworkService):
         }
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_VALHALLA_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_VALHALLA_TIMEOUT_S'])
+        self.http_client = HttpClient(id, **kwargs.get('http_client', {}))
 
-    def _call_valhalla(self, url, method=requests.post, data=None):
+    def _call_valhalla(self, url, method=None, data=None):
         logging.getLogger(__name__).debug('Valhalla routing service , call url : {}'.format(url))
         try:
-            return self.breaker.call(method, url, timeout=self.timeout, data=data, headers={'api_key': self.api_key})
+            return self.breaker.call(method or self.http_client.post, url, timeout=self.timeout, data=data, headers={'api_key': self.api_key})
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Valhalla routing service dead (error: {})'.format(e))
             self.record_external_failure('circuit breaker open')
@@ -213,7 +215,7 @@ class Valhalla(AbstractStreetNetworkService):
 
     def direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request):
         data = self._make_request_arguments(mode, pt_object_origin, [pt_object_destination], request, api='route')
-        r = self._call_valhalla('{}/{}'.format(self.service_url, 'route'), requests.post, data)
+        r = self._call_valhalla('{}/{}'.format(self.service_url, 'route'), self.http_client.post, data)
         if r is not None and r.status_code == 400 and r.json()['error_code'] == 442:
             # error_code == 442 => No path could be found for input
             resp = response_pb2.Response()
@@ -250,7 +252,7 @@ class Valhalla(AbstractStreetNetworkService):
                 origins, destinations = destinations, origins
 
         data = self._make_request_arguments(mode, origins[0], destinations, request, api='one_to_many')
-        r = self._call_valhalla('{}/{}'.format(self.service_url, 'one_to_many'), requests.post, data)
+        r = self._call_valhalla('{}/{}'.format(self.service_url, 'one_to_many'), self.http_client.post, data)
         self._check_response(r)
         resp_json = r.json()
         return self._get_matrix(resp_json)
@@ -0,0 +1,163 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import copy
+import hashlib
+import logging
+from navitiacommon import response_pb2
+from jormungandr import cache
+from jormungandr.lru_cache import LruCache
+from jormungandr.utils import get_pt_object_coord
+
+
+# the parameters of the request used by the street network services
+STREET_NETWORK_PARAMS = ('walking_speed', 'bike_speed', 'bss_speed', 'car_speed',
+                         'max_walking_duration_to_pt', 'max_bike_duration_to_pt',
+                         'max_bss_duration_to_pt', 'max_car_duration_to_pt')
+
+
+class StreetNetworkCache(object):
+    """
+    cache of the direct paths and of the street network routing matrices of an instance, shared by the requests
+
+    A direct path does not depend on the datetime (we have no realtime on the street network),
+    the cached direct paths have to be aligned on the requested datetime by the caller.
+    The direct paths are cached by the uri of their origin and destination since the places are in the response.
+    The routing matrices only contain the uri of the stop points and their duration, so the center of the
+    matrix is identified by its coordinates rounded to coord_precision decimals, this way close addresses
+    share the same matrix.
+
+    The entries are kept in the process and, if use_shared_cache is set, in the cache backend (redis...).
+    They are invalidated when the publication_date of the instance changes.
+    """
+
+    def __init__(self, instance, max_size=1000, ttl=3600, coord_precision=4, use_shared_cache=False):
+        self.instance = instance
+        self.ttl = ttl
+        self.coord_precision = coord_precision
+        self.use_shared_cache = use_shared_cache
+        self._cache = LruCache(max_size=max_size, ttl=ttl)
+        self._publication_date = None
+        self.nb_shared_hits = 0
+        self.nb_shared_misses = 0
+
+    def _make_key(self, *parts):
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def _shared_key(self, key):
+        return 'street_network:{}:{}:{}'.format(self.instance.name, self._publication_date, key)
+
+    def _check_publication_date(self):
+        if self.instance.publication_date != self._publication_date:
+            self._cache.clear()
+            self._publication_date = self.instance.publication_date
+
+    def _get(self, key):
+        self._check_publication_date()
+        value = self._cache.get(key)
+        if value is not None or not self.use_shared_cache:
+            return value
+        try:
+            value = cache.get(self._shared_key(key))
+        except Exception:
+            logging.getLogger(__name__).exception('impossible to read the street network cache')
+            value = None
+        if value is None:
+            self.nb_shared_misses += 1
+            return None
+        self.nb_shared_hits += 1
+        self._cache.set(key, value)
+        return value
+
+    def _set(self, key, value):
+        self._check_publication_date()
+        self._cache.set(key, value)
+        if not self.use_shared_cache:
+            return
+        try:
+            cache.set(self._shared_key(key), value, timeout=self.ttl)
+        except Exception:
+            logging.getLogger(__name__).exception('impossible to write in the street network cache')
+
+    def _direct_path_key(self, mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request):
+        return self._make_key('direct_path', mode, pt_object_origin.uri, pt_object_destination.uri,
+                              is_fallback_at_end, [request.get(p) for p in STREET_NETWORK_PARAMS])
+
+    def get_direct_path(self, mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request):
+        """
+        :return: a new response, with the datetimes of the request that has computed it, or None
+        """
+        key = self._direct_path_key(mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request)
+        serialized_response = self._get(key)
+        if serialized_response is None:
+            return None
+        resp = response_pb2.Response()
+        resp.ParseFromString(serialized_response)
+        return resp
+
+    def set_direct_path(self, mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request, resp):
+        if resp is None or (resp.HasField(str('error')) and resp.error.id == response_pb2.Error.internal_error):
+            return
+        key = self._direct_path_key(mode, pt_object_origin, pt_object_destination, is_fallback_at_end, request)
+        self._set(key, resp.SerializeToString())
+
+    def _routing_matrix_key(self, center, places, is_orig_center, mode, max_duration, request):
+        coord = get_pt_object_coord(center)
+        if coord.lon or coord.lat:
+            center_id = (round(coord.lon, self.coord_precision), round(coord.lat, self.coord_precision))
+        else:
+            center_id = center.uri
+        return self._make_key('routing_matrix', mode, center_id, is_orig_center, max_duration,
+                              sorted(p.uri for p in places), [request.get(p) for p in STREET_NETWORK_PARAMS])
+
+    def get_routing_matrix(self, center, places, is_orig_center, mode, max_duration, request):
+        """
+        :return: the durations to the places {mode: {uri: {'duration': ..., 'status': ...}}} or None
+        """
+        value = self._get(self._routing_matrix_key(center, places, is_orig_center, mode, max_duration, request))
+        # the caller can modify the durations
+        return copy.deepcopy(value)
+
+    def set_routing_matrix(self, center, places, is_orig_center, mode, max_duration, request, durations):
+        key = self._routing_matrix_key(center, places, is_orig_center, mode, max_duration, request)
+        self._set(key, copy.deepcopy(durations))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['nb_shared_hits'] = self.nb_shared_hits
+        stats['nb_shared_misses'] = self.nb_shared_misses
+        return stats
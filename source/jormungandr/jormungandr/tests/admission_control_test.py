@@ -0,0 +1,108 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+from jormungandr.admission_control import AdmissionController, ConcurrencyBudget
+from jormungandr.exceptions import TooManyRequests, ServiceOverloaded
+
+
+def budget_test():
+    budget = ConcurrencyBudget(max_in_flight=1, max_queue_size=1)
+    assert budget.acquire(timeout=0)
+    # the queue is empty, the request waits but no slot is released in time
+    assert not budget.acquire(timeout=0.01)
+    assert budget.stats()['nb_timeouts'] == 1
+
+    waiting = gevent.spawn(budget.acquire, 1)
+    gevent.sleep(0)
+    assert budget.nb_queued == 1
+    # the queue is full, the request is rejected right away
+    assert not budget.acquire(timeout=1)
+    assert budget.stats()['nb_rejected'] == 1
+
+    budget.release()
+    assert waiting.get()
+    budget.release()
+    assert budget.is_idle
+    assert budget.stats()['nb_admitted'] == 2
+
+
+def dispatch(controller, instance_name, duration=0.01):
+    with controller.admit_dispatch(instance_name):
+        gevent.sleep(duration)
+    return True
+
+
+def instance_budget_test():
+    controller = AdmissionController(max_in_flight_per_instance=2, max_queue_size_per_instance=1, queue_timeout=1000)
+    futures = [gevent.spawn(dispatch, controller, 'paris') for _ in range(4)]
+    gevent.joinall(futures)
+    # 2 requests in flight, 1 queued, 1 shed
+    assert sum(1 for f in futures if f.successful()) == 3
+    assert sum(1 for f in futures if isinstance(f.exception, ServiceOverloaded)) == 1
+    assert controller.stats('paris')['nb_shed_instance'] == 1
+
+    # the budgets are by instance
+    futures = [gevent.spawn(dispatch, controller, name) for name in ('paris', 'paris', 'lyon', 'lyon')]
+    gevent.joinall(futures, raise_error=True)
+
+
+def no_instance_budget_test():
+    controller = AdmissionController(max_in_flight_per_token=1)
+    futures = [gevent.spawn(dispatch, controller, 'paris') for _ in range(10)]
+    gevent.joinall(futures, raise_error=True)
+    assert controller.instance_budgets == {}
+
+
+def call(controller, token, billing_plan=None, duration=0.01):
+    with controller.admit_client(token, billing_plan):
+        gevent.sleep(duration)
+    return True
+
+
+def token_budget_test():
+    controller = AdmissionController(max_in_flight_per_token=1, billing_plans={'premium': 3}, queue_timeout=1)
+    futures = [gevent.spawn(call, controller, 'bob') for _ in range(3)]
+    futures += [gevent.spawn(call, controller, 'alice', 'premium') for _ in range(3)]
+    gevent.joinall(futures)
+
+    assert futures[0].successful()
+    assert all(isinstance(f.exception, TooManyRequests) for f in futures[1:3])
+    # premium billing plan
+    assert all(f.successful() for f in futures[3:])
+    assert controller.stats()['nb_shed_token'] == 2
+    # the budgets of the idle tokens are forgotten
+    assert controller.token_budgets == {}
+
+
+def no_token_test():
+    controller = AdmissionController(max_in_flight_per_token=1)
+    futures = [gevent.spawn(call, controller, None) for _ in range(3)]
+    gevent.joinall(futures, raise_error=True)
@@ -0,0 +1,145 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.autocomplete.cache import AutocompleteCache, normalize
+
+
+class FakeInstance(object):
+    def __init__(self, name='bob', publication_date=1):
+        self.name = name
+        self.publication_date = publication_date
+
+
+class FakeUserShape(object):
+    hash = 'ff8f4a0e5c'
+
+
+class FakeAutocomplete(object):
+    def __init__(self, names):
+        self.names = names
+        self.queries = []
+
+    def get(self, request, instance):
+        self.queries.append(request['q'])
+        query_words = normalize(request['q']).split()
+        found = [n for n in self.names if all(any(w.startswith(q) for w in normalize(n).split())
+                                              for q in query_words)]
+        return {'places': [{'name': n, 'embedded_type': 'stop_area', 'stop_area': {'name': n}}
+                           for n in found[:request['count']]]}
+
+
+def places_request(q, count=10, **kwargs):
+    request = {'q': q, 'count': count, 'type[]': ['stop_area', 'address'], 'search_type': 0, 'depth': 1}
+    request.update(kwargs)
+    return request
+
+
+def names(response):
+    return [p['name'] for p in response['places']]
+
+
+def normalize_test():
+    assert normalize(' Gare  de l\'Étoile ') == 'gare de l\'etoile'
+
+
+def same_query_is_cached_test():
+    cache = AutocompleteCache()
+    autocomplete = FakeAutocomplete(['Gare de Lyon', 'Gare du Nord'])
+    instance = FakeInstance()
+
+    first = cache.get(autocomplete, places_request('gare'), instance)
+    second = cache.get(autocomplete, places_request(' Gare '), instance)
+    assert names(first) == names(second) == ['Gare de Lyon', 'Gare du Nord']
+    assert autocomplete.queries == ['gare']
+    # each caller has its own copy of the response
+    second['places'].pop()
+    assert len(names(cache.get(autocomplete, places_request('gare'), instance))) == 2
+    assert cache.stats()['nb_hits'] == 2
+    assert cache.stats()['nb_misses'] == 1
+
+
+def key_test():
+    cache = AutocompleteCache()
+    autocomplete = FakeAutocomplete(['Gare de Lyon', 'Gare du Nord'])
+    cache.get(autocomplete, places_request('gare'), FakeInstance())
+    cache.get(autocomplete, places_request('gare'), FakeInstance(name='bib'))
+    cache.get(autocomplete, places_request('gare'), FakeInstance(publication_date=2))
+    cache.get(autocomplete, places_request('gare', **{'type[]': ['stop_area']}), FakeInstance())
+    cache.get(autocomplete, places_request('gare', count=5), FakeInstance())
+    cache.get(autocomplete, places_request('gare', shape=FakeUserShape()), FakeInstance())
+    cache.get(autocomplete, places_request('gare', **{'from': '2.3741;48.8441'}), FakeInstance())
+    assert len(autocomplete.queries) == 7
+
+    # close 'from' coordinates share the same responses
+    cache.get(autocomplete, places_request('gare', **{'from': '2.3712;48.8398'}), FakeInstance())
+    assert len(autocomplete.queries) == 7
+
+
+def prefix_reuse_test():
+    cache = AutocompleteCache()
+    autocomplete = FakeAutocomplete(['Gare de Lyon', 'Gare du Nord', 'Garibaldi'])
+    instance = FakeInstance()
+
+    assert names(cache.get(autocomplete, places_request('gar'), instance)) == \
+        ['Gare de Lyon', 'Gare du Nord', 'Garibaldi']
+    assert names(cache.get(autocomplete, places_request('gare'), instance)) == ['Gare de Lyon', 'Gare du Nord']
+    assert names(cache.get(autocomplete, places_request('gare d'), instance)) == ['Gare de Lyon', 'Gare du Nord']
+    assert names(cache.get(autocomplete, places_request('gare dé l'), instance)) == ['Gare de Lyon']
+    assert autocomplete.queries == ['gar']
+    assert cache.stats()['nb_prefix_hits'] == 3
+
+
+def truncated_response_is_not_reused_test():
+    cache = AutocompleteCache()
+    autocomplete = FakeAutocomplete(['Garibaldi', 'Gare de Lyon', 'Gare du Nord'])
+    instance = FakeInstance()
+
+    # 'gar' has more places than the count, 'gare' can find places that are not in its response
+    assert names(cache.get(autocomplete, places_request('gar', count=2), instance)) == ['Garibaldi', 'Gare de Lyon']
+    assert names(cache.get(autocomplete, places_request('gare', count=2), instance)) == \
+        ['Gare de Lyon', 'Gare du Nord']
+    assert autocomplete.queries == ['gar', 'gare']
+
+
+def no_prefix_reuse_when_nothing_matches_test():
+    cache = AutocompleteCache()
+    autocomplete = FakeAutocomplete(['Gare de Lyon'])
+    instance = FakeInstance()
+
+    cache.get(autocomplete, places_request('gare'), instance)
+    # could be found by a fuzzy search, we ask the autocomplete
+    cache.get(autocomplete, places_request('gares'), instance)
+    assert autocomplete.queries == ['gare', 'gares']
+
+    cache = AutocompleteCache(prefix_reuse=False)
+    autocomplete = FakeAutocomplete(['Gare de Lyon'])
+    cache.get(autocomplete, places_request('gare'), instance)
+    cache.get(autocomplete, places_request('gare d'), instance)
+    assert autocomplete.queries == ['gare', 'gare d']
@@ -0,0 +1,51 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import mock
+from jormungandr.autocomplete.geocodejson import GeocodeJson
+
+
+def build_geocodejson_test():
+    bragi = GeocodeJson(host='http://bob.com', timeout=3, http_client={'keep_alive': True})
+    assert bragi.http_client.name == 'bragi'
+    assert bragi.http_client.keep_alive
+    assert bragi.make_url('autocomplete') == 'http://bob.com/autocomplete'
+
+
+def call_bragi_test():
+    bragi = GeocodeJson(host='http://bob.com', http_client={'keep_alive': False})
+    params = bragi.make_params({'q': 'gare', 'count': 10, 'type[]': ['stop_area'], 'from': '2.37;48.84'}, None)
+    assert params == {'q': 'gare', 'limit': 10, 'type[]': ['public_transport:stop_area'], 'lon': '2.37', 'lat': '48.84'}
+
+    with mock.patch('requests.get', return_value='bragi response') as mock_get:
+        response = bragi.call_bragi(bragi.make_url('autocomplete'), bragi.http_client.get, params=params)
+    assert response == 'bragi response'
+    mock_get.assert_called_once_with('http://bob.com/autocomplete', params=params)
+    assert bragi.http_client.stats()['nb_calls'] == 1
@@ -0,0 +1,59 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from shapely import wkt
+from jormungandr.geometries_index import GeometriesIndex
+
+
+def geometries_index_find_test():
+    index = GeometriesIndex()
+    index.update([
+        ('paris', wkt.loads('POLYGON((2 48, 3 48, 3 49, 2 49, 2 48))')),
+        # a triangle, its bounding box contains (4.9, 45.9) but not the shape
+        ('lyon', wkt.loads('POLYGON((4 45, 5 45, 4 46, 4 45))')),
+        ('idf', wkt.loads('POLYGON((1 47, 4 47, 4 50, 1 50, 1 47))')),
+        ('empty', None),
+    ])
+    assert len(index) == 3
+    assert sorted(index.find(2.5, 48.5)) == ['idf', 'paris']
+    assert index.find(3.5, 48.5) == ['idf']
+    assert index.find(4.1, 45.1) == ['lyon']
+    assert index.find(4.9, 45.9) == []
+    assert index.find(0, 0) == []
+
+
+def geometries_index_update_test():
+    index = GeometriesIndex()
+    assert index.find(2.5, 48.5) == []
+    index.update([('paris', wkt.loads('POLYGON((2 48, 3 48, 3 49, 2 49, 2 48))'))])
+    assert index.find(2.5, 48.5) == ['paris']
+    index.update([('paris', wkt.loads('POLYGON((5 48, 6 48, 6 49, 5 49, 5 48))'))])
+    assert index.find(2.5, 48.5) == []
+    assert index.find(5.5, 48.5) == ['paris']
@@ -0,0 +1,78 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import pytest
+import requests
+import requests_mock
+from jormungandr.http_client import HttpClient
+
+
+def http_client_keep_alive_test():
+    client = HttpClient('bob', keep_alive=True, max_connections_per_host=2)
+    assert client.session is not None
+    with requests_mock.Mocker() as m:
+        m.get('http://bob.com/stations', text='toto')
+        m.post('http://bob.com/route', text='tata')
+        assert client.get('http://bob.com/stations', timeout=1).text == 'toto'
+        assert client.post('http://bob.com/route', data='{}', timeout=1).text == 'tata'
+    stats = client.stats()
+    assert stats['nb_calls'] == 2
+    assert stats['nb_errors'] == 0
+    assert stats['mean_size'] == 4
+
+
+def http_client_without_keep_alive_test():
+    client = HttpClient('bob', keep_alive=False)
+    assert client.session is None
+    with requests_mock.Mocker() as m:
+        m.get('http://bob.com/stations', text='toto')
+        assert client.get('http://bob.com/stations').text == 'toto'
+    assert client.stats()['nb_calls'] == 1
+
+
+def http_client_compression_test():
+    client = HttpClient('bob', compression=False)
+    with requests_mock.Mocker() as m:
+        m.get('http://bob.com/stations', text='toto')
+        client.get('http://bob.com/stations', headers={'api_key': 'bobette'})
+        assert m.last_request.headers['Accept-Encoding'] == 'identity'
+        assert m.last_request.headers['api_key'] == 'bobette'
+
+
+def http_client_error_test():
+    client = HttpClient('bob')
+    with requests_mock.Mocker() as m:
+        m.get('http://bob.com/stations', exc=requests.Timeout)
+        with pytest.raises(requests.Timeout):
+            client.get('http://bob.com/stations')
+    stats = client.stats()
+    assert stats['nb_calls'] == 1
+    assert stats['nb_errors'] == 1
+    assert stats['mean_size'] is None
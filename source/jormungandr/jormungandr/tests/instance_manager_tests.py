@@ -29,14 +29,31 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 from jormungandr import InstanceManager
+import gevent
+import time
 from pytest import fixture
 from pytest_mock import mocker
 
 from jormungandr import app
 
 class FakeInstance():
-    def __init__(self, name):
+    def __init__(self, name, ids=()):
         self.name = name
+        self.ids = ids
+        self.nb_has_id_calls = 0
+        self.metadatas = None
+        self.metadatas_updated_at = None
+        self.nb_metadatas_calls = 0
+
+    def has_id(self, id_):
+        self.nb_has_id_calls += 1
+        return id_ in self.ids
+
+    def update_metadatas(self):
+        self.nb_metadatas_calls += 1
+        gevent.sleep(0.1)
+        self.metadatas = {'status': 'running', 'name': self.name}
+        self.metadatas_updated_at = 1500000000
 
 @fixture
 def manager():
@@ -75,3 +92,48 @@ def get_instances_by_object_id_test(manager, mocker):
         assert mock.called
 
 
+def all_keys_of_id_prefix_test(manager, mocker):
+    """
+    once an id with a prefix has been found in a region, the other ids with this prefix are first looked for in it
+    """
+    mocker.patch.dict(app.config, {'USE_ID_PREFIX_REGIONS': True})
+    manager.instances['paris'] = FakeInstance('paris', ids={'stop_area:OIF:SA:1', 'stop_area:OIF:SA:2'})
+    manager.instances['pdl'] = FakeInstance('pdl', ids={'stop_area:PDL:SA:1'})
+    with app.test_request_context('/'):
+        assert manager._all_keys_of_id('stop_area:OIF:SA:1') == ['paris']
+        assert manager.instances['pdl'].nb_has_id_calls == 1
+        assert manager.id_prefix_regions == {'stop_area:OIF': {'paris'}}
+
+        assert manager._all_keys_of_id('stop_area:OIF:SA:2') == ['paris']
+        assert manager.instances['pdl'].nb_has_id_calls == 1
+
+        # the id is not in the known region, all the other regions are asked
+        assert manager._all_keys_of_id('stop_area:PDL:SA:1') == ['pdl']
+        assert manager.instances['paris'].nb_has_id_calls == 3
+
+
+def regions_test(manager):
+    with app.test_request_context('/'):
+        start = time.time()
+        resp = manager.regions()
+        # the krakens are called concurrently
+        assert time.time() - start < 0.2
+        assert sorted(r['region_id'] for r in resp['regions']) == ['paris', 'pdl']
+        assert all(r['metadatas_updated_at'] == 1500000000 for r in resp['regions'])
+
+        # without the ping thread the metadatas are fetched on each call
+        manager.regions()
+        assert manager.instances['paris'].nb_metadatas_calls == 2
+
+
+def regions_from_memory_test(manager):
+    manager.start_ping = True
+    with app.test_request_context('/'):
+        manager.regions()
+        resp = manager.regions(region='paris')
+        assert [r['region_id'] for r in resp['regions']] == ['paris']
+        # the metadatas refreshed by the ping thread are used
+        assert manager.instances['paris'].nb_metadatas_calls == 1
+        assert manager.instances['pdl'].nb_metadatas_calls == 1
+        # the stored metadatas are not modified
+        assert 'region_id' not in manager.instances['paris'].metadatas
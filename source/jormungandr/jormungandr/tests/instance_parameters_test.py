@@ -0,0 +1,73 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import pytest
+from jormungandr.instance_parameters import InstanceParameters
+from navitiacommon import default_values
+
+
+class FakeModel(object):
+    def __init__(self, **kwargs):
+        self.scenario = 'distributed'
+        self.is_free = True
+        self.is_open_data = False
+        self.__dict__.update(kwargs)
+
+
+def parameters_without_database_test():
+    parameters = InstanceParameters.from_model('bob', None)
+    assert parameters.walking_speed == default_values.walking_speed
+    assert parameters.max_nb_transfers == default_values.max_nb_transfers
+    assert parameters.scenario == 'new_default'
+    assert parameters.is_free is False
+    assert parameters.is_open_data is False
+
+
+def parameters_from_model_test():
+    parameters = InstanceParameters.from_model('bob', FakeModel(walking_speed=2.0, priority=12))
+    assert parameters.walking_speed == 2.0
+    assert parameters.priority == 12
+    # the missing parameters have the default value
+    assert parameters.bike_speed == default_values.bike_speed
+    assert parameters.scenario == 'distributed'
+    assert parameters.is_free is True
+
+
+def parameters_are_immutable_test():
+    parameters = InstanceParameters.from_model('bob', None)
+    with pytest.raises(AttributeError):
+        parameters.walking_speed = 12
+
+
+def parameters_outdated_test():
+    parameters = InstanceParameters.from_model('bob', None)
+    assert not parameters.is_outdated(60)
+    parameters = parameters._replace(creation_date=parameters.creation_date - 61)
+    assert parameters.is_outdated(60)
@@ -0,0 +1,103 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.journey_cache import JourneyResponseCache
+from navitiacommon import request_pb2, response_pb2, type_pb2
+
+
+class FakeInstance(object):
+    def __init__(self):
+        self.publication_date = -1
+        self.nb_calls = 0
+        self.response_publication_date = 42
+
+    def send_and_receive(self, request, **kwargs):
+        self.nb_calls += 1
+        resp = response_pb2.Response()
+        resp.publication_date = self.response_publication_date
+        j = resp.journeys.add()
+        j.duration = 3600
+        return resp
+
+
+def make_request(request_id='bob', current_datetime=1000, realtime_level=type_pb2.BASE_SCHEDULE):
+    req = request_pb2.Request()
+    req.requested_api = type_pb2.PLANNER
+    req.request_id = request_id
+    req._current_datetime = current_datetime
+    req.journeys.datetimes.append(1500)
+    req.journeys.realtime_level = realtime_level
+    return req
+
+
+def journey_cache_hit_test():
+    instance = FakeInstance()
+    cache = JourneyResponseCache(instance, max_size=10, ttl=60)
+
+    resp = cache.send_and_receive(make_request(request_id='1', current_datetime=1000))
+    assert instance.nb_calls == 1
+    # the caller can modify its response, it won't change the cached response
+    resp.journeys[0].duration = 10
+
+    # same request with another request_id and a close current datetime
+    resp = cache.send_and_receive(make_request(request_id='2', current_datetime=1010))
+    assert instance.nb_calls == 1
+    assert resp.journeys[0].duration == 3600
+    assert cache.stats()['nb_hits'] == 1
+
+    # the current datetime is in another bucket
+    cache.send_and_receive(make_request(current_datetime=1100))
+    assert instance.nb_calls == 2
+
+
+def journey_cache_publication_date_test():
+    instance = FakeInstance()
+    cache = JourneyResponseCache(instance, max_size=10, ttl=60)
+
+    cache.send_and_receive(make_request())
+    assert instance.nb_calls == 1
+
+    # new data have been loaded in kraken, seen from the instance metadata
+    instance.publication_date = 43
+    instance.response_publication_date = 43
+    cache.send_and_receive(make_request())
+    assert instance.nb_calls == 2
+    cache.send_and_receive(make_request())
+    assert instance.nb_calls == 2
+
+
+def journey_cache_realtime_ttl_test():
+    instance = FakeInstance()
+    cache = JourneyResponseCache(instance, max_size=10, ttl=60, realtime_ttl=0)
+
+    cache.send_and_receive(make_request(realtime_level=type_pb2.REALTIME))
+    cache.send_and_receive(make_request(realtime_level=type_pb2.REALTIME))
+    # the realtime requests are not cached
+    assert instance.nb_calls == 2
@@ -0,0 +1,123 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import time
+import gevent
+from jormungandr import app
+from jormungandr.autocomplete.kraken import Kraken
+from navitiacommon import request_pb2, response_pb2, type_pb2
+
+
+class FakeInstance(object):
+    def __init__(self, nb_prefix_places, nb_fuzzy_places=1, duration=0.01):
+        self.name = 'bob'
+        self.nb_places = {0: nb_prefix_places, 1: nb_fuzzy_places}
+        self.duration = duration
+        self.search_types = []
+
+    def send_and_receive(self, req):
+        self.search_types.append(req.places.search_type)
+        gevent.sleep(self.duration)
+        resp = response_pb2.Response()
+        for i in range(self.nb_places[req.places.search_type]):
+            place = resp.places.add()
+            place.uri = 'place:{}:{}'.format(req.places.search_type, i)
+        return resp
+
+
+def places_request(q):
+    req = request_pb2.Request()
+    req.requested_api = type_pb2.places
+    req.places.q = q
+    req.places.search_type = 0
+    return req
+
+
+def search(autocomplete, instance, q):
+    with app.test_request_context():
+        return autocomplete._search(places_request(q), {'q': q}, instance)
+
+
+def sequential_fallback_test():
+    autocomplete = Kraken()
+    instance = FakeInstance(nb_prefix_places=0)
+    resp = search(autocomplete, instance, 'gare de lyon')
+    assert resp.places[0].uri == 'place:1:0'
+    assert instance.search_types == [0, 1]
+    assert autocomplete.stats(instance)['nb_fallbacks'] == 1
+    assert autocomplete.stats(instance)['nb_speculated'] == 0
+
+
+def no_fallback_test():
+    autocomplete = Kraken(speculative_fallback=True)
+    instance = FakeInstance(nb_prefix_places=2)
+    resp = search(autocomplete, instance, 'gare')
+    assert resp.places[0].uri == 'place:0:0'
+    assert instance.search_types == [0]
+
+
+def speculated_query_test():
+    """
+    the query has many words, both searches are sent at the same time
+    """
+    autocomplete = Kraken(speculative_fallback=True, min_nb_words=3)
+    instance = FakeInstance(nb_prefix_places=0, duration=0.05)
+    start = time.time()
+    resp = search(autocomplete, instance, 'gare de lyon')
+    assert resp.places[0].uri == 'place:1:0'
+    assert sorted(instance.search_types) == [0, 1]
+    # the searches are not one after the other
+    assert time.time() - start < 0.09
+    stats = autocomplete.stats(instance)
+    assert stats['nb_speculated'] == 1
+    assert stats['nb_useful_speculations'] == 1
+
+
+def prefix_search_first_test():
+    """
+    with a speculation, the prefix search is used when it finds something
+    """
+    autocomplete = Kraken(speculative_fallback=True, min_nb_words=1)
+    instance = FakeInstance(nb_prefix_places=1, nb_fuzzy_places=3)
+    resp = search(autocomplete, instance, 'gare')
+    assert resp.places[0].uri == 'place:0:0'
+    assert autocomplete.stats(instance)['nb_useful_speculations'] == 0
+
+
+def high_fallback_rate_test():
+    autocomplete = Kraken(speculative_fallback=True, min_nb_words=10, fallback_rate_threshold=0.5,
+                          min_nb_queries=5)
+    instance = FakeInstance(nb_prefix_places=0, duration=0)
+    for _ in range(20):
+        search(autocomplete, instance, 'gare')
+    stats = autocomplete.stats(instance)
+    # once the fallback rate is known to be high all the queries are speculated
+    assert stats['fallback_rate'] > 0.5
+    assert 0 < stats['nb_speculated'] < 20
@@ -0,0 +1,182 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+from jormungandr.kraken_endpoints import KrakenEndpoints
+
+
+class FakePool(object):
+    def __init__(self, name, duration=0, timeout=False):
+        self.name = name
+        self.duration = duration
+        self.timeout = timeout
+        self.nb_in_use = 0
+        self.nb_waiting = 0
+        self.nb_calls = 0
+
+    def send_and_receive(self, payload, timeout):
+        self.nb_calls += 1
+        if self.timeout or self.duration > timeout / 1000:
+            gevent.sleep(timeout / 1000)
+            return None
+        gevent.sleep(self.duration)
+        return self.name
+
+    def stats(self):
+        return {}
+
+
+def make_endpoints(pools, breaker_timeout=60, **kwargs):
+    endpoints = KrakenEndpoints(None, [p.name for p in pools], pool_size=10, breaker_max_fail=2,
+                                breaker_timeout=breaker_timeout, **kwargs)
+    for endpoint, pool in zip(endpoints.endpoints, pools):
+        endpoint.socket_pool = pool
+    return endpoints
+
+
+def fastest_endpoint_test():
+    endpoints = make_endpoints([FakePool('a'), FakePool('b')])
+    endpoints.endpoints[0].latency = 0.1
+    endpoints.endpoints[1].latency = 0.01
+    assert endpoints.send_and_receive(b'request', timeout=1000) == 'b'
+
+
+def least_loaded_endpoint_test():
+    endpoints = make_endpoints([FakePool('a'), FakePool('b')])
+    endpoints.endpoints[0].latency = 0.01
+    endpoints.endpoints[1].latency = 0.02
+    # a is faster, but has too many requests waiting
+    endpoints.endpoints[0].socket_pool.nb_in_use = 10
+    assert endpoints.send_and_receive(b'request', timeout=1000) == 'b'
+
+
+def endpoint_without_measure_test():
+    endpoints = make_endpoints([FakePool('a'), FakePool('b')])
+    endpoints.endpoints[0].latency = 0.01
+    # b has never been called, it is tried
+    assert endpoints.send_and_receive(b'request', timeout=1000) == 'b'
+    assert endpoints.endpoints[1].latency is not None
+
+
+def circuit_breaker_test():
+    pools = [FakePool('a', timeout=True), FakePool('b')]
+    endpoints = make_endpoints(pools)
+    endpoints.endpoints[0].latency = 0.001
+    endpoints.endpoints[1].latency = 0.1
+    # the latency of the replica increases with the timeouts, but the breaker is open before
+    endpoints.endpoints[0].ewma_alpha = 0
+    for _ in range(5):
+        if endpoints.endpoints[0].is_open:
+            break
+        # the replica timing out leaves the rest of the time to the next one
+        assert endpoints.send_and_receive(b'request', timeout=100) == 'b'
+    assert endpoints.endpoints[0].is_open
+    nb_calls = pools[0].nb_calls
+
+    # the replica with an open breaker is avoided
+    assert endpoints.send_and_receive(b'request', timeout=100) == 'b'
+    assert pools[0].nb_calls == nb_calls
+
+
+def timeout_failover_test():
+    pools = [FakePool('a', duration=1), FakePool('b', duration=0.01)]
+    endpoints = make_endpoints(pools)
+    endpoints.endpoints[0].latency = 0.001
+    endpoints.endpoints[1].latency = 0.01
+    assert endpoints.send_and_receive(b'request', timeout=100) == 'b'
+    assert endpoints.endpoints[0].nb_timeouts == 1
+    # the last replica has all the time left
+    pools[1].duration = 0.08
+    assert endpoints.send_and_receive(b'request', timeout=200) == 'b'
+
+
+def open_endpoint_recovery_test():
+    """
+    a replica with an open breaker is probed after its reset timeout even if another replica is available
+    """
+    pools = [FakePool('a', timeout=True), FakePool('b')]
+    endpoints = make_endpoints(pools, breaker_timeout=0.05)
+    tripped = endpoints.endpoints[0]
+    tripped.latency = 0.001
+    endpoints.endpoints[1].latency = 0.01
+    while not tripped.is_open:
+        endpoints.send_and_receive(b'request', timeout=20)
+
+    # the replica is back, but its breaker is still open
+    pools[0].timeout = False
+    nb_calls = pools[0].nb_calls
+    assert endpoints.send_and_receive(b'request', timeout=100) == 'b'
+    assert pools[0].nb_calls == nb_calls
+    assert tripped.needs_probe() is False
+
+    gevent.sleep(0.05)
+    assert tripped.needs_probe()
+    assert endpoints.send_and_receive(b'request', timeout=100) == 'b'
+    gevent.sleep(0)
+    assert tripped.stats()['nb_probes'] == 1
+    assert tripped.breaker.current_state == 'closed'
+    # the replica is used again
+    tripped.latency = 0.001
+    assert endpoints.send_and_receive(b'request', timeout=100) == 'a'
+
+
+def failed_probe_test():
+    pools = [FakePool('a', timeout=True), FakePool('b')]
+    endpoints = make_endpoints(pools, breaker_timeout=0.05)
+    tripped = endpoints.endpoints[0]
+    tripped.breaker.open()
+    gevent.sleep(0.05)
+    assert endpoints.send_and_receive(b'request', timeout=20) == 'b'
+    gevent.sleep(0.03)
+    # the breaker is opened again, for another reset timeout
+    assert tripped.is_open
+    assert not tripped.needs_probe()
+
+
+def hedged_request_test():
+    pools = [FakePool('a', duration=0.2), FakePool('b')]
+    endpoints = make_endpoints(pools, hedging_percentile=90, hedging_min_delay=1)
+    endpoints.endpoints[0].latency = 0.001
+    endpoints.endpoints[1].latency = 0.01
+    endpoints.endpoints[0].response_times.extend([0.005] * 10)
+
+    assert endpoints.send_and_receive(b'request', timeout=1000) == 'b'
+    assert endpoints.stats()['nb_hedged'] == 1
+    assert pools[0].nb_calls == 1
+    assert pools[1].nb_calls == 1
+
+
+def no_hedging_without_measures_test():
+    pools = [FakePool('a', duration=0.05), FakePool('b')]
+    endpoints = make_endpoints(pools, hedging_percentile=90, hedging_min_delay=1)
+    endpoints.endpoints[0].latency = 0.001
+    endpoints.endpoints[1].latency = 0.01
+    assert endpoints.send_and_receive(b'request', timeout=1000) == 'a'
+    assert endpoints.stats()['nb_hedged'] == 0
@@ -0,0 +1,161 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import datetime
+import gevent
+from jormungandr import app
+from jormungandr.interfaces.v1.Schedules import StopSchedules
+from jormungandr.request_coalescer import RequestCoalescer
+
+
+class FakeInstance(object):
+    def __init__(self, name='bob', publication_date=1):
+        self.name = name
+        self.publication_date = publication_date
+
+
+class FakeApi(object):
+    def __init__(self, duration=0.01, fail=False):
+        self.duration = duration
+        self.fail = fail
+        self.nb_calls = 0
+
+    def __call__(self, arguments, instance):
+        self.nb_calls += 1
+        gevent.sleep(self.duration)
+        if self.fail:
+            raise Exception('kraken is dead')
+        return {'stop_area': arguments['uri'], 'departures': [self.nb_calls]}
+
+
+def concurrent_requests_are_coalesced_test():
+    coalescer = RequestCoalescer(apis=['departure_boards'])
+    api = FakeApi()
+    instance = FakeInstance()
+    futures = [gevent.spawn(coalescer.call, api, 'departure_boards', instance,
+                            {'uri': 'stop_area:A', '_current_datetime': datetime.datetime.utcnow()})
+               for _ in range(5)]
+    gevent.joinall(futures, raise_error=True)
+
+    assert api.nb_calls == 1
+    responses = [f.value for f in futures]
+    assert all(r == {'stop_area': 'stop_area:A', 'departures': [1]} for r in responses)
+    # each caller has its own copy of the response
+    assert len(set(id(r) for r in responses)) == 5
+    assert coalescer.stats()['nb_coalesced'] == 4
+    assert coalescer.stats()['nb_in_flight'] == 0
+
+
+def different_requests_are_not_coalesced_test():
+    coalescer = RequestCoalescer(apis=['departure_boards'])
+    api = FakeApi()
+    futures = [gevent.spawn(coalescer.call, api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A'}),
+               gevent.spawn(coalescer.call, api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:B'}),
+               gevent.spawn(coalescer.call, api, 'departure_boards', FakeInstance(publication_date=2),
+                            {'uri': 'stop_area:A'})]
+    gevent.joinall(futures, raise_error=True)
+    assert api.nb_calls == 3
+
+
+def responses_kept_with_ttl_test():
+    api = FakeApi(duration=0)
+    coalescer = RequestCoalescer(apis=['departure_boards'], ttl=60)
+    coalescer.call(api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A'})
+    coalescer.call(api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A'})
+    assert api.nb_calls == 1
+
+    # without ttl only the running requests are shared
+    coalescer = RequestCoalescer(apis=['departure_boards'])
+    coalescer.call(api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A'})
+    assert api.nb_calls == 2
+
+
+def failed_request_test():
+    """
+    when the request fails, the waiting requests get its error, the kraken is only called once
+    """
+    coalescer = RequestCoalescer(apis=['departure_boards'])
+    api = FakeApi(fail=True)
+    futures = [gevent.spawn(coalescer.call, api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A'})
+               for _ in range(3)]
+    gevent.joinall(futures)
+    assert api.nb_calls == 1
+    assert all(f.exception is futures[0].exception for f in futures)
+    assert coalescer.stats()['nb_in_flight'] == 0
+
+    # the error is not kept
+    api.fail = False
+    coalescer.call(api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A'})
+    assert api.nb_calls == 2
+
+
+def from_datetime_rounded_to_ttl_test():
+    api = FakeApi(duration=0)
+    coalescer = RequestCoalescer(apis=['departure_boards'], ttl=10)
+    for from_datetime in (1500000000, 1500000005, 1500000009):
+        coalescer.call(api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A',
+                                                                 'from_datetime': from_datetime})
+    assert api.nb_calls == 1
+    coalescer.call(api, 'departure_boards', FakeInstance(), {'uri': 'stop_area:A', 'from_datetime': 1500000010})
+    assert api.nb_calls == 2
+
+    # without ttl the requests are compared to the second
+    coalescer = RequestCoalescer(apis=['departure_boards'])
+    assert coalescer._key('departure_boards', FakeInstance(), {'from_datetime': 1500000005}) != \
+        coalescer._key('departure_boards', FakeInstance(), {'from_datetime': 1500000000})
+
+
+def departure_boards_args():
+    """
+    the arguments of a /stop_schedules request without from_datetime, as given by Schedules to the scenario
+    """
+    with app.test_request_context('/v1/coverage/bob/stop_areas/stop_area:A/stop_schedules'):
+        resource = StopSchedules()
+        args = resource.parsers['get'].parse_args()
+        resource._set_datetimes(args)
+        return args
+
+
+def schedules_requests_are_coalesced_test():
+    coalescer = RequestCoalescer(apis=['departure_boards'], ttl=10)
+    api = FakeApi(duration=0)
+    first = departure_boards_args()
+    second = departure_boards_args()
+    if first['from_datetime'] != second['from_datetime']:
+        # we were unlucky, the second has changed between the requests
+        second = departure_boards_args()
+    assert first['original_datetime'] != second['original_datetime']
+
+    instance = FakeInstance()
+    coalescer.call(lambda args, instance: api(dict(args, uri='stop_area:A'), instance),
+                   'departure_boards', instance, first)
+    coalescer.call(lambda args, instance: api(dict(args, uri='stop_area:A'), instance),
+                   'departure_boards', instance, second)
+    assert api.nb_calls == 1
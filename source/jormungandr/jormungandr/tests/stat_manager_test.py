@@ -0,0 +1,164 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+import time
+from flask import request, g
+from jormungandr import app
+from jormungandr.stat_manager import StatManager
+from navitiacommon import stat_pb2
+
+
+class FakeProducer(object):
+    def __init__(self):
+        self.published = []
+
+    def publish(self, pbf, routing_key):
+        self.published.append((pbf, routing_key))
+
+
+def make_stat_manager(**config):
+    saved = {k: app.config.get(k) for k in config}
+    app.config.update(config)
+    try:
+        manager = StatManager()
+    finally:
+        app.config.update(saved)
+    manager.producer = FakeProducer()
+    return manager
+
+
+def make_stat_request(api):
+    stat_request = stat_pb2.StatRequest()
+    stat_request.api = api
+    return stat_request
+
+
+def sync_publishing_test():
+    manager = make_stat_manager(STAT_ASYNC_PUBLISHING=False)
+    manager.publish_request(make_stat_request('v1.journeys'))
+    assert len(manager.producer.published) == 1
+    assert manager.producer.published[0][1] == 'v1.journeys'
+
+
+def make_async_stat_manager(**config):
+    manager = make_stat_manager(STAT_ASYNC_PUBLISHING=True, **config)
+    manager.save_stat = True
+
+    # the api of the stat is given by the response
+    def fill_request(stat_request, start_time, call_result):
+        stat_request.api = call_result[0]['api']
+    manager.fill_request = fill_request
+    manager.fill_result = lambda stat_request, call_result: None
+    return manager
+
+
+def push_stat(manager, api):
+    with app.test_request_context('/v1/coverage/bob/journeys?from=a&to=b'):
+        manager.manage_stat(time.time(), ({'api': api}, 200))
+
+
+def async_publishing_test():
+    manager = make_async_stat_manager(STAT_BATCH_SIZE=2)
+    for api in ('v1.journeys', 'v1.places', 'v1.coverage'):
+        push_stat(manager, api)
+    # nothing is built nor published before the publisher greenlet runs
+    assert manager.producer.published == []
+    assert manager.stats()['queue_size'] == 3
+
+    gevent.sleep(0)
+    assert [api for _, api in manager.producer.published] == ['v1.journeys', 'v1.places', 'v1.coverage']
+    stats = manager.stats()
+    assert stats['queue_size'] == 0
+    assert stats['nb_published'] == 3
+    assert stats['nb_dropped'] == 0
+
+
+def async_publishing_full_queue_test():
+    manager = make_async_stat_manager(STAT_QUEUE_SIZE=2)
+    for _ in range(3):
+        push_stat(manager, 'v1.journeys')
+    assert manager.stats()['nb_dropped'] == 1
+
+    gevent.sleep(0)
+    assert len(manager.producer.published) == 2
+
+
+def async_publishing_error_test():
+    """
+    a failing publication must not stop the publisher greenlet
+    """
+    manager = make_async_stat_manager()
+    manager._publish = lambda pbf, routing_key: 1 / 0
+    push_stat(manager, 'v1.journeys')
+    gevent.sleep(0)
+    assert manager.stats()['nb_publish_errors'] == 1
+
+    manager._publish = lambda pbf, routing_key: manager.producer.publish(pbf, routing_key)
+    push_stat(manager, 'v1.journeys')
+    gevent.sleep(0)
+    assert manager.stats()['nb_published'] == 1
+
+
+def async_build_error_test():
+    manager = make_async_stat_manager()
+    with app.test_request_context('/v1/coverage/bob/journeys'):
+        # the api is missing in the response
+        manager.manage_stat(time.time(), ({}, 200))
+    push_stat(manager, 'v1.journeys')
+    gevent.sleep(0)
+    stats = manager.stats()
+    assert stats['nb_build_errors'] == 1
+    assert stats['nb_published'] == 1
+
+
+def async_manage_stat_test():
+    """
+    the stat is built by the publisher greenlet, with the request and the response of the end of the call
+    """
+    manager = make_async_stat_manager()
+    built = []
+
+    def fill_parameters(stat_request):
+        built.append((request.args.to_dict(), g.stat_interpreted_parameters, g.used_coverages))
+    manager.fill_parameters = fill_parameters
+
+    with app.test_request_context('/v1/coverage/bob/journeys?from=a&to=b'):
+        g.stat_interpreted_parameters = {'count': 10}
+        g.used_coverages = ['bob']
+        call_result = ({'api': 'v1.journeys'}, 200)
+        manager.manage_stat(time.time(), call_result)
+        # the next decorators modify the response
+        call_result[0]['api'] = 'v1.places'
+    assert built == []
+
+    gevent.sleep(0)
+    assert [api for _, api in manager.producer.published] == ['v1.journeys']
+    assert built == [({'from': 'a', 'to': 'b'}, {'count': 10}, ['bob'])]
@@ -0,0 +1,113 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.street_network_cache import StreetNetworkCache
+from navitiacommon import response_pb2, type_pb2
+
+
+class FakeInstance(object):
+    def __init__(self):
+        self.name = 'test'
+        self.publication_date = 42
+
+
+REQUEST = {
+    'walking_speed': 1.12,
+    'bike_speed': 3.3,
+    'bss_speed': 3.3,
+    'car_speed': 11.1,
+    'max_walking_duration_to_pt': 900,
+    'max_bike_duration_to_pt': 900,
+    'max_bss_duration_to_pt': 900,
+    'max_car_duration_to_pt': 900,
+}
+
+
+def make_place(uri, lon, lat):
+    place = type_pb2.PtObject()
+    place.uri = uri
+    place.embedded_type = type_pb2.ADDRESS
+    place.address.coord.lon = lon
+    place.address.coord.lat = lat
+    return place
+
+
+def make_direct_path(duration):
+    resp = response_pb2.Response()
+    journey = resp.journeys.add()
+    journey.duration = duration
+    return resp
+
+
+def street_network_cache_direct_path_test():
+    instance = FakeInstance()
+    sn_cache = StreetNetworkCache(instance, max_size=10)
+    origin = make_place('2.1;48.1', 2.1, 48.1)
+    destination = make_place('2.2;48.2', 2.2, 48.2)
+
+    assert sn_cache.get_direct_path('walking', origin, destination, False, REQUEST) is None
+    sn_cache.set_direct_path('walking', origin, destination, False, REQUEST, make_direct_path(600))
+
+    dp = sn_cache.get_direct_path('walking', origin, destination, False, REQUEST)
+    assert dp.journeys[0].duration == 600
+    # the caller gets a new response each time
+    dp.journeys[0].duration = 10
+    assert sn_cache.get_direct_path('walking', origin, destination, False, REQUEST).journeys[0].duration == 600
+
+    assert sn_cache.get_direct_path('bike', origin, destination, False, REQUEST) is None
+    assert sn_cache.get_direct_path('walking', origin, destination, True, REQUEST) is None
+    other_speed = dict(REQUEST, walking_speed=2)
+    assert sn_cache.get_direct_path('walking', origin, destination, False, other_speed) is None
+
+    # new data, the cache is invalidated
+    instance.publication_date = 43
+    assert sn_cache.get_direct_path('walking', origin, destination, False, REQUEST) is None
+    assert sn_cache.stats()['nb_hits'] == 2
+
+
+def street_network_cache_routing_matrix_test():
+    sn_cache = StreetNetworkCache(FakeInstance(), max_size=10, coord_precision=3)
+    center = make_place('2.10001;48.10001', 2.10001, 48.10001)
+    stop_points = [make_place('sp1', 2.11, 48.11), make_place('sp2', 2.12, 48.12)]
+    durations = {'walking': {'sp1': {'duration': 60, 'status': response_pb2.reached}}}
+
+    sn_cache.set_routing_matrix(center, stop_points, True, 'walking', 900, REQUEST, durations)
+    # a close center gives the same durations
+    close_center = make_place('2.10002;48.10002', 2.10002, 48.10002)
+    res = sn_cache.get_routing_matrix(close_center, stop_points, True, 'walking', 900, REQUEST)
+    assert res == durations
+    # the caller can modify the durations
+    res['walking']['sp1']['duration'] = 0
+    assert sn_cache.get_routing_matrix(center, stop_points, True, 'walking', 900, REQUEST) == durations
+
+    far_center = make_place('2.2;48.2', 2.2, 48.2)
+    assert sn_cache.get_routing_matrix(far_center, stop_points, True, 'walking', 900, REQUEST) is None
+    assert sn_cache.get_routing_matrix(center, stop_points, False, 'walking', 900, REQUEST) is None
+    assert sn_cache.get_routing_matrix(center, stop_points[:1], True, 'walking', 900, REQUEST) is None
@@ -0,0 +1,130 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from functools import wraps
+import time
+import gevent
+import gevent.pool
+from flask import Flask, g
+from jormungandr import timing
+from jormungandr.timing import LatencyHistogram, Timings
+
+
+def histogram_test():
+    histogram = LatencyHistogram()
+    for duration_ms in [3] * 90 + [150] * 9 + [4000]:
+        histogram.add(duration_ms / 1000)
+    stats = histogram.stats()
+    assert stats['count'] == 100
+    assert stats['max'] == 4000
+    # the percentiles are the upper bounds of the buckets
+    assert stats['p50'] == 5
+    assert stats['p90'] == 5
+    assert stats['p99'] == 200
+
+    assert LatencyHistogram().stats()['p50'] is None
+
+
+def timings_by_endpoint_test():
+    timings = Timings()
+    timings.add_request('v1.journeys', 0.2, {'kraken.planner': 0.15})
+    timings.add_request('v1.journeys', 0.1, {})
+    timings.add_request('v1.departure_boards', 0.05, {'kraken.departure_boards': 0.04})
+    stats = timings.stats()
+    assert stats['v1.journeys']['total']['count'] == 2
+    assert stats['v1.journeys']['kraken.planner']['count'] == 1
+    assert stats['v1.departure_boards']['total']['count'] == 1
+
+
+def span_outside_of_request_test():
+    # without request the spans are not recorded, but the code is run
+    with timing.span('bob'):
+        pass
+    assert timing.timed('bob')(lambda: 42)() == 42
+
+
+class add_links(object):
+    @timing.timed_decorator('links')
+    def __call__(self, f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            result = f(*args, **kwargs)
+            time.sleep(0.02)
+            return result
+        return wrapper
+
+
+def spans_test():
+    app = Flask(__name__)
+
+    @add_links()
+    @timing.timed('kraken.journeys')
+    def get():
+        time.sleep(0.05)
+        return 'journeys'
+
+    with app.test_request_context('/v1/journeys'):
+        timing.start_request()
+        assert get() == 'journeys'
+        with timing.span('serialization'):
+            pass
+        spans = dict(g.timing_spans)
+        # the links decorator is not charged for the time of the function it decorates
+        assert 0.02 <= spans['links'] < 0.04
+        assert spans['kraken.journeys'] >= 0.05
+        assert 'serialization' in spans
+
+        header = timing.end_request('v1.journeys', server_timing_header=True)
+        assert 'kraken.journeys;dur=' in header
+        assert 'links;dur=' in header
+        assert 'total;dur=' in header
+    assert timing.timings.stats()['v1.journeys']['links']['count'] == 1
+    timing.timings.clear()
+
+
+def spans_in_greenlet_test():
+    app = Flask(__name__)
+
+    @timing.timed('kraken.journeys')
+    def worker(mode):
+        time.sleep(0.01)
+        return mode
+
+    with app.test_request_context('/v1/journeys'):
+        timing.start_request()
+        pool = gevent.pool.Pool(2)
+        # the greenlets don't have the request context
+        futures = [pool.spawn(timing.keep_spans(worker), mode) for mode in ('walking', 'bike')]
+        futures.append(pool.spawn(worker, 'car'))
+        assert sorted(f.get() for f in gevent.iwait(futures)) == ['bike', 'car', 'walking']
+        # the greenlet spawned without keep_spans is not recorded
+        assert [name for name, _ in g.timing_spans] == ['kraken.journeys', 'kraken.journeys']
+    # the spans are not kept in the greenlets after the call
+    assert timing._current_spans() is None
@@ -0,0 +1,159 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import functools
+import gevent
+from jormungandr.two_level_cache import TwoLevelCache
+
+
+class FakeBackend(object):
+    """
+    cache backend storing the memoized values in a dict
+    """
+    def __init__(self):
+        self.values = {}
+        self.nb_calls = 0
+
+    def memoize(self, timeout=None):
+        def decorator(f):
+            @functools.wraps(f)
+            def decorated_function(*args):
+                self.nb_calls += 1
+                if args not in self.values:
+                    self.values[args] = f(*args)
+                return self.values[args]
+            decorated_function.uncached = f
+            decorated_function.cache_timeout = timeout
+            decorated_function.make_cache_key = None
+            return decorated_function
+        return decorator
+
+    def delete_memoized(self, f, *args):
+        self.values.clear()
+
+    def clear(self):
+        self.values.clear()
+
+
+def two_level_cache_local_hit_test():
+    backend = FakeBackend()
+    cache = TwoLevelCache(backend, local_max_size=10, local_timeout=10)
+    calls = []
+
+    @cache.memoize(60)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(2) == 4
+    assert square(2) == 4
+    assert square(3) == 9
+    assert calls == [2, 3]
+    # the second call has been answered by the local cache
+    assert backend.nb_calls == 2
+    assert cache.stats()['nb_hits'] == 1
+
+    cache.delete_memoized(square)
+    assert square(2) == 4
+    assert calls == [2, 3, 2]
+
+
+def two_level_cache_local_copy_test():
+    """
+    the callers can modify the values they get without altering the cached value
+    """
+    backend = FakeBackend()
+    cache = TwoLevelCache(backend, local_max_size=10, local_timeout=10)
+
+    @cache.memoize(60)
+    def get_journeys(region):
+        return {'region': region, 'journeys': [1, 2]}
+
+    journeys = get_journeys('bob')
+    journeys['journeys'].append(3)
+    hit = get_journeys('bob')
+    assert hit == {'region': 'bob', 'journeys': [1, 2]}
+    hit['journeys'].pop()
+    assert get_journeys('bob') == {'region': 'bob', 'journeys': [1, 2]}
+    assert cache.stats()['nb_hits'] == 2
+
+
+def two_level_cache_single_flight_test():
+    """
+    the concurrent calls with the same arguments wait for the greenlet computing the value
+    """
+    backend = FakeBackend()
+    cache = TwoLevelCache(backend, local_max_size=10, local_timeout=10)
+    calls = []
+
+    @cache.memoize(60)
+    def slow_square(x):
+        calls.append(x)
+        gevent.sleep(0.01)
+        return x * x
+
+    greenlets = [gevent.spawn(slow_square, 2) for _ in range(5)]
+    gevent.joinall(greenlets)
+    assert [g.value for g in greenlets] == [4] * 5
+    assert calls == [2]
+    assert backend.nb_calls == 1
+    assert cache.stats()['nb_waits'] == 4
+
+
+def two_level_cache_failure_test():
+    backend = FakeBackend()
+    cache = TwoLevelCache(backend, local_max_size=10, local_timeout=10)
+    calls = []
+
+    @cache.memoize(60)
+    def failing(x):
+        calls.append(x)
+        gevent.sleep(0.01)
+        raise ValueError('bob')
+
+    greenlets = [gevent.spawn(failing, 2) for _ in range(2)]
+    gevent.joinall(greenlets)
+    assert all(isinstance(g.exception, ValueError) for g in greenlets)
+    # the waiting greenlet has tried on its own
+    assert calls == [2, 2]
+
+
+def two_level_cache_deactivated_test():
+    backend = FakeBackend()
+    cache = TwoLevelCache(backend, local_max_size=0, local_timeout=10)
+
+    @cache.memoize(60)
+    def square(x):
+        return x * x
+
+    assert square(2) == 4
+    assert square(2) == 4
+    assert backend.nb_calls == 2
+    assert cache.stats() is None
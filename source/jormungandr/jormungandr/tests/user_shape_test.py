@@ -0,0 +1,82 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import json
+from jormungandr import user_shape
+from jormungandr.user_shape import UserShape, get_user_shape
+
+
+class FakeUser(object):
+    def __init__(self, id, shape):
+        self.id = id
+        self.shape = shape
+
+
+def square(size, nb_points_by_side=1):
+    """
+    a square with some useless points on its sides
+    """
+    step = size / nb_points_by_side
+    coords = [[i * step, 0] for i in range(nb_points_by_side)] + \
+             [[size, i * step] for i in range(nb_points_by_side)] + \
+             [[size - i * step, size] for i in range(nb_points_by_side)] + \
+             [[0, size - i * step] for i in range(nb_points_by_side)] + [[0, 0]]
+    return json.dumps({'type': 'Feature', 'properties': {},
+                       'geometry': {'type': 'Polygon', 'coordinates': [coords]}})
+
+
+def user_shape_test():
+    shape = UserShape(square(1, nb_points_by_side=10), simplify_tolerance=0.0001)
+    assert shape.geojson['type'] == 'Feature'
+    assert shape.geojson['geometry']['type'] == 'Polygon'
+    # only the corners are kept
+    assert len(shape.geojson['geometry']['coordinates'][0]) == 5
+    assert shape.geometry.bounds == (0, 0, 1, 1)
+
+    assert len(UserShape(square(1, nb_points_by_side=10)).geojson['geometry']['coordinates'][0]) == 41
+
+
+def user_without_shape_test():
+    assert get_user_shape(None) is None
+    assert get_user_shape(FakeUser(1, None)) is None
+    assert get_user_shape(FakeUser(1, 'null')) is None
+
+
+def user_shape_is_parsed_once_test():
+    user_shape._user_shapes.clear()
+    shape = get_user_shape(FakeUser(42, square(1)))
+    assert get_user_shape(FakeUser(42, square(1))) is shape
+    assert shape.geometry.bounds == (0, 0, 1, 1)
+
+    # the shape of the user has been modified
+    new_shape = get_user_shape(FakeUser(42, square(2)))
+    assert new_shape is not shape
+    assert new_shape.geometry.bounds == (0, 0, 2, 2)
+    assert new_shape.hash != shape.hash
@@ -0,0 +1,140 @@
+# coding=utf-8
+# Copyright (c) 2001-2016, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+# the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.zmq_socket_pool import ZmqSocketPool
+
+
+class FakeSocket(object):
+    """
+    fake DEALER socket, a response is available only if it has been pushed in the responses list
+    """
+    def __init__(self):
+        self.closed = False
+        self.sent = []
+        self.responses = []
+
+    def setsockopt(self, *args):
+        pass
+
+    def connect(self, path):
+        pass
+
+    def send_multipart(self, frames):
+        self.sent.append(frames)
+
+    def poll(self, timeout):
+        return len(self.responses)
+
+    def recv_multipart(self):
+        return [b'', self.responses.pop(0)]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext(object):
+    def __init__(self, respond=True):
+        self.sockets = []
+        self.respond = respond
+
+    def socket(self, socket_type):
+        s = FakeSocket()
+        if self.respond:
+            s.send_multipart = lambda frames: s.responses.append(b'response to ' + frames[-1])
+        self.sockets.append(s)
+        return s
+
+
+def socket_reuse_test():
+    context = FakeContext()
+    pool = ZmqSocketPool(context, 'ipc:///tmp/bob', max_size=2)
+
+    assert pool.send_and_receive(b'req1', timeout=10) == b'response to req1'
+    assert pool.send_and_receive(b'req2', timeout=10) == b'response to req2'
+
+    # the requests are sequential, only one socket is needed
+    assert len(context.sockets) == 1
+    stats = pool.stats()
+    assert stats['nb_created'] == 1
+    assert stats['nb_idle'] == 1
+    assert stats['nb_in_use'] == 0
+
+
+def late_response_test():
+    """
+    a socket that timed out is kept aside until its late response is received, then it is reused
+    """
+    context = FakeContext(respond=False)
+    pool = ZmqSocketPool(context, 'ipc:///tmp/bob', max_size=1)
+
+    assert pool.send_and_receive(b'req1', timeout=10) is None
+    assert pool.stats()['nb_timeouts'] == 1
+    assert pool.stats()['nb_pending_late_response'] == 1
+
+    # the late response arrives
+    socket = context.sockets[0]
+    socket.responses.append(b'late response')
+
+    # the next call drops the late response and reuse the socket
+    socket.send_multipart = lambda frames: socket.responses.append(b'new response')
+    assert pool.send_and_receive(b'req2', timeout=10) == b'new response'
+    assert len(context.sockets) == 1
+    assert pool.stats()['nb_recovered'] == 1
+    assert not socket.closed
+
+
+def pool_full_of_pending_sockets_test():
+    """
+    when all the sockets are waiting for a late response, the oldest is closed to respect the max size
+    """
+    context = FakeContext(respond=False)
+    pool = ZmqSocketPool(context, 'ipc:///tmp/bob', max_size=1)
+
+    assert pool.send_and_receive(b'req1', timeout=10) is None
+    assert pool.send_and_receive(b'req2', timeout=10) is None
+
+    assert len(context.sockets) == 2
+    assert context.sockets[0].closed
+    assert not context.sockets[1].closed
+    stats = pool.stats()
+    assert stats['nb_sockets'] == 1
+    assert stats['nb_closed'] == 1
+
+
+def stale_timeout_test():
+    context = FakeContext(respond=False)
+    pool = ZmqSocketPool(context, 'ipc:///tmp/bob', max_size=2, stale_timeout=-1)
+
+    assert pool.send_and_receive(b'req1', timeout=10) is None
+    assert pool.send_and_receive(b'req2', timeout=10) is None
+
+    # the first socket has waited for too long, it has been closed
+    assert context.sockets[0].closed
+    assert pool.stats()['nb_pending_late_response'] == 1
@@ -0,0 +1,247 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from contextlib import contextmanager
+from functools import wraps
+import bisect
+import time
+import gevent.local
+from flask import g
+
+
+# upper bounds (in milliseconds) of the buckets of the histograms, the last bucket has no upper bound
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class LatencyHistogram(object):
+    """
+    histogram of durations with fixed buckets, cheap enough to be always on
+
+    the percentiles are approximated by the upper bound of their bucket
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, duration):
+        """
+        :param duration: duration in seconds
+        """
+        duration_ms = duration * 1000
+        self.counts[bisect.bisect_left(self.buckets, duration_ms)] += 1
+        self.count += 1
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        nb = 0
+        for i, count in enumerate(self.counts):
+            nb += count
+            if nb >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+class Timings(object):
+    """
+    histograms of the durations of the requests and of their spans, by endpoint
+    """
+
+    def __init__(self):
+        self.endpoints = {}  # endpoint -> span name -> LatencyHistogram
+
+    def add_request(self, endpoint, total, spans):
+        """
+        :param total: duration of the request
+        :param spans: durations of the spans of the request, by name
+        """
+        histograms = self.endpoints.setdefault(endpoint, {})
+        histograms.setdefault('total', LatencyHistogram()).add(total)
+        for name, duration in spans.items():
+            histograms.setdefault(name, LatencyHistogram()).add(duration)
+
+    def clear(self):
+        self.endpoints = {}
+
+    def stats(self):
+        return {endpoint: {name: h.stats() for name, h in histograms.items()}
+                for endpoint, histograms in self.endpoints.items()}
+
+
+timings = Timings()
+
+# spans of the request for the greenlets spawned without its context (see keep_spans)
+_greenlet_spans = gevent.local.local()
+
+
+def _current_spans():
+    try:
+        return getattr(g, 'timing_spans', None)
+    except RuntimeError:
+        # outside of a request
+        return getattr(_greenlet_spans, 'spans', None)
+
+
+def keep_spans(f):
+    """
+    make f record its spans in the current request's spans, even when run in a greenlet without the request context
+
+    to be used when spawning a greenlet: pool.spawn(timing.keep_spans(f), ...)
+    """
+    spans = _current_spans()
+    if spans is None:
+        return f
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        _greenlet_spans.spans = spans
+        try:
+            return f(*args, **kwargs)
+        finally:
+            del _greenlet_spans.spans
+    return wrapper
+
+
+@contextmanager
+def span(name):
+    """
+    time a part of the request
+
+    the spans are stored in flask.g, the greenlets having a copy of the request's g record in the same list,
+    the greenlets spawned without the request context must be spawned with keep_spans
+    """
+    spans = _current_spans()
+    if spans is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        spans.append((name, time.time() - start))
+
+
+def timed(name):
+    """
+    decorator timing the calls of a function as a span
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_decorator(name):
+    """
+    decorator for the __call__ of the decorators of the resources (links generation...)
+
+    only the time spent in the decorator is counted, not the time of the function it decorates
+    """
+    def decorator(decorator_call):
+        @wraps(decorator_call)
+        def timed_call(self, f):
+            @wraps(f)
+            def timed_f(*args, **kwargs):
+                start = time.time()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    inner_durations = getattr(g, 'timing_inner_durations', None)
+                    if inner_durations:
+                        inner_durations[-1] += time.time() - start
+
+            wrapper = decorator_call(self, timed_f)
+
+            @wraps(wrapper)
+            def timed_wrapper(*args, **kwargs):
+                spans = _current_spans()
+                if spans is None:
+                    return wrapper(*args, **kwargs)
+                if not hasattr(g, 'timing_inner_durations'):
+                    g.timing_inner_durations = []
+                g.timing_inner_durations.append(0.)
+                start = time.time()
+                try:
+                    return wrapper(*args, **kwargs)
+                finally:
+                    inner_duration = g.timing_inner_durations.pop()
+                    spans.append((name, time.time() - start - inner_duration))
+            return timed_wrapper
+        return timed_call
+    return decorator
+
+
+def start_request():
+    g.timing_start = time.time()
+    g.timing_spans = []
+
+
+def end_request(endpoint, server_timing_header=False):
+    """
+    add the timings of the request to the histograms of its endpoint
+
+    :return: the value of the Server-Timing header if server_timing_header is set, None otherwise
+    """
+    start = getattr(g, 'timing_start', None)
+    if start is None:
+        return None
+    total = time.time() - start
+    durations = {}
+    for name, duration in g.timing_spans:
+        durations[name] = durations.get(name, 0.) + duration
+    timings.add_request(endpoint, total, durations)
+    if not server_timing_header:
+        return None
+    metrics = ['{};dur={:.1f}'.format(name, d * 1000) for name, d in sorted(durations.items())]
+    metrics.append('total;dur={:.1f}'.format(total * 1000))
+    return ', '.join(metrics)
@@ -0,0 +1,153 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import functools
+import cPickle as pickle
+from gevent.lock import Semaphore
+from jormungandr.lru_cache import LruCache
+
+
+_MISSING = object()
+
+
+class TwoLevelCache(object):
+    """
+    Flask-Cache wrapper adding a small in-process cache in front of the shared backend (redis, memcached...)
+
+    the memoized values are first looked for in a per worker LRU with a short time to live,
+    then in the backend.
+    When a value is missing, only one greenlet computes it (or gets it from the backend),
+    the other greenlets asking for the same key wait for its result.
+    Like in the backend, the values are pickled in the local cache: each caller gets its own copy
+    and can modify it without altering the cached value.
+
+    all the other methods are those of the Flask-Cache object.
+    If local_max_size is 0 the local cache is deactivated and memoize is the one of Flask-Cache.
+    """
+
+    def __init__(self, backend, local_max_size, local_timeout):
+        """
+        :param backend: the Flask-Cache object
+        :param local_max_size: max number of values kept in the process
+        :param local_timeout: time to live (in seconds) of the values in the process
+        """
+        self.backend = backend
+        self.local_timeout = local_timeout
+        self.local = LruCache(max_size=local_max_size, ttl=local_timeout) if local_max_size else None
+        self._computing = {}  # key -> lock held by the greenlet computing the value
+        self.nb_waits = 0
+        self.nb_backend_calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def memoize(self, timeout=None, *args, **kwargs):
+        memoize_in_backend = self.backend.memoize(timeout, *args, **kwargs)
+        if self.local is None:
+            return memoize_in_backend
+
+        # the values must not be kept in the process longer than in the backend
+        local_timeout = min(timeout, self.local_timeout) if timeout else self.local_timeout
+
+        def decorator(f):
+            memoized = memoize_in_backend(f)
+
+            @functools.wraps(f)
+            def decorated_function(*args, **kwargs):
+                # like Flask-Cache we use the repr of the arguments in the key
+                key = (f, repr(args), repr(sorted(kwargs.items())))
+                value = self.local.get(key, _MISSING)
+                if value is not _MISSING:
+                    return pickle.loads(value)
+                return self._compute(key, memoized, local_timeout, args, kwargs)
+
+            # needed by Flask-Cache to delete the memoized values
+            decorated_function.uncached = memoized.uncached
+            decorated_function.cache_timeout = memoized.cache_timeout
+            decorated_function.make_cache_key = memoized.make_cache_key
+            decorated_function.memoized_function = f
+            return decorated_function
+        return decorator
+
+    def _compute(self, key, memoized, local_timeout, args, kwargs):
+        lock = self._computing.get(key)
+        if lock is not None:
+            # another greenlet is already computing this value, we wait for it
+            self.nb_waits += 1
+            with lock:
+                pass
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                return pickle.loads(value)
+            # the other greenlet has failed or its value is None, we try on our own
+
+        lock = Semaphore()
+        with lock:
+            self._computing[key] = lock
+            try:
+                self.nb_backend_calls += 1
+                value = memoized(*args, **kwargs)
+                # like Flask-Cache, None is not cached
+                if value is not None:
+                    self.local.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ttl=local_timeout)
+                return value
+            finally:
+                if self._computing.get(key) is lock:
+                    del self._computing[key]
+
+    def delete_memoized(self, f, *args, **kwargs):
+        memoized_function = getattr(f, 'memoized_function', None)
+        if self.local is not None and memoized_function is not None:
+            # the local values of the function are all deleted, even if some arguments are given
+            for key in self.local.keys():
+                if key[0] is memoized_function:
+                    self.local.delete(key)
+        return self.backend.delete_memoized(f, *args, **kwargs)
+
+    def clear(self):
+        if self.local is not None:
+            self.local.clear()
+        return self.backend.clear()
+
+    def stats(self):
+        """
+        usage of the local cache, for the status
+        """
+        if self.local is None:
+            return None
+        stats = self.local.stats()
+        stats['timeout'] = self.local_timeout
+        stats['nb_waits'] = self.nb_waits
+        stats['nb_backend_calls'] = self.nb_backend_calls
+        return stats
@@ -0,0 +1,80 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import hashlib
+import json
+from shapely import geometry
+from jormungandr import app
+from jormungandr.lru_cache import LruCache
+
+
+class UserShape(object):
+    """
+    the shape restricting the places of a user, parsed and simplified once
+
+    - geojson: the simplified shape as a GeoJSON feature, sent to the external autocomplete
+    - hash: identifies the shape, used in the keys of the caches
+    """
+
+    def __init__(self, raw_shape, simplify_tolerance=0):
+        """
+        :param raw_shape: the GeoJSON feature stored in the database
+        :param simplify_tolerance: tolerance (in degrees) of the simplification of the geometry, 0 to keep it as is
+        """
+        feature = json.loads(raw_shape)
+        self.geometry = geometry.shape(feature['geometry'])
+        if simplify_tolerance:
+            self.geometry = self.geometry.simplify(simplify_tolerance, preserve_topology=True)
+        self.geojson = {'type': 'Feature',
+                        'geometry': geometry.mapping(self.geometry),
+                        'properties': feature.get('properties') or {}}
+        self.hash = hashlib.md5(raw_shape.encode('utf-8')).hexdigest()
+
+
+_user_shapes = LruCache(max_size=app.config['USER_SHAPE_CACHE_SIZE'], ttl=app.config['USER_SHAPE_CACHE_TIMEOUT'])
+
+
+def get_user_shape(user):
+    """
+    :return: the UserShape of the user or None if the user has no shape
+
+    The shapes are cached by user, the raw shape is kept with it to detect the modifications of the shape.
+    """
+    if not user or not user.shape or user.shape == 'null':
+        return None
+    cached = _user_shapes.get(user.id)
+    if cached is not None and cached[0] == user.shape:
+        return cached[1]
+    user_shape = UserShape(user.shape, app.config['USER_SHAPE_SIMPLIFY_TOLERANCE'])
+    _user_shapes.set(user.id, (user.shape, user_shape))
+    return user_shape
@@ -0,0 +1,190 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import deque
+import logging
+import time
+from gevent import GreenletExit
+from gevent.lock import BoundedSemaphore
+from zmq import green as zmq
+
+
+class ZmqSocketPool(object):
+    """
+    bounded pool of zmq DEALER sockets connected to a kraken
+
+    kraken's load balancer only handles a [address, '', request] envelope and its responses do not carry the
+    request_id, so we cannot have more than one request in flight on a socket.
+    We use DEALER sockets (and not REQ sockets) to be able to keep a socket whose response has timed out:
+    it is set aside until the late response is received and dropped, then it is reused.
+    With a REQ socket we would have to close it and open a new connection.
+
+    The number of sockets (thus of connections to the kraken) is capped by max_size,
+    when all sockets are used the greenlets wait for one to be released.
+    """
+
+    def __init__(self, context, socket_path, max_size, stale_timeout=60):
+        """
+        :param max_size: max number of sockets opened to the kraken
+        :param stale_timeout: time (in seconds) after which a socket waiting for a late response is closed
+        """
+        self.context = context
+        self.socket_path = socket_path
+        self.max_size = max_size
+        self.stale_timeout = stale_timeout
+        self._slots = BoundedSemaphore(max_size)
+        self._idle = deque()
+        self._stale = deque()  # sockets waiting for a late response, stored with the date of the timeout
+        self.nb_in_use = 0
+        self.nb_waiting = 0
+        self.nb_created = 0
+        self.nb_closed = 0
+        self.nb_timeouts = 0
+        self.nb_recovered = 0
+        self.nb_saturated = 0
+
+    def __repr__(self):
+        return '<ZmqSocketPool {}>'.format(self.socket_path)
+
+    @property
+    def nb_sockets(self):
+        return self.nb_in_use + len(self._idle) + len(self._stale)
+
+    def _create_socket(self):
+        socket = self.context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(self.socket_path)
+        self.nb_created += 1
+        return socket
+
+    def _close_socket(self, socket):
+        if not socket.closed:
+            socket.close()
+        self.nb_closed += 1
+
+    def _check_stale_sockets(self):
+        """
+        drop the late responses that have arrived, the sockets can then be reused
+        and close the sockets that have been waiting for too long
+        """
+        now = time.time()
+        for _ in range(len(self._stale)):
+            socket, timeout_date = self._stale.popleft()
+            if socket.poll(timeout=0) > 0:
+                socket.recv_multipart()
+                self.nb_recovered += 1
+                self._idle.append(socket)
+            elif now - timeout_date > self.stale_timeout:
+                self._close_socket(socket)
+            else:
+                self._stale.append((socket, timeout_date))
+
+    def _get_socket(self):
+        if not self._idle and self._stale:
+            self._check_stale_sockets()
+        if self._idle:
+            return self._idle.pop()
+        if self.nb_sockets >= self.max_size and self._stale:
+            # we need room for a new socket, the oldest pending socket is sacrificed
+            socket, _ = self._stale.popleft()
+            self._close_socket(socket)
+        return self._create_socket()
+
+    def send_and_receive(self, payload, timeout):
+        """
+        send a serialized request to the kraken and wait for the response
+
+        :param timeout: timeout in milliseconds, including the time spent waiting for a free socket
+        :return: the serialized response or None on timeout
+        """
+        start = time.time()
+        self.nb_waiting += 1
+        try:
+            has_slot = self._slots.acquire(timeout=timeout / 1000.0)
+        finally:
+            self.nb_waiting -= 1
+        if not has_slot:
+            self.nb_saturated += 1
+            logging.getLogger(__name__).warn('no socket available on %s after %sms', self.socket_path, timeout)
+            return None
+
+        try:
+            socket = self._get_socket()
+            self.nb_in_use += 1
+            try:
+                socket.send_multipart([b'', payload])
+                remaining = max(timeout - int((time.time() - start) * 1000), 0)
+                if socket.poll(timeout=remaining) > 0:
+                    response = socket.recv_multipart()[-1]
+                    self._idle.append(socket)
+                    return response
+                self.nb_timeouts += 1
+                self._stale.append((socket, time.time()))
+                return None
+            except zmq.ZMQError:
+                self._close_socket(socket)
+                raise
+            except GreenletExit:
+                # the request has been cancelled, the response will be dropped when it arrives
+                self._stale.append((socket, time.time()))
+                raise
+            finally:
+                self.nb_in_use -= 1
+        finally:
+            self._slots.release()
+
+    def close(self):
+        for socket in self._idle:
+            self._close_socket(socket)
+        for socket, _ in self._stale:
+            self._close_socket(socket)
+        self._idle.clear()
+        self._stale.clear()
+
+    def stats(self):
+        """
+        occupancy of the pool, for the status
+        """
+        return {
+            'max_size': self.max_size,
+            'nb_sockets': self.nb_sockets,
+            'nb_in_use': self.nb_in_use,
+            'nb_idle': len(self._idle),
+            'nb_pending_late_response': len(self._stale),
+            'nb_waiting': self.nb_waiting,
+            'nb_created': self.nb_created,
+            'nb_closed': self.nb_closed,
+            'nb_timeouts': self.nb_timeouts,
+            'nb_recovered': self.nb_recovered,
+            'nb_saturated': self.nb_saturated,
+        }
@@ -335,6 +335,14 @@ class TestBragiShape(AbstractTestFixture):
                     self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi')
                     self.query('v1/places?q=toto')
 
+            # the parsed shape is not registered in the parameters of the stats
+            registered = []
+            with mock.patch('jormungandr.stat_manager.StatManager.register_interpreted_parameters',
+                            lambda stat_manager, args: registered.append(args)):
+                with mock.patch('requests.post', mock_post):
+                    self.query('v1/places?q=toto')
+            assert registered and 'shape' not in registered[0]
+
     def test_places_for_user_without_shape(self):
         """
         Test that without shape for user, we use the get method
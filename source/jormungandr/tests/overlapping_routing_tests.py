@@ -29,6 +29,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import logging
 from navitiacommon import models
+from jormungandr import app
 
 from .tests_mechanism import AbstractTestFixture, dataset
 from .check_utils import *
@@ -145,3 +146,16 @@ class TestOverlappingCoverage(AbstractTestFixture):
         response, error_code = self.query_no_assert("/v1/coord/-0.9;-0.9", display=True)
         assert error_code == 404
         assert set(response['regions']) == {"empty_routing_test", "main_routing_test"}
+
+
+@dataset({"main_routing_test": {'is_free': True}, "empty_routing_test": {'is_free': False}})
+class TestOverlappingCoverageConcurrentRegions(TestOverlappingCoverage):
+    """
+    same tests, but the regions are computing the journeys at the same time
+    """
+    def setup(self):
+        self.old_nb_concurrent_regions = app.config['JOURNEYS_NB_CONCURRENT_REGIONS']
+        app.config['JOURNEYS_NB_CONCURRENT_REGIONS'] = 2
+
+    def teardown(self):
+        app.config['JOURNEYS_NB_CONCURRENT_REGIONS'] = self.old_nb_concurrent_regions
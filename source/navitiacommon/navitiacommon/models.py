@@ -104,13 +104,16 @@ class Host(db.Model):
 
 class User(db.Model):
     __table_args__ = (UniqueConstraint('login', 'end_point_id', name='user_login_end_point_idx'),
-                      UniqueConstraint('email', 'end_point_id', name='user_email_end_point_idx'))
+                      UniqueConstraint('email', 'end_point_id', name='user_email_end_point_idx'),
+                      # for the keyset pagination of the users sorted by login or email
+                      db.Index('ix_user_login_id', 'login', 'id'),
+                      db.Index('ix_user_email_id', 'email', 'id'))
     id = db.Column(db.Integer, primary_key=True)
     login = db.Column(db.Text, nullable=False)
     email = db.Column(db.Text, nullable=False)
     block_until = db.Column(db.Date, nullable=True)
 
-    end_point_id = db.Column(db.Integer, db.ForeignKey('end_point.id'), nullable=False)
+    end_point_id = db.Column(db.Integer, db.ForeignKey('end_point.id'), nullable=False, index=True)
     end_point = db.relationship('EndPoint', lazy='joined', cascade='save-update, merge')
 
     billing_plan_id = db.Column(db.Integer, db.ForeignKey('billing_plan.id'), nullable=False)
@@ -191,7 +194,7 @@ class User(db.Model):
 class Key(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'),
-                        nullable=False)
+                        nullable=False, index=True)
     token = db.Column(db.Text, unique=True, nullable=False)
     app_name = db.Column(db.Text, nullable=True)
     valid_until = db.Column(db.Date)
@@ -0,0 +1,30 @@
+"""add indexes for the listing of the users
+
+the users are listed by end_point and their keys are fetched by user,
+the listings sorted by login or email are paginated on (login, id) and (email, id)
+
+Revision ID: 3e9d4ba2f4c1
+Revises: 4af6f969bfa8
+Create Date: 2026-10-18 14:32:05.418227
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3e9d4ba2f4c1'
+down_revision = '4af6f969bfa8'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('ix_user_end_point_id', 'user', ['end_point_id'], unique=False)
+    op.create_index('ix_key_user_id', 'key', ['user_id'], unique=False)
+    op.create_index('ix_user_login_id', 'user', ['login', 'id'], unique=False)
+    op.create_index('ix_user_email_id', 'user', ['email', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_email_id')
+    op.drop_index('ix_user_login_id')
+    op.drop_index('ix_key_user_id')
+    op.drop_index('ix_user_end_point_id')
@@ -630,3 +630,81 @@ def test_get_users_with_disable_geojson_false(create_multiple_users, geojson_pol
     assert foodefault
     assert foodefault.get('has_shape') is False
     assert foodefault.get('shape') is None
+
+
+@pytest.fixture
+def create_ten_users():
+    with app.app_context():
+        end_point = models.EndPoint.get_default()
+        billing_plan = models.BillingPlan.get_default(end_point)
+        for i in range(10):
+            # the logins are not in the order of the ids
+            user = models.User('user{}'.format(9 - i), 'user{}@example.com'.format(i))
+            user.end_point = end_point
+            user.billing_plan = billing_plan
+            models.db.session.add(user)
+        models.db.session.commit()
+
+
+def get_pages(url):
+    """
+    follow the "Link" headers of the pages of users
+    """
+    pages = []
+    tester = app.test_client()
+    while url:
+        resp = tester.get(url)
+        assert resp.status_code == 200
+        pages.append([u['login'] for u in json.loads(resp.data)])
+        link = resp.headers.get('Link')
+        url = link[link.index('<') + 1:link.index('>')] if link else None
+    return pages
+
+
+def test_get_users_sorted(create_ten_users):
+    resp = api_get('/v0/users/?sort=login')
+    assert [u['login'] for u in resp] == ['user{}'.format(i) for i in range(10)]
+
+    resp = api_get('/v0/users/?sort=-login')
+    assert [u['login'] for u in resp] == ['user{}'.format(i) for i in reversed(range(10))]
+
+    resp = api_get('/v0/users/?sort=email')
+    assert [u['email'] for u in resp] == ['user{}@example.com'.format(i) for i in range(10)]
+
+    _, status = api_get('/v0/users/?sort=block_until', check=False)
+    assert status == 400
+
+
+def test_get_users_by_batches(create_ten_users):
+    """
+    the users are fetched by batches from the database, they should all be streamed
+    """
+    with mock.patch.dict(app.config, {'USERS_BATCH_SIZE': 3}):
+        resp = api_get('/v0/users/?sort=login')
+    assert [u['login'] for u in resp] == ['user{}'.format(i) for i in range(10)]
+
+
+def test_get_users_pages(create_ten_users):
+    pages = get_pages('/v0/users/?sort=login&limit=4')
+    assert pages == [['user0', 'user1', 'user2', 'user3'],
+                     ['user4', 'user5', 'user6', 'user7'],
+                     ['user8', 'user9']]
+
+    pages = get_pages('/v0/users/?sort=-login&limit=5')
+    assert pages == [['user9', 'user8', 'user7', 'user6', 'user5'],
+                     ['user4', 'user3', 'user2', 'user1', 'user0']]
+
+    # the filters are kept on the next pages
+    pages = get_pages('/v0/users/?sort=login&limit=1&login=user3')
+    assert pages == [['user3']]
+
+
+def test_get_users_invalid_pagination(create_ten_users):
+    _, status = api_get('/v0/users/?limit=0', check=False)
+    assert status == 400
+
+    _, status = api_get('/v0/users/?limit=100000', check=False)
+    assert status == 400
+
+    _, status = api_get('/v0/users/?limit=2&cursor=toto', check=False)
+    assert status == 400
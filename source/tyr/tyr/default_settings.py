@@ -144,3 +144,9 @@ MIMIR_URL = 'http://localhost:9200'
 
 #we don't enable serpy for now
 USE_SERPY = False
+
+#max number of users of a page of the user listing
+USERS_PAGE_MAX_SIZE = 1000
+
+#number of users fetched at once from the database when listing the users
+USERS_BATCH_SIZE = 1000
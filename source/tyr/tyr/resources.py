@@ -29,12 +29,13 @@
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
 
-from flask import current_app, url_for, request
+from flask import current_app, url_for, request, Response, stream_with_context
 from flask.globals import g
 import flask_restful
 from flask_restful import fields, marshal_with, marshal, reqparse, inputs, abort
 
 import sqlalchemy
+import sqlalchemy.orm
 from validate_email import validate_email
 from datetime import datetime
 from tyr_user_event import TyrUserEvent
@@ -44,6 +45,7 @@ import logging
 import os
 import shutil
 import json
+import base64
 from jsonschema import validate, ValidationError
 from formats import poi_type_conf_format, parse_error
 
@@ -59,6 +61,82 @@ from navitiacommon import parser_args_type
 
 __ALL__ = ['Api', 'Instance', 'User', 'Key']
 
+# sorts of the user listing, with the columns used for the keyset pagination
+USER_SORTS = {
+    'id': (models.User.id,),
+    'login': (models.User.login, models.User.id),
+    'email': (models.User.email, models.User.id),
+}
+USER_SORTS.update(dict(('-' + k, v) for k, v in USER_SORTS.items()))
+
+
+def encode_cursor(user, sort):
+    """
+    the cursor is the values of the sort columns of the last user of a page
+    """
+    values = [getattr(user, c.key) for c in USER_SORTS[sort]]
+    return base64.urlsafe_b64encode(ujson.dumps(values))
+
+
+def decode_cursor(cursor, sort):
+    if not cursor:
+        return None
+    try:
+        values = ujson.loads(base64.urlsafe_b64decode(cursor))
+    except (TypeError, ValueError):
+        raise ValueError('invalid cursor')
+    if not isinstance(values, list) or len(values) != len(USER_SORTS[sort]):
+        raise ValueError('invalid cursor')
+    return values
+
+
+def _after(columns, values, descending):
+    """
+    condition on the rows after (columns) = (values) in the sort order
+
+    the row values comparison (col1, col2) > (v1, v2) is used as a range of the (col1, col2) index by postgres,
+    unlike col1 > v1 or (col1 = v1 and col2 > v2)
+    """
+    row, values = sqlalchemy.tuple_(*columns), sqlalchemy.tuple_(*values)
+    return row < values if descending else row > values
+
+
+def iter_users(query, sort, cursor=None, limit=None):
+    """
+    iterate over the users of the query sorted by `sort`, starting after the cursor
+
+    the users are fetched by batches with a keyset pagination (WHERE (login, id) > (last login, last id))
+    so that neither the database nor the worker have to handle all the users at once
+    """
+    columns = USER_SORTS[sort]
+    descending = sort.startswith('-')
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    batch_size = current_app.config['USERS_BATCH_SIZE']
+    values = cursor
+    nb_users = 0
+    while limit is None or nb_users < limit:
+        batch_query = query.filter(_after(columns, values, descending)) if values is not None else query
+        size = batch_size if limit is None else min(batch_size, limit - nb_users)
+        users = batch_query.limit(size).all()
+        for user in users:
+            yield user
+        nb_users += len(users)
+        if len(users) < size:
+            break
+        values = [getattr(users[-1], c.key) for c in columns]
+
+
+def stream_json_list(items):
+    """
+    serialize the items as a json list, item by item
+    """
+    yield '['
+    for i, item in enumerate(items):
+        if i:
+            yield ','
+        yield ujson.dumps(item)
+    yield ']'
+
 
 class FieldDate(fields.Raw):
     def format(self, value):
@@ -542,6 +620,13 @@ class User(flask_restful.Resource):
             parser.add_argument('end_point_id', type=int)
             parser.add_argument('block_until', type=datetime_format, required=False,
                     case_sensitive=False)
+            parser.add_argument('sort', type=str, required=False, default='id',
+                    choices=sorted(USER_SORTS.keys()),
+                    help='sort of the users, prefixed by "-" for a descending sort')
+            parser.add_argument('limit', type=int, required=False,
+                    help='max number of users returned, the next page is given in the "Link" header')
+            parser.add_argument('cursor', type=str, required=False,
+                    help='position of the page in the users, given in the "Link" header of the previous page')
 
             args = parser.parse_args()
             g.disable_geojson = args['disable_geojson']
@@ -551,16 +636,37 @@ class User(flask_restful.Resource):
                 users = models.User.get_from_token(args['key'], datetime.now())
                 return marshal(users, user_fields)
             else:
+                pagination_args = dict((k, args.pop(k)) for k in ('sort', 'limit', 'cursor'))
                 del args['disable_geojson']
                 # dict comprehension would be better, but it's not in python 2.6
                 filter_params = dict((k, v) for k, v in args.items() if v)
 
-                if filter_params:
-                    users = models.User.query.filter_by(**filter_params).all()
-                    return marshal(users, user_fields)
-                else:
-                    users = models.User.query.all()
-                    return marshal(users, user_fields)
+                # the authorizations are not in the response, there is no need to load them
+                query = models.User.query.filter_by(**filter_params)\
+                    .options(sqlalchemy.orm.lazyload(models.User.authorizations))
+                try:
+                    cursor = decode_cursor(pagination_args['cursor'], pagination_args['sort'])
+                except ValueError:
+                    return {'error': 'invalid cursor'}, 400
+                limit = pagination_args['limit']
+                if limit is None:
+                    # all the users are streamed
+                    users = iter_users(query, pagination_args['sort'], cursor)
+                    return Response(stream_with_context(stream_json_list(marshal(u, user_fields) for u in users)),
+                                    mimetype='application/json')
+                if not 0 < limit <= current_app.config['USERS_PAGE_MAX_SIZE']:
+                    return {'error': 'limit must be between 1 and {}'
+                                     .format(current_app.config['USERS_PAGE_MAX_SIZE'])}, 400
+
+                # one more user is fetched to know if there is a next page
+                users = list(iter_users(query, pagination_args['sort'], cursor, limit=limit + 1))
+                headers = {}
+                if len(users) > limit:
+                    users = users[:limit]
+                    next_args = dict(request.args.items())
+                    next_args['cursor'] = encode_cursor(users[-1], pagination_args['sort'])
+                    headers['Link'] = '<{}>; rel="next"'.format(url_for('user', _external=True, **next_args))
+                return marshal(users, user_fields), 200, headers
 
     def post(self):
         user = None